@@ -0,0 +1,27 @@
+"""add locked_by to jobs for atomic worker claims
+
+Revision ID: 0019_add_job_locked_by
+Revises: 0018_add_user_added_examples
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0019_add_job_locked_by"
+down_revision = "0018_add_user_added_examples"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("locked_by", sa.String(length=128), nullable=True))
+    op.create_index("ix_jobs_status_created", "jobs", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_status_created", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("locked_by")
@@ -0,0 +1,27 @@
+"""add job lease and attempt counter
+
+Revision ID: 0020_add_job_lease_fields
+Revises: 0019_add_job_locked_by
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0020_add_job_lease_fields"
+down_revision = "0019_add_job_locked_by"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("attempts")
+        batch_op.drop_column("lease_expires_at")
@@ -0,0 +1,31 @@
+"""add parent_job_id to jobs for plan-wide fan-out
+
+Revision ID: 0022_add_job_parent
+Revises: 0021_add_job_priority
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0022_add_job_parent"
+down_revision = "0021_add_job_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("parent_job_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_jobs_parent_job_id", "jobs", ["parent_job_id"], ["id"], ondelete="CASCADE"
+        )
+        batch_op.create_index("ix_jobs_parent_job_id", ["parent_job_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_index("ix_jobs_parent_job_id")
+        batch_op.drop_constraint("fk_jobs_parent_job_id", type_="foreignkey")
+        batch_op.drop_column("parent_job_id")
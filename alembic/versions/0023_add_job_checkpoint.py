@@ -0,0 +1,25 @@
+"""add checkpoint_json to jobs for pipeline resume
+
+Revision ID: 0023_add_job_checkpoint
+Revises: 0022_add_job_parent
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0023_add_job_checkpoint"
+down_revision = "0022_add_job_parent"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("checkpoint_json", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("checkpoint_json")
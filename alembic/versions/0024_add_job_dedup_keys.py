@@ -0,0 +1,40 @@
+"""add dedup_key / idempotency_key to jobs for duplicate suppression
+
+Revision ID: 0024_add_job_dedup_keys
+Revises: 0023_add_job_checkpoint
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0024_add_job_dedup_keys"
+down_revision = "0023_add_job_checkpoint"
+branch_labels = None
+depends_on = None
+
+ACTIVE_FILTER = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("dedup_key", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("idempotency_key", sa.String(length=128), nullable=True))
+        batch_op.create_unique_constraint("uq_jobs_idempotency_key", ["idempotency_key"])
+    op.create_index(
+        "ux_jobs_active_dedup_key",
+        "jobs",
+        ["dedup_key"],
+        unique=True,
+        sqlite_where=ACTIVE_FILTER,
+        postgresql_where=ACTIVE_FILTER,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_jobs_active_dedup_key", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_constraint("uq_jobs_idempotency_key", type_="unique")
+        batch_op.drop_column("idempotency_key")
+        batch_op.drop_column("dedup_key")
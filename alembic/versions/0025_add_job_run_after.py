@@ -0,0 +1,25 @@
+"""add run_after to jobs for scheduled starts and retry backoff
+
+Revision ID: 0025_add_job_run_after
+Revises: 0024_add_job_dedup_keys
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0025_add_job_run_after"
+down_revision = "0024_add_job_dedup_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("run_after", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("run_after")
@@ -0,0 +1,33 @@
+"""add token, attempt and cache accounting to llm_call_logs
+
+Revision ID: 0027_add_llm_call_log_accounting
+Revises: 0026_add_llm_response_cache
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0027_add_llm_call_log_accounting"
+down_revision = "0026_add_llm_response_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("llm_call_logs") as batch_op:
+        batch_op.add_column(sa.Column("intent", sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column("prompt_tokens", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("completion_tokens", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("attempt", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("cache_status", sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("llm_call_logs") as batch_op:
+        batch_op.drop_column("cache_status")
+        batch_op.drop_column("attempt")
+        batch_op.drop_column("completion_tokens")
+        batch_op.drop_column("prompt_tokens")
+        batch_op.drop_column("intent")
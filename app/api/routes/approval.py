@@ -19,13 +19,7 @@ from app.models.project import (
 )
 from app.models.quality import DoDItem, NFRItem, RiskItem
 from app.repositories.project_repo import get_project_by_id
-from app.services.objective_step import run_objective_step
-from app.services.quality_steps import run_quality_steps
-from app.services.spec_steps import (
-    run_architecture_step,
-    run_feature_step,
-    run_tech_stack_step,
-)
+from app.services.job_engine import SPEC_STEP_JOB_TYPES, create_job_for_spec_step
 
 router = APIRouter()
 
@@ -44,6 +38,7 @@ class ApprovalResponse(BaseModel):
     approval_status: str
     last_approved_at: Optional[datetime] = None
     message: str
+    job_id: Optional[int] = None
 
 
 async def _get_step(
@@ -219,7 +214,7 @@ async def reject_step(
     )
 
 
-@router.post("/projects/{project_id}/steps/{step_type}/regenerate")
+@router.post("/projects/{project_id}/steps/{step_type}/regenerate", status_code=202)
 async def regenerate_step(
     project_id: int,
     step_type: StepType,
@@ -227,10 +222,15 @@ async def regenerate_step(
     db: AsyncSession = Depends(get_db),
 ) -> ApprovalResponse:
     """
-    Regenerate a rejected (or any) step by re-running the LLM.
-    Optionally includes user feedback in the regeneration.
+    Regenerate a rejected (or any) step by re-running the LLM in a background job.
+    Optionally includes user feedback in the regeneration. Returns 202 with ``job_id``;
+    the step goes back to PENDING approval once the job completes.
     """
     step = await _get_step(db, project_id, step_type)
+    if step_type not in SPEC_STEP_JOB_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Regeneration not supported for {step_type}"
+        )
 
     # Optional: save regeneration feedback as Comment if provided
     if payload and payload.feedback:
@@ -242,31 +242,12 @@ async def regenerate_step(
             text=payload.feedback,
         )
         db.add(comment)
-        await db.flush()
+        await db.commit()
 
-    # Re-run the LLM step
     # Note: feedback integration into prompt is a future enhancement (V2)
-    # For now, we just re-run the same prompt
-
-    try:
-        if step_type == StepType.OBJECTIVE:
-            await run_objective_step(db, project_id)
-        elif step_type == StepType.TECH_STACK:
-            await run_tech_stack_step(db, project_id)
-        elif step_type == StepType.FEATURES:
-            await run_feature_step(db, project_id)
-        elif step_type == StepType.ARCHITECTURE:
-            await run_architecture_step(db, project_id)
-        elif step_type in (StepType.DOD, StepType.NFR, StepType.RISKS):
-            await run_quality_steps(db, project_id)
-        else:
-            raise HTTPException(
-                status_code=400, detail=f"Regeneration not supported for {step_type}"
-            )
-    except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
-
+    # For now, the job re-runs the same prompt, skipping the LLM response cache
+    project = await get_project_by_id(db, project_id)
+    job = await create_job_for_spec_step(db, project, step_type, {"regenerate": True})
     await db.refresh(step)
 
     return ApprovalResponse(
@@ -274,5 +255,6 @@ async def regenerate_step(
         step_type=step_type.value,
         approval_status=step.approval_status.value,
         last_approved_at=step.last_approved_at,
-        message=f"Step {step_type.value} regenerated successfully (now PENDING approval)",
+        message=f"Step {step_type.value} regeneration queued (job {job.id})",
+        job_id=job.id,
     )
@@ -1,16 +1,35 @@
 from datetime import datetime, timezone
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.db.session import get_db
 from app.models.job import Job
-from app.models.planning import Sprint
+from app.models.planning import Sprint, SprintPlan
 from app.models.project import Project
-from app.schemas.jobs import JobCreateTaskPipeline, JobRead
+from app.schemas.jobs import JobCreatePlanPipeline, JobCreateTaskPipeline, JobEvent, JobRead
+from app.core.config import get_settings
 from app.core.enums import JobStatus
-from app.services.job_engine import create_job_for_task_pipeline, start_job
+from app.services.job_cancellation import request_cancellation
+from app.services.job_events import (
+    STATE_FIELDS,
+    job_events,
+    publish_job,
+    stream_job_events,
+    wait_for_job_event,
+)
+from app.services.job_engine import (
+    DuplicateJobActive,
+    IdempotencyKeyConflict,
+    InvalidJobTransition,
+    create_job_for_plan_pipeline,
+    create_job_for_task_pipeline,
+    retry_job,
+    start_job,
+)
 from app.services.job_worker import process_next_job
 
 router = APIRouter()
@@ -26,10 +45,63 @@ async def _get_project_and_sprint(db: AsyncSession, project_id: int, sprint_id:
     return project, sprint
 
 
+IdempotencyKey = Annotated[
+    str | None,
+    Header(
+        alias="Idempotency-Key",
+        max_length=128,
+        description="Aynı key ile tekrarlanan istek yeni job açmaz, mevcut job'u döner",
+    ),
+]
+
+
 @router.post("/jobs/task-pipeline-for-sprint", response_model=JobRead)
-async def create_task_pipeline_job(payload: JobCreateTaskPipeline, db: AsyncSession = Depends(get_db)):
+async def create_task_pipeline_job(
+    payload: JobCreateTaskPipeline,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Aynı sprint için kuyrukta/çalışan özdeş bir job varsa yenisi açılmaz, o job döner."""
     project, sprint = await _get_project_and_sprint(db, payload.project_id, payload.sprint_id)
-    job = await create_job_for_task_pipeline(db, project, sprint, payload_dict=payload.model_dump())
+    try:
+        job = await create_job_for_task_pipeline(
+            db,
+            project,
+            sprint,
+            payload_dict=payload.model_dump(exclude={"run_after"}),
+            priority=payload.priority,
+            idempotency_key=idempotency_key,
+            run_after=payload.run_after,
+        )
+    except IdempotencyKeyConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return job
+
+
+@router.post("/jobs/task-pipeline-for-plan", response_model=JobRead)
+async def create_plan_pipeline_job(
+    payload: JobCreatePlanPipeline,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_db),
+):
+    project = await db.get(Project, payload.project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    plan = await db.get(SprintPlan, payload.sprint_plan_id)
+    if not plan or plan.project_id != project.id:
+        raise HTTPException(status_code=404, detail="Sprint plan not found")
+    try:
+        job = await create_job_for_plan_pipeline(
+            db,
+            project,
+            plan,
+            payload_dict=payload.model_dump(exclude={"run_after"}),
+            priority=payload.priority,
+            idempotency_key=idempotency_key,
+            run_after=payload.run_after,
+        )
+    except IdempotencyKeyConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     return job
 
 
@@ -41,6 +113,61 @@ async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
     return job
 
 
+@router.get("/jobs/{job_id}/events", response_model=None)
+async def job_events_endpoint(
+    job_id: int,
+    wait: float | None = Query(None, ge=0, le=60, description="Long-poll: en fazla bu kadar saniye bekle"),
+    after_seq: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    SSE stream of job progress (``text/event-stream``); with ``?wait=`` a single long-poll
+    JSON response instead. Served from the in-process event bus; only jobs running on another
+    node are read from the database (column-only, every ``job_events_db_poll_seconds``).
+    """
+    settings = get_settings()
+    # the SSE generator outlives the request (and get_db's cleanup): each poll opens its own
+    # short-lived session instead of holding the request's connection for the whole stream
+    session_factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+
+    async def load_state() -> dict | None:
+        async with session_factory() as session:
+            row = (
+                await session.execute(
+                    select(*(getattr(Job, field) for field in STATE_FIELDS)).where(Job.id == job_id)
+                )
+            ).first()
+        if row is None:
+            return None
+        return {"job_id": job_id, **row._asdict(), "seq": 0}
+
+    initial = job_events.latest(job_id) or await load_state()
+    if initial is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if wait is not None:
+        event = await wait_for_job_event(
+            job_id,
+            after_seq=after_seq,
+            timeout=wait,
+            load_state=load_state,
+            db_poll=settings.job_events_db_poll_seconds,
+        )
+        return JobEvent(**(event or initial))
+
+    return StreamingResponse(
+        stream_job_events(
+            job_id,
+            initial,
+            load_state=load_state,
+            keepalive=settings.job_events_keepalive_seconds,
+            db_poll=settings.job_events_db_poll_seconds,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/projects/{project_id}/jobs", response_model=list[JobRead])
 async def list_jobs_for_project(
     project_id: int,
@@ -68,9 +195,26 @@ async def cancel_job(job_id: int, db: AsyncSession = Depends(get_db)):
         job.cancellation_requested = True
     await db.commit()
     await db.refresh(job)
+    # job running in this process: interrupt it now instead of waiting for the worker's DB poll
+    request_cancellation(job.id)
+    publish_job(job)
     return job
 
 
+@router.post("/jobs/{job_id}/retry", response_model=JobRead)
+async def retry_job_endpoint(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Failed/cancelled job'u kuyruğa geri koyar; son tamamlanan pass'ten devam eder."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        return await retry_job(db, job)
+    except InvalidJobTransition:
+        raise HTTPException(status_code=409, detail="Only failed or cancelled jobs can be retried")
+    except DuplicateJobActive as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
 @router.post("/jobs/run-next", response_model=JobRead | None)
 async def run_next_job(db: AsyncSession = Depends(get_db)):
     # simple admin/test endpoint to kick worker once
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.session import get_db
 from app.observability.metrics import render_metrics
+from app.services.job_stats import refresh_job_queue_metrics
 
 router = APIRouter()
 
 
 @router.get("/metrics")
-async def metrics_endpoint():
+async def metrics_endpoint(db: AsyncSession = Depends(get_db)):
+    await refresh_job_queue_metrics(db)
     data = render_metrics()
     return Response(content=data, media_type="text/plain; version=0.0.4")
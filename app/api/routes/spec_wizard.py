@@ -5,16 +5,12 @@ from sqlalchemy import select
 from app.core.enums import ApprovalStatus, StepType, StepStatus
 from app.db.session import get_db
 from app.deps.spec_lock import ensure_project_unlocked
+from app.models.job import Job
 from app.models.project import Project, ProjectStep, ProjectObjective, TechStackOption, Feature, ArchitectureComponent
 from app.models.quality import DoDItem, NFRItem, RiskItem
+from app.schemas.jobs import JobRead
 from app.schemas.spec_wizard import WizardDetail, WizardSummary, StepSummary
-from app.services.objective_step import run_objective_step
-from app.services.quality_steps import run_quality_steps
-from app.services.spec_steps import (
-    run_architecture_step,
-    run_feature_step,
-    run_tech_stack_step,
-)
+from app.services.job_engine import create_job_for_spec_step
 
 router = APIRouter()
 
@@ -26,59 +22,55 @@ async def _ensure_project(db: AsyncSession, project_id: int) -> Project:
     return project
 
 
-@router.post("/projects/{project_id}/steps/objective/run")
+async def _enqueue_step(db: AsyncSession, project_id: int, step_type: StepType) -> Job:
+    project = await _ensure_project(db, project_id)
+    return await create_job_for_spec_step(db, project, step_type)
+
+
+@router.post("/projects/{project_id}/steps/objective/run", status_code=202, response_model=JobRead)
 async def run_objective(
     project_id: int,
     db: AsyncSession = Depends(get_db),
     _lock_guard: None = Depends(ensure_project_unlocked),
 ):
-    await _ensure_project(db, project_id)
-    objectives = await run_objective_step(db, project_id)
-    return {"step_type": StepType.OBJECTIVE, "count": len(objectives)}
+    """Step'i arka planda çalışacak bir job olarak kuyruğa koyar; ilerleme /jobs/{id}/events'ten izlenir."""
+    return await _enqueue_step(db, project_id, StepType.OBJECTIVE)
 
 
-@router.post("/projects/{project_id}/steps/tech-stack/run")
+@router.post("/projects/{project_id}/steps/tech-stack/run", status_code=202, response_model=JobRead)
 async def run_tech_stack(
     project_id: int,
     db: AsyncSession = Depends(get_db),
     _lock_guard: None = Depends(ensure_project_unlocked),
 ):
-    await _ensure_project(db, project_id)
-    options = await run_tech_stack_step(db, project_id)
-    return {"step_type": StepType.TECH_STACK, "count": len(options)}
+    return await _enqueue_step(db, project_id, StepType.TECH_STACK)
 
 
-@router.post("/projects/{project_id}/steps/features/run")
+@router.post("/projects/{project_id}/steps/features/run", status_code=202, response_model=JobRead)
 async def run_features(
     project_id: int,
     db: AsyncSession = Depends(get_db),
     _lock_guard: None = Depends(ensure_project_unlocked),
 ):
-    await _ensure_project(db, project_id)
-    feats = await run_feature_step(db, project_id)
-    return {"step_type": StepType.FEATURES, "count": len(feats)}
+    return await _enqueue_step(db, project_id, StepType.FEATURES)
 
 
-@router.post("/projects/{project_id}/steps/architecture/run")
+@router.post("/projects/{project_id}/steps/architecture/run", status_code=202, response_model=JobRead)
 async def run_architecture(
     project_id: int,
     db: AsyncSession = Depends(get_db),
     _lock_guard: None = Depends(ensure_project_unlocked),
 ):
-    await _ensure_project(db, project_id)
-    comps = await run_architecture_step(db, project_id)
-    return {"step_type": StepType.ARCHITECTURE, "count": len(comps)}
+    return await _enqueue_step(db, project_id, StepType.ARCHITECTURE)
 
 
-@router.post("/projects/{project_id}/steps/quality/run")
+@router.post("/projects/{project_id}/steps/quality/run", status_code=202, response_model=JobRead)
 async def run_quality(
     project_id: int,
     db: AsyncSession = Depends(get_db),
     _lock_guard: None = Depends(ensure_project_unlocked),
 ):
-    await _ensure_project(db, project_id)
-    dod, nfr, risks = await run_quality_steps(db, project_id)
-    return {"step_type": StepType.DOD, "dod": len(dod), "nfr": len(nfr), "risks": len(risks)}
+    return await _enqueue_step(db, project_id, StepType.DOD)
 
 
 async def _get_step_summary(db: AsyncSession, project_id: int, step_type: StepType) -> StepSummary:
@@ -1,6 +1,6 @@
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,7 +9,18 @@ from app.models.project import Project, ProjectStep
 from app.models.planning import Epic, Sprint, Task, SprintPlan
 from app.models.job import Job
 from app.models.llm_usage import LLMUsage
-from app.schemas.status import StatusOverview, ProjectDiagnostics, LLMInfo, LLMUpdate
+from app.schemas.status import (
+    StatusOverview,
+    ProjectDiagnostics,
+    LLMCircuitState,
+    LLMInfo,
+    LLMUpdate,
+    JobQueueStats,
+    LLMUsageRollup,
+)
+from app.services.job_stats import job_queue_snapshot
+from app.services.llm_logs import llm_call_rollup
+from app.services.llm_policy import circuit_breaker_snapshots
 from app.core.enums import JobStatus, JobType, TaskStatus
 from app.core.config import get_settings
 
@@ -36,14 +47,22 @@ async def get_status_overview(db: AsyncSession = Depends(get_db)):
         jobs=jobs,
         llm_calls_today=llm_usage or 0,
         llm_quota_limit=None,
+        job_queue=JobQueueStats(**await job_queue_snapshot(db)),
     )
 
 
+def _llm_circuits(settings) -> list[LLMCircuitState]:
+    # birincil + fallback provider'ların breaker durumu (henüz çağrılmamışsa closed)
+    providers = [settings.llm_provider] + [p.partition(":")[0].strip() for p in settings.llm_fallback_providers]
+    return [LLMCircuitState(**snap) for snap in circuit_breaker_snapshots(list(dict.fromkeys(providers)))]
+
+
 @router.get("/status/llm", response_model=LLMInfo)
 async def get_llm_info():
     """
     Aktif LLM sağlayıcısı ve modelini döner.
-    available_models listesi, UI'nin seçim için gösterebileceği bilinen modellerdir.
+    available_models listesi, UI'nin seçim için gösterebileceği bilinen modellerdir;
+    circuits provider zincirindeki circuit breaker durumlarıdır.
     """
     settings = get_settings()
     known_models = [
@@ -59,9 +78,24 @@ async def get_llm_info():
         provider=settings.llm_provider,
         model=settings.llm_model,
         available_models=available,
+        circuits=_llm_circuits(settings),
     )
 
 
+@router.get("/status/llm/usage", response_model=list[LLMUsageRollup])
+async def get_llm_usage(
+    project_id: int | None = None,
+    since_hours: float | None = Query(default=24, gt=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    LLMCallLog roll-up'ı: project / intent / step_type bazında çağrı, cache hit, token ve latency.
+    Varsayılan pencere son 24 saat.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=since_hours) if since_hours else None
+    return await llm_call_rollup(db, project_id=project_id, since=since)
+
+
 @router.post("/status/llm", response_model=LLMInfo)
 async def set_llm(update: LLMUpdate):
     """
@@ -85,6 +119,7 @@ async def set_llm(update: LLMUpdate):
         provider=settings.llm_provider,
         model=settings.llm_model,
         available_models=available,
+        circuits=_llm_circuits(settings),
     )
 
 
@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./app.db"
     log_level: str = "info"
     llm_provider: str = "dummy"
+    llm_dummy_array_items: int = 3  # dummy provider: items per generated array / fine tasks per parent
     llm_model: str = "gpt-4.1-mini"
     llm_api_key: str | None = None
     llm_temperature: float = 0.2
@@ -18,6 +19,53 @@ class Settings(BaseSettings):
     llm_max_backoff_seconds: float = 3.0
     llm_job_max_calls: int = 50
     llm_project_daily_max_calls: int = 500
+    llm_base_url: str | None = None
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 10.0
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_rate_limit_rpm: int = 0  # provider requests/minute; 0 = unlimited
+    llm_rate_limit_tpm: int = 0  # provider tokens/minute (estimated); 0 = unlimited
+    llm_rate_limit_store_path: str | None = None  # shared bucket file for multiple worker processes
+    llm_rate_limit_completion_tokens: int = 1000  # expected completion size when max_tokens is unset
+    llm_fallback_providers: list[str] = []  # "provider" or "provider:model", tried in order after llm_provider
+    llm_provider_timeouts: dict[str, float] = {}  # per-provider call timeout in seconds; unset = no extra timeout
+    llm_hedge_enabled: bool = False  # duplicate slow calls to the first fallback provider
+    llm_hedge_min_samples: int = 20  # observed latencies needed before hedging
+    llm_hedge_min_delay_seconds: float = 1.0  # never hedge earlier than this
+    llm_circuit_enabled: bool = True
+    llm_circuit_window_seconds: float = 60.0  # rolling window for error rate
+    llm_circuit_min_calls: int = 10  # calls in window before the breaker may open
+    llm_circuit_error_rate: float = 0.5  # failed (or slow) share of calls that opens the breaker
+    llm_circuit_slow_call_seconds: float = 30.0  # slower calls (streams: first chunk) are failures; 0 = off
+    llm_circuit_open_seconds: float = 30.0  # fail fast this long before a half-open trial
+    llm_circuit_half_open_calls: int = 1  # trial calls allowed while half-open
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+    llm_cache_memory_entries: int = 256
+    llm_cache_db_max_entries: int = 5000
+    llm_cache_evict_interval_seconds: float = 60.0  # DB cache eviction runs at most this often per process
+    worker_concurrency: int = 4
+    worker_poll_min_seconds: float = 0.5
+    worker_poll_max_seconds: float = 10.0
+    worker_shutdown_grace_seconds: float = 30.0
+    job_lease_seconds: float = 60.0
+    job_heartbeat_seconds: float = 15.0
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 60.0
+    job_retry_max_backoff_seconds: float = 1800.0
+    job_reaper_interval_seconds: float = 30.0
+    job_project_max_concurrency: int = 4  # 0 = unlimited
+    job_events_db_poll_seconds: float = 2.0
+    job_plan_max_parallel: int = 3
+    task_pass1_max_parallel: int = 4  # concurrent per-epic LLM calls in pass1
+    task_refine_batch_tokens: int = 3000  # pass2/pass3 prompt budget per batch; 0 = one prompt per sprint
+    task_refine_max_parallel: int = 4  # concurrent pass2/pass3 batch calls
+    job_plan_rollup_seconds: float = 1.0
+    job_events_keepalive_seconds: float = 15.0
+    job_cancel_poll_seconds: float = 1.0
+    job_progress_flush_ms: int = 1000  # progress ticks are written to jobs at most this often
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -58,6 +58,12 @@ class TaskGranularity(str, Enum):
 
 class JobType(str, Enum):
     TASK_PIPELINE_FOR_SPRINT = "task_pipeline_for_sprint"
+    TASK_PIPELINE_FOR_PLAN = "task_pipeline_for_plan"
+    SPEC_OBJECTIVE = "spec_objective"
+    SPEC_TECH_STACK = "spec_tech_stack"
+    SPEC_FEATURES = "spec_features"
+    SPEC_ARCHITECTURE = "spec_architecture"
+    SPEC_QUALITY = "spec_quality"
 
 
 class JobStatus(str, Enum):
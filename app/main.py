@@ -1,18 +1,28 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.core.config import get_settings
-from app.services.llm_policy import LLMQuotaExceeded, LLMJobBudgetExceeded
+from app.services.llm_adapter import close_llm_clients
+from app.services.llm_policy import LLMCircuitOpen, LLMQuotaExceeded, LLMJobBudgetExceeded
 from app.observability.logging import init_logging
 from app.observability.middleware import RequestContextMiddleware, RequestLoggingMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # paylaşılan LLM HTTP pool'unu kapat
+    await close_llm_clients()
+
+
 def create_app() -> FastAPI:
     init_logging()
     settings = get_settings()
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:3000"],
@@ -32,6 +42,14 @@ def create_app() -> FastAPI:
     async def handle_budget_exceeded(request, exc):  # type: ignore[override]
         return JSONResponse(status_code=400, content={"detail": str(exc)})
 
+    @app.exception_handler(LLMCircuitOpen)
+    async def handle_circuit_open(request, exc):  # type: ignore[override]
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(int(exc.retry_after), 1))},
+        )
+
     return app
 
 
@@ -0,0 +1,175 @@
+"""
+Local OpenAI-compatible chat-completions server for load tests.
+
+    python -m app.mock_llm_server --port 8900 --latency-median-ms 400 --latency-p95-ms 2500 \
+        --tokens-per-second 80 --error-429-rate 0.05 --error-500-rate 0.02 --malformed-rate 0.01
+
+Point the app at it with ``LLM_PROVIDER=mock`` (``LLM_BASE_URL`` defaults to
+``http://127.0.0.1:8900/v1``). Responses are synthesized from the ``response_format`` JSON schema
+the ``mock`` provider sends, so every ``schemas/llm`` model validates. Latency is log-normal
+(median/p95), completion tokens are paced at ``tokens_per_second`` (streamed as SSE when
+``stream=true``), and 429/500/malformed-JSON responses are injected at the configured rates.
+``GET /stats`` returns request counters.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.llm_policy import estimate_tokens
+from app.services.llm_synthetic import synthesize_response
+
+# p95 = median * exp(1.645 * sigma) for a log-normal distribution
+_Z95 = 1.6449
+
+
+@dataclass
+class MockLLMConfig:
+    latency_median_ms: float = 200.0
+    latency_p95_ms: float = 800.0
+    tokens_per_second: float = 0.0  # 0 = completion is returned at once
+    error_429_rate: float = 0.0
+    error_500_rate: float = 0.0
+    malformed_rate: float = 0.0
+    array_items: int = 3
+    stream_chunk_chars: int = 32
+    seed: int | None = None
+
+
+def sample_latency_seconds(config: MockLLMConfig, rng: random.Random) -> float:
+    """Median/p95'e uyan log-normal gecikme."""
+    if config.latency_median_ms <= 0:
+        return 0.0
+    p95 = max(config.latency_p95_ms, config.latency_median_ms)
+    sigma = math.log(p95 / config.latency_median_ms) / _Z95
+    return rng.lognormvariate(math.log(config.latency_median_ms), sigma) / 1000
+
+
+def _error(status: int, message: str, kind: str) -> JSONResponse:
+    headers = {"Retry-After": "1"} if status == 429 else None
+    return JSONResponse({"error": {"message": message, "type": kind}}, status_code=status, headers=headers)
+
+
+def create_mock_llm_app(config: MockLLMConfig | None = None) -> FastAPI:
+    config = config or MockLLMConfig()
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "ok": 0, "rate_limited": 0, "server_error": 0, "malformed": 0}
+    app = FastAPI(title="Mock LLM")
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(sample_latency_seconds(config, rng))
+
+        roll = rng.random()
+        if roll < config.error_429_rate:
+            stats["rate_limited"] += 1
+            return _error(429, "Rate limit reached (mock)", "rate_limit_exceeded")
+        if roll < config.error_429_rate + config.error_500_rate:
+            stats["server_error"] += 1
+            return _error(500, "Internal error (mock)", "server_error")
+
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("schema")
+        payload = synthesize_response(schema, prompt, array_items=config.array_items) if schema else {}
+        content = json.dumps(payload, ensure_ascii=False)
+        if rng.random() < config.malformed_rate:
+            stats["malformed"] += 1
+            content = content[: len(content) // 2]
+        else:
+            stats["ok"] += 1
+
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        generation_seconds = (
+            usage["completion_tokens"] / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        )
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock")
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(content, completion_id, model, generation_seconds, config.stream_chunk_chars),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(generation_seconds)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ],
+            "usage": usage,
+        }
+
+    return app
+
+
+async def _stream(
+    content: str, completion_id: str, model: str, generation_seconds: float, chunk_chars: int
+) -> AsyncIterator[str]:
+    chunks = [content[i : i + chunk_chars] for i in range(0, len(content), max(chunk_chars, 1))]
+    delay = generation_seconds / len(chunks) if chunks else 0.0
+    for piece in chunks:
+        await asyncio.sleep(delay)
+        event = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:  # pragma: no cover - process entrypoint
+    defaults = MockLLMConfig()
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-median-ms", type=float, default=defaults.latency_median_ms)
+    parser.add_argument("--latency-p95-ms", type=float, default=defaults.latency_p95_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--error-429-rate", type=float, default=defaults.error_429_rate)
+    parser.add_argument("--error-500-rate", type=float, default=defaults.error_500_rate)
+    parser.add_argument("--malformed-rate", type=float, default=defaults.malformed_rate)
+    parser.add_argument("--array-items", type=int, default=defaults.array_items)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover - process entrypoint
+    import uvicorn
+
+    args = _parse_args(argv)
+    config = MockLLMConfig(
+        latency_median_ms=args.latency_median_ms,
+        latency_p95_ms=args.latency_p95_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_429_rate=args.error_429_rate,
+        error_500_rate=args.error_500_rate,
+        malformed_rate=args.malformed_rate,
+        array_items=args.array_items,
+        seed=args.seed,
+    )
+    uvicorn.run(create_mock_llm_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
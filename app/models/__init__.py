@@ -27,6 +27,7 @@ from app.models.imports import (
     ProjectSpecSnapshot,
 )
 from app.models.llm_usage import LLMUsage
+from app.models.llm_cache import LLMResponseCache
 
 __all__ = [
     "Project",
@@ -54,4 +55,5 @@ __all__ = [
     "Comment",
     "LLMCallLog",
     "LLMUsage",
+    "LLMResponseCache",
 ]
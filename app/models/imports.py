@@ -118,8 +118,14 @@ class LLMCallLog(BaseModelMixin, Base):
     request_payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     response_payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     status: Mapped[str] = mapped_column(String(20), default="pending")
+    intent: Mapped[str | None] = mapped_column(String(50), nullable=True)
     tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    attempt: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # hit / coalesced / miss / bypass / disabled
+    cache_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
 
     project: Mapped["Project | None"] = relationship(
         "Project", back_populates="llm_call_logs"
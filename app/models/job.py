@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.enums import JobStatus, JobType
@@ -8,9 +8,25 @@ from app.db.base import Base
 from app.models.project import Project
 from app.models.planning import Sprint
 
+# Statuses in which an identical submission is folded into the existing job.
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+_ACTIVE_JOB_FILTER = text("status IN ('queued', 'running')")
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # at most one queued/running job per (type, project, sprint, payload) — see job_dedup_key
+        Index(
+            "ux_jobs_active_dedup_key",
+            "dedup_key",
+            unique=True,
+            sqlite_where=_ACTIVE_JOB_FILTER,
+            postgresql_where=_ACTIVE_JOB_FILTER,
+        ),
+        UniqueConstraint("idempotency_key", name="uq_jobs_idempotency_key"),
+        # claim scans: queued jobs in arrival order (0019_add_job_locked_by)
+        Index("ix_jobs_status_created", "status", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     project_id: Mapped[int] = mapped_column(
@@ -19,12 +35,19 @@ class Job(Base):
     sprint_id: Mapped[int | None] = mapped_column(
         ForeignKey("sprints.id", ondelete="CASCADE"), nullable=True
     )
+    parent_job_id: Mapped[int | None] = mapped_column(
+        ForeignKey("jobs.id", ondelete="CASCADE"), nullable=True, index=True
+    )
     type: Mapped[JobType] = mapped_column(String(64), nullable=False)
     status: Mapped[JobStatus] = mapped_column(
         String(32), nullable=False, default=JobStatus.QUEUED.value
     )
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     payload_json: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    dedup_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(128), nullable=True)
     result_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    checkpoint_json: Mapped[str | None] = mapped_column(Text, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     progress_pct: Mapped[int | None] = mapped_column(Integer, nullable=True)
     current_step: Mapped[str | None] = mapped_column(String(64), nullable=True)
@@ -32,6 +55,10 @@ class Job(Base):
         nullable=False, default=False, server_default="0"
     )
     locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    locked_by: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    run_after: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -25,12 +25,80 @@ jobs_in_progress = Gauge(
     ["type"],
 )
 
+jobs_reaped_total = Counter(
+    "masper_jobs_reaped_total",
+    "Lease süresi dolan ve reaper tarafından toplanan job sayısı",
+    ["outcome"],
+)
+
+job_queue_depth = Gauge(
+    "masper_job_queue_depth",
+    "Kuyrukta bekleyen / çalışan job sayısı (scrape anında DB'den okunur)",
+    ["type", "status"],
+)
+
+job_oldest_queued_age_seconds = Gauge(
+    "masper_job_oldest_queued_age_seconds",
+    "Çalıştırılabilir durumda bekleyen en eski job'un yaşı",
+    ["type"],
+)
+
+job_queue_wait_seconds = Histogram(
+    "masper_job_queue_wait_seconds",
+    "Job'un çalıştırılabilir olmasından worker'ın başlatmasına kadar geçen süre",
+    ["type"],
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+)
+
+job_pass_duration_seconds = Histogram(
+    "masper_job_pass_duration_seconds",
+    "Task pipeline pass süreleri (part: total / llm / db)",
+    ["pass", "part"],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
 llm_calls_total = Counter(
     "masper_llm_calls_total",
     "LLM çağrı sayısı",
     ["intent", "outcome"],
 )
 
+llm_cache_lookups_total = Counter(
+    "masper_llm_cache_lookups_total",
+    "LLM yanıt cache sorguları (memory_hit / db_hit / miss / bypass)",
+    ["outcome"],
+)
+
+llm_rate_limit_wait_seconds = Histogram(
+    "masper_llm_rate_limit_wait_seconds",
+    "Provider RPM/TPM token bucket'ında kapasite için beklenen süre",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+llm_provider_calls_total = Counter(
+    "masper_llm_provider_calls_total",
+    "Provider bazında ham LLM çağrıları (success / error / timeout)",
+    ["provider", "outcome"],
+)
+
+llm_hedged_calls_total = Counter(
+    "masper_llm_hedged_calls_total",
+    "Yavaş provider çağrısı için ikinci provider'a gönderilen hedge istekleri (fired / won)",
+    ["outcome"],
+)
+
+llm_circuit_state = Gauge(
+    "masper_llm_circuit_state",
+    "Provider circuit breaker durumu (0 = closed, 1 = half_open, 2 = open)",
+    ["provider"],
+)
+
+llm_circuit_transitions_total = Counter(
+    "masper_llm_circuit_transitions_total",
+    "Circuit breaker durum geçişleri (geçilen durum)",
+    ["provider", "state"],
+)
+
 
 def render_metrics() -> bytes:
     return generate_latest()
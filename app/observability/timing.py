@@ -0,0 +1,64 @@
+"""
+Pipeline pass süreleri: toplam süre, LLM'de ve DB'de geçen kısım.
+
+``track_pass`` aktif pass'i bir ContextVar'a koyar; LLM adapter ``add_llm_time`` ile, SQLAlchemy
+cursor event'leri de otomatik olarak DB süresini o pass'e ekler. Pass bitince üçü de
+``masper_job_pass_duration_seconds{pass,part}`` histogramına yazılır.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.observability import metrics
+
+
+@dataclass
+class PassTimings:
+    name: str
+    llm_seconds: float = 0.0
+    db_seconds: float = 0.0
+
+
+_current_pass: ContextVar[PassTimings | None] = ContextVar("current_pass", default=None)
+
+
+@contextmanager
+def track_pass(name: str) -> Iterator[PassTimings]:
+    timings = PassTimings(name)
+    token = _current_pass.set(timings)
+    started = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _current_pass.reset(token)
+        hist = metrics.job_pass_duration_seconds
+        hist.labels(name, "total").observe(time.perf_counter() - started)
+        hist.labels(name, "llm").observe(timings.llm_seconds)
+        hist.labels(name, "db").observe(timings.db_seconds)
+
+
+def add_llm_time(seconds: float) -> None:
+    timings = _current_pass.get()
+    if timings is not None:
+        timings.llm_seconds += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    if _current_pass.get() is not None:
+        # bir connection aynı anda tek cursor çalıştırır
+        conn.info["pass_query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    timings = _current_pass.get()
+    started = conn.info.pop("pass_query_started", None)
+    if timings is not None and started is not None:
+        timings.db_seconds += time.perf_counter() - started
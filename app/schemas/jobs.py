@@ -8,14 +8,22 @@ class JobRead(BaseModel):
     id: int
     project_id: int
     sprint_id: Optional[int] = None
+    parent_job_id: Optional[int] = None
     type: str
     status: str
+    priority: int = 0
     payload_json: str
+    idempotency_key: Optional[str] = None
     result_json: Optional[str] = None
+    checkpoint_json: Optional[str] = None
     error_message: Optional[str] = None
     progress_pct: Optional[int] = None
     current_step: Optional[str] = None
     cancellation_requested: bool = False
+    locked_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    run_after: Optional[datetime] = None
+    attempts: int = 0
     created_at: datetime
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
@@ -26,3 +34,22 @@ class JobRead(BaseModel):
 class JobCreateTaskPipeline(BaseModel):
     project_id: int = Field(..., description="Proje id")
     sprint_id: int = Field(..., description="Sprint id")
+    priority: int = Field(0, description="Yüksek değer önce çalışır")
+    run_after: Optional[datetime] = Field(None, description="Bu zamandan önce çalıştırılmaz (UTC)")
+
+
+class JobCreatePlanPipeline(BaseModel):
+    project_id: int = Field(..., description="Proje id")
+    sprint_plan_id: int = Field(..., description="Sprint plan id")
+    priority: int = Field(0, description="Yüksek değer önce çalışır")
+    run_after: Optional[datetime] = Field(None, description="Bu zamandan önce çalıştırılmaz (UTC)")
+    max_parallel: Optional[int] = Field(None, ge=1, le=16, description="Aynı anda çalışacak sprint sayısı")
+
+
+class JobEvent(BaseModel):
+    job_id: int
+    status: str
+    progress_pct: Optional[int] = None
+    current_step: Optional[str] = None
+    error_message: Optional[str] = None
+    seq: int = 0
@@ -4,11 +4,19 @@ from typing import Optional
 from pydantic import BaseModel
 
 
+class JobQueueStats(BaseModel):
+    depth: dict[str, dict[str, int]] = {}
+    oldest_queued_age_seconds: dict[str, float] = {}
+    queue_wait_p50_seconds: Optional[float] = None
+    queue_wait_p95_seconds: Optional[float] = None
+
+
 class StatusOverview(BaseModel):
     projects_count: int
     jobs: dict
     llm_calls_today: int
     llm_quota_limit: Optional[int] = None
+    job_queue: Optional[JobQueueStats] = None
 
 
 class ProjectDiagnostics(BaseModel):
@@ -20,12 +28,35 @@ class ProjectDiagnostics(BaseModel):
     last_task_pipeline_job: Optional[dict] = None
 
 
+class LLMCircuitState(BaseModel):
+    provider: str
+    state: str  # closed | open | half_open
+    failure_rate: float
+    calls_in_window: int
+    retry_after_seconds: Optional[float] = None
+
+
 class LLMInfo(BaseModel):
     provider: str
     model: str
     available_models: list[str]
+    circuits: list[LLMCircuitState] = []
 
 
 class LLMUpdate(BaseModel):
     model: str
     provider: str | None = None
+
+
+class LLMUsageRollup(BaseModel):
+    project_id: Optional[int] = None
+    intent: Optional[str] = None
+    step_type: Optional[str] = None
+    calls: int
+    failures: int
+    cache_hits: int
+    prompt_tokens: int
+    completion_tokens: int
+    tokens: int
+    avg_latency_ms: Optional[float] = None
+    max_latency_ms: Optional[int] = None
@@ -0,0 +1,108 @@
+"""
+Cancellation tokens for running jobs.
+
+``start_job`` opens a :func:`cancellation_scope` for the job; the token is kept in a context var so
+``call_llm`` and the per-epic loops can reach it without threading it through every service call.
+:func:`request_cancellation` trips the token of a job running in this process (the cancel endpoint
+calls it directly, workers call it when their DB watcher sees ``cancellation_requested``), and every
+awaitable wrapped in :func:`run_cancellable` is cancelled right away.
+"""
+import asyncio
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class JobCancelled(Exception):
+    """Raised when cancellation_requested is set while running."""
+
+
+class CancellationToken:
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise JobCancelled()
+
+    async def wait(self) -> None:
+        await self._event.wait()
+
+
+_current_token: ContextVar[CancellationToken | None] = ContextVar("job_cancellation", default=None)
+# job_id -> token of the jobs running in this process
+_tokens: dict[int, CancellationToken] = {}
+
+
+@contextmanager
+def cancellation_scope(job_id: int) -> Iterator[CancellationToken]:
+    token = CancellationToken()
+    _tokens[job_id] = token
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+        if _tokens.get(job_id) is token:
+            del _tokens[job_id]
+
+
+def request_cancellation(job_id: int) -> bool:
+    """Trips the token of ``job_id``; False when the job is not running in this process."""
+    token = _tokens.get(job_id)
+    if token is None:
+        return False
+    token.cancel()
+    return True
+
+
+def is_running_here(job_id: int) -> bool:
+    """True while ``job_id`` runs in this process (its progress reaches the local event bus)."""
+    return job_id in _tokens
+
+
+def is_cancelled() -> bool:
+    token = _current_token.get()
+    return token is not None and token.cancelled
+
+
+def raise_if_cancelled() -> None:
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+async def run_cancellable(awaitable: Awaitable[T]) -> T:
+    """
+    Awaits ``awaitable`` unless the current job is cancelled first; then the awaitable is cancelled
+    and :class:`JobCancelled` is raised. Outside a job it is a plain ``await``.
+    """
+    token = _current_token.get()
+    if token is None:
+        return await awaitable
+    token.raise_if_cancelled()
+
+    task = asyncio.ensure_future(awaitable)
+    waiter = asyncio.ensure_future(token.wait())
+    try:
+        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        task.cancel()
+        raise
+    finally:
+        waiter.cancel()
+    if not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        raise JobCancelled()
+    return task.result()
@@ -1,18 +1,43 @@
+import asyncio
+import hashlib
 import json
-from datetime import datetime, timezone
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.enums import JobStatus, JobType, TaskStatus
-from app.models.job import Job
-from app.models.planning import Sprint
+from app.core.config import get_settings
+from app.core.enums import JobStatus, JobType, StepType, TaskStatus
+from app.models.job import ACTIVE_JOB_STATUSES, Job
+from app.models.planning import Sprint, SprintPlan
 from app.models.project import Project
+from app.services.objective_step import run_objective_step
+from app.services.quality_steps import run_quality_steps
+from app.services.spec_steps import run_architecture_step, run_feature_step, run_tech_stack_step
 from app.services.task_generation import generate_draft_tasks_for_sprint
 from app.services.task_refinement import refine_tasks_pass2_for_sprint
 from app.services.task_split import refine_tasks_pass3_for_sprint
-from app.services.llm_policy import LLMQuotaExceeded, LLMJobBudgetExceeded
+from app.services.llm_adapter import LLMError
+from app.services.llm_policy import (
+    LLMCircuitOpen,
+    LLMQuotaExceeded,
+    LLMJobBudgetExceeded,
+    next_quota_reset,
+    reset_job_budget,
+)
+from app.services.job_cancellation import (
+    JobCancelled,
+    cancellation_scope,
+    is_cancelled,
+    request_cancellation,
+)
+from app.services.job_events import job_events, publish_job
 from app.observability.logging import get_logger, set_context, clear_context
 from app.observability import metrics
+from app.observability.timing import track_pass
 
 
 class InvalidJobTransition(Exception):
@@ -23,68 +48,301 @@ class UnsupportedJobTypeError(Exception):
     pass
 
 
-class JobCancelled(Exception):
-    """Raised when cancellation_requested is set while running."""
+class PlanPipelineFailed(Exception):
+    """Raised when one or more sprint pipelines of a plan job failed."""
+
+
+class IdempotencyKeyConflict(Exception):
+    """Raised when an idempotency key is reused for a different job request."""
+
+
+class DuplicateJobActive(Exception):
+    """Raised when retrying a job whose identical twin is already queued or running."""
+
+
+class ProjectSpecLocked(Exception):
+    """Raised when a spec-step job starts after its project's spec was locked."""
+
+# Numeric fields of a sprint pipeline summary that are summed up for plan jobs.
+PIPELINE_SUMMARY_FIELDS = ("draft_tasks", "refined_tasks", "fine_tasks", "ready_for_dev_tasks")
+
+
+@dataclass(frozen=True)
+class JobRetryPolicy:
+    """
+    Automatic retry of a failed run. Errors in ``retry_on`` requeue the job with ``run_after``
+    set (exponential backoff; quota errors wait for the daily quota reset, an open LLM circuit
+    until its half-open trial) until the job has
+    been claimed ``max_attempts`` times; everything else fails the job right away.
+    """
+
+    retry_on: tuple[type[Exception], ...]
+    max_attempts: int
+    backoff_seconds: float
+    max_backoff_seconds: float
+
+    def next_run_after(self, exc: Exception, attempts: int, now: datetime) -> datetime | None:
+        attempts = max(attempts, 1)
+        if not isinstance(exc, self.retry_on) or attempts >= self.max_attempts:
+            return None
+        if isinstance(exc, LLMQuotaExceeded):
+            return max(next_quota_reset(), now)
+        if isinstance(exc, LLMCircuitOpen):
+            # provider'ın half-open denemesine kadar beklemek yeterli
+            return now + timedelta(seconds=max(exc.retry_after, 1.0))
+        delay = min(self.backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+        return now + timedelta(seconds=delay)
+
+
+# Spec-wizard steps run as jobs so the HTTP request does not wait for the LLM.
+SPEC_STEP_JOB_TYPES: dict[StepType, JobType] = {
+    StepType.OBJECTIVE: JobType.SPEC_OBJECTIVE,
+    StepType.TECH_STACK: JobType.SPEC_TECH_STACK,
+    StepType.FEATURES: JobType.SPEC_FEATURES,
+    StepType.ARCHITECTURE: JobType.SPEC_ARCHITECTURE,
+    StepType.DOD: JobType.SPEC_QUALITY,
+    StepType.NFR: JobType.SPEC_QUALITY,
+    StepType.RISKS: JobType.SPEC_QUALITY,
+}
+
+_TRANSIENT_LLM_ERRORS = (LLMQuotaExceeded, LLMCircuitOpen, LLMError, TimeoutError, ConnectionError)
+
+# Per job type: what is worth another run. Budget overruns and bad input are not.
+JOB_RETRYABLE_ERRORS: dict[JobType, tuple[type[Exception], ...]] = {
+    JobType.TASK_PIPELINE_FOR_SPRINT: _TRANSIENT_LLM_ERRORS,
+    # a re-run only repeats the failed sprints
+    JobType.TASK_PIPELINE_FOR_PLAN: (PlanPipelineFailed,),
+    **{job_type: _TRANSIENT_LLM_ERRORS for job_type in set(SPEC_STEP_JOB_TYPES.values())},
+}
+
+
+def job_retry_policy(job_type: JobType) -> JobRetryPolicy:
+    settings = get_settings()
+    return JobRetryPolicy(
+        retry_on=JOB_RETRYABLE_ERRORS.get(job_type, ()),
+        max_attempts=settings.job_max_attempts,
+        backoff_seconds=settings.job_retry_backoff_seconds,
+        max_backoff_seconds=settings.job_retry_max_backoff_seconds,
+    )
+
+
+_JOB_COLUMNS = frozenset(Job.__table__.columns.keys())
+
+# job_id -> monotonic time of the last progress write of a running job, see _update_progress
+_progress_written_at: dict[int, float] = {}
+# jobs whose outcome is being written; their lease ends with the write, see is_job_finishing
+_finishing_jobs: set[int] = set()
+
+
+def is_job_finishing(job_id: int) -> bool:
+    """True while ``start_job`` writes the job's final state (the lease is released by that write)."""
+    return job_id in _finishing_jobs
 
 
 ALLOWED_JOB_TRANSITIONS = {
     JobStatus.QUEUED: {JobStatus.RUNNING, JobStatus.CANCELLED},
-    JobStatus.RUNNING: {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED},
+    JobStatus.RUNNING: {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.QUEUED},
+    # retry: resumes from the job's checkpoint
+    JobStatus.FAILED: {JobStatus.QUEUED},
+    JobStatus.CANCELLED: {JobStatus.QUEUED},
 }
 
 
+def _as_utc(value: datetime | None) -> datetime | None:
+    # naive timestamps from clients are taken as UTC
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def job_dedup_key(job_type: str, project_id: int, sprint_id: int | None, payload_json: str) -> str:
+    """Hash of what a job would do; identical submissions share it."""
+    payload = json.loads(payload_json or "{}")
+    raw = json.dumps([job_type, project_id, sprint_id, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _find_duplicate_job(db: AsyncSession, job: Job) -> Job | None:
+    if job.idempotency_key:
+        existing = await db.scalar(select(Job).where(Job.idempotency_key == job.idempotency_key))
+        if existing is not None:
+            if existing.dedup_key != job.dedup_key:
+                raise IdempotencyKeyConflict(
+                    f"Idempotency key '{job.idempotency_key}' başka bir job isteği için kullanıldı"
+                )
+            return existing
+    return await db.scalar(
+        select(Job).where(Job.dedup_key == job.dedup_key, Job.status.in_(ACTIVE_JOB_STATUSES))
+    )
+
+
+async def _enqueue_job(db: AsyncSession, job: Job, idempotency_key: str | None) -> Job:
+    """
+    Inserts ``job`` unless the same request is already queued/running (or was submitted with the
+    same idempotency key); the existing job is returned then. Concurrent duplicates are caught by
+    the unique indexes on ``dedup_key`` / ``idempotency_key``.
+    """
+    job.dedup_key = job_dedup_key(job.type, job.project_id, job.sprint_id, job.payload_json)
+    job.idempotency_key = idempotency_key
+    existing = await _find_duplicate_job(db, job)
+    if existing is not None:
+        return existing
+
+    db.add(job)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        existing = await _find_duplicate_job(db, job)
+        if existing is None:
+            raise
+        return existing
+    await db.refresh(job)
+    publish_job(job)
+    return job
+
+
 async def create_job_for_task_pipeline(
     db: AsyncSession,
     project: Project,
     sprint: Sprint,
     payload_dict: dict | None = None,
+    *,
+    priority: int = 0,
+    idempotency_key: str | None = None,
+    run_after: datetime | None = None,
 ) -> Job:
     job = Job(
         project_id=project.id,
         sprint_id=sprint.id,
         type=JobType.TASK_PIPELINE_FOR_SPRINT.value,
         status=JobStatus.QUEUED.value,
+        priority=priority,
         payload_json=json.dumps(payload_dict or {}),
         progress_pct=0,
+        run_after=_as_utc(run_after),
     )
-    db.add(job)
-    await db.flush()
-    await db.commit()
-    await db.refresh(job)
-    return job
+    return await _enqueue_job(db, job, idempotency_key)
+
+
+async def create_job_for_plan_pipeline(
+    db: AsyncSession,
+    project: Project,
+    plan: SprintPlan,
+    payload_dict: dict | None = None,
+    *,
+    priority: int = 0,
+    idempotency_key: str | None = None,
+    run_after: datetime | None = None,
+) -> Job:
+    payload = {**(payload_dict or {}), "sprint_plan_id": plan.id}
+    job = Job(
+        project_id=project.id,
+        sprint_id=None,
+        type=JobType.TASK_PIPELINE_FOR_PLAN.value,
+        status=JobStatus.QUEUED.value,
+        priority=priority,
+        payload_json=json.dumps(payload),
+        progress_pct=0,
+        run_after=_as_utc(run_after),
+    )
+    return await _enqueue_job(db, job, idempotency_key)
 
 
-async def _update_progress(db: AsyncSession, job: Job, pct: int, step: str | None) -> None:
+async def create_job_for_spec_step(
+    db: AsyncSession,
+    project: Project,
+    step_type: StepType,
+    payload_dict: dict | None = None,
+    *,
+    idempotency_key: str | None = None,
+) -> Job:
+    job = Job(
+        project_id=project.id,
+        sprint_id=None,
+        type=SPEC_STEP_JOB_TYPES[step_type].value,
+        status=JobStatus.QUEUED.value,
+        priority=0,
+        payload_json=json.dumps(payload_dict or {}),
+        progress_pct=0,
+    )
+    return await _enqueue_job(db, job, idempotency_key)
+
+
+async def _update_progress(
+    db: AsyncSession, job: Job, pct: int, step: str | None, *, persist: bool = False
+) -> None:
+    """
+    Progress is published to subscribers immediately but written to ``jobs`` at most every
+    ``job_progress_flush_ms`` (always with ``persist``, e.g. after a checkpoint). Ticks in between
+    stay on the (dirty) job object and go out with the next write or the final status commit.
+    Each write also picks up ``cancellation_requested`` set through the API.
+    """
     job.progress_pct = pct
     job.current_step = step
-    await db.flush()
+    publish_job(job)
+
+    now = time.monotonic()
+    written_at = _progress_written_at.get(job.id)
+    interval = get_settings().job_progress_flush_ms / 1000
+    if not persist and written_at is not None and now - written_at < interval:
+        return
     await db.commit()
-    await db.refresh(job)
+    await db.refresh(job, attribute_names=["cancellation_requested"])
+    _progress_written_at[job.id] = now
+
+
+def _load_checkpoint(job: Job) -> dict:
+    return json.loads(job.checkpoint_json) if job.checkpoint_json else {}
+
+
+def _save_checkpoint(job: Job, checkpoint: dict) -> None:
+    # persisted by the next _update_progress(..., persist=True)
+    job.checkpoint_json = json.dumps(checkpoint)
 
 
 async def _run_task_pipeline_for_sprint(db: AsyncSession, sprint: Sprint, job: Job) -> dict:
+    """
+    pass1 -> pass2 -> pass3 for one sprint. Each finished pass is checkpointed on the job, so a
+    retried or requeued job continues after the last finished pass instead of paying for the
+    earlier LLM calls again.
+    """
+    checkpoint = _load_checkpoint(job)
+    passes = checkpoint.setdefault("passes", {})
+
     # Pass 1
-    await _update_progress(db, job, 10, "pass1")
-    if job.cancellation_requested:
-        raise JobCancelled()
-    draft_tasks = await generate_draft_tasks_for_sprint(db, sprint, job_id=job.id)
+    if "pass1" not in passes:
+        await _update_progress(db, job, 10, "pass1")
+        if job.cancellation_requested:
+            raise JobCancelled()
+        with track_pass("pass1"):
+            draft_tasks = await generate_draft_tasks_for_sprint(db, sprint, job_id=job.id)
+        passes["pass1"] = {"draft_tasks": len(draft_tasks)}
+        _save_checkpoint(job, checkpoint)
 
     # Pass 2
-    await _update_progress(db, job, 50, "pass2")
-    if job.cancellation_requested:
-        raise JobCancelled()
-    refined = await refine_tasks_pass2_for_sprint(db, sprint, job_id=job.id)
+    if "pass2" not in passes:
+        await _update_progress(db, job, 50, "pass2", persist=True)
+        if job.cancellation_requested:
+            raise JobCancelled()
+        with track_pass("pass2"):
+            refined = await refine_tasks_pass2_for_sprint(db, sprint, job_id=job.id)
+        passes["pass2"] = {"refined_tasks": len(refined)}
+        _save_checkpoint(job, checkpoint)
 
     # Pass 3
-    await _update_progress(db, job, 80, "pass3")
+    await _update_progress(db, job, 80, "pass3", persist=True)
     if job.cancellation_requested:
         raise JobCancelled()
-    fine = await refine_tasks_pass3_for_sprint(db, sprint.id, job_id=job.id)
+    with track_pass("pass3"):
+        fine = await refine_tasks_pass3_for_sprint(db, sprint.id, job_id=job.id)
+    passes["pass3"] = {"fine_tasks": len(fine)}
+    _save_checkpoint(job, checkpoint)
 
     ready_for_dev = len([t for t in fine if t.status == TaskStatus.READY_FOR_DEV])
     summary = {
-        "draft_tasks": len(draft_tasks),
-        "refined_tasks": len(refined),
+        "draft_tasks": passes["pass1"]["draft_tasks"],
+        "refined_tasks": passes["pass2"]["refined_tasks"],
         "fine_tasks": len(fine),
         "ready_for_dev_tasks": ready_for_dev,
     }
@@ -92,6 +350,360 @@ async def _run_task_pipeline_for_sprint(db: AsyncSession, sprint: Sprint, job: J
     return summary
 
 
+async def retry_job(db: AsyncSession, job: Job) -> Job:
+    """
+    Puts a FAILED or CANCELLED job back on the queue. Its checkpoint is kept, so the run
+    resumes after the last finished pass.
+    """
+    _ensure_job_transition(job, JobStatus.QUEUED)
+    if job.dedup_key:
+        twin = await db.scalar(
+            select(Job.id).where(
+                Job.dedup_key == job.dedup_key,
+                Job.status.in_(ACTIVE_JOB_STATUSES),
+                Job.id != job.id,
+            )
+        )
+        if twin is not None:
+            raise DuplicateJobActive(f"Aynı job zaten aktif: #{twin}")
+    for field, value in _REQUEUE_VALUES.items():
+        setattr(job, field, value)
+    job.error_message = None
+    job.cancellation_requested = False
+    job.attempts = 0
+    await db.commit()
+    await db.refresh(job)
+    publish_job(job)
+    return job
+
+
+# Column values that hand a claimed job back to the queue.
+_REQUEUE_VALUES = {
+    "status": JobStatus.QUEUED.value,
+    "locked_by": None,
+    "locked_at": None,
+    "lease_expires_at": None,
+    "started_at": None,
+    "finished_at": None,
+    "progress_pct": 0,
+    "current_step": None,
+    "run_after": None,
+}
+
+
+async def release_jobs_for_worker(db: AsyncSession, worker_id: str) -> int:
+    """
+    Hands every job claimed by ``worker_id`` back to the queue (RUNNING -> QUEUED).
+    Used when a worker shuts down before its in-flight jobs finish.
+    """
+    result = await db.execute(
+        update(Job)
+        .where(
+            Job.locked_by == worker_id,
+            Job.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+        )
+        .values(**_REQUEUE_VALUES)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def renew_lease(db: AsyncSession, job_id: int, worker_id: str, *, lease_seconds: float) -> bool:
+    """
+    Extends the lease of a job still owned by ``worker_id``.
+    Returns False when the lease was lost (job reaped, released or finished).
+    """
+    result = await db.execute(
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.locked_by == worker_id,
+            Job.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+        )
+        .values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def reap_expired_jobs(
+    db: AsyncSession, *, max_attempts: int, now: datetime | None = None
+) -> dict[str, int]:
+    """
+    Recovers jobs whose worker stopped heartbeating: expired leases are requeued while
+    ``attempts < max_attempts`` and failed otherwise. Safe to run from several workers.
+    """
+    now = now or datetime.now(timezone.utc)
+    expired = and_(
+        Job.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+        Job.locked_by.is_not(None),
+        Job.lease_expires_at < now,
+    )
+    failed = await db.execute(
+        update(Job)
+        .where(expired, Job.attempts >= max_attempts)
+        .values(
+            status=JobStatus.FAILED.value,
+            error_message=f"Lease expired after {max_attempts} attempts",
+            locked_by=None,
+            lease_expires_at=None,
+            finished_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    requeued = await db.execute(
+        update(Job)
+        .where(expired, Job.attempts < max_attempts)
+        .values(**_REQUEUE_VALUES)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    counts = {"requeued": requeued.rowcount or 0, "failed": failed.rowcount or 0}
+    for outcome, count in counts.items():
+        if count:
+            metrics.jobs_reaped_total.labels(outcome=outcome).inc(count)
+            get_logger("masper.job", component="reaper").warning(
+                "job.reaped", extra={"outcome": outcome, "count": count}
+            )
+    return counts
+
+
+async def _ensure_child_jobs(db: AsyncSession, job: Job, sprints: list[Sprint]) -> list[int]:
+    """
+    Creates one TASK_PIPELINE_FOR_SPRINT child per sprint, or resets unfinished children when
+    the plan job is re-run. Children are owned by the parent (``locked_by = job:<id>``, no lease)
+    so workers never claim them and the reaper leaves them alone.
+    """
+    owner = f"job:{job.id}"
+    existing = {
+        child.sprint_id: child
+        for child in (
+            await db.execute(select(Job).where(Job.parent_job_id == job.id))
+        ).scalars().all()
+    }
+    for sprint in sprints:
+        if sprint.id in existing:
+            continue
+        child = Job(
+            project_id=job.project_id,
+            sprint_id=sprint.id,
+            parent_job_id=job.id,
+            type=JobType.TASK_PIPELINE_FOR_SPRINT.value,
+            status=JobStatus.QUEUED.value,
+            priority=job.priority,
+            payload_json=json.dumps({"project_id": job.project_id, "sprint_id": sprint.id}),
+            progress_pct=0,
+            locked_by=owner,
+        )
+        db.add(child)
+        existing[sprint.id] = child
+    await db.execute(
+        update(Job)
+        .where(Job.parent_job_id == job.id, Job.status != JobStatus.COMPLETED.value)
+        .values(
+            {**_REQUEUE_VALUES, "locked_by": owner, "error_message": None, "cancellation_requested": False}
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.flush()
+    await db.commit()
+    return [existing[sprint.id].id for sprint in sprints]
+
+
+def _plan_summary(children: list[Job]) -> dict:
+    summary: dict = {
+        "sprints": [],
+        **{field: 0 for field in PIPELINE_SUMMARY_FIELDS},
+        **{status.value: 0 for status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)},
+    }
+    for child in children:
+        result = json.loads(child.result_json) if child.result_json else {}
+        summary["sprints"].append(
+            {"sprint_id": child.sprint_id, "job_id": child.id, "status": child.status, **result}
+        )
+        if child.status in summary:
+            summary[child.status] += 1
+        for field in PIPELINE_SUMMARY_FIELDS:
+            summary[field] += result.get(field, 0)
+    return summary
+
+
+async def _run_task_pipeline_for_plan(db: AsyncSession, job: Job) -> dict:
+    """
+    Fans a plan job out into one sprint pipeline per sprint and runs them concurrently
+    (``max_parallel`` from the payload, else ``job_plan_max_parallel``), each on its own session.
+    Child progress is rolled up into the parent every ``job_plan_rollup_seconds``.
+    """
+    settings = get_settings()
+    payload = json.loads(job.payload_json or "{}")
+    sprints = (
+        await db.execute(
+            select(Sprint)
+            .where(Sprint.sprint_plan_id == payload.get("sprint_plan_id"))
+            .order_by(Sprint.index)
+        )
+    ).scalars().all()
+    if not sprints:
+        raise ValueError("Sprint plan has no sprints")
+
+    child_ids = await _ensure_child_jobs(db, job, sprints)
+    session_factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(max(1, payload.get("max_parallel") or settings.job_plan_max_parallel))
+    finished: dict[int, Job] = {}
+
+    async def run_child(child_id: int) -> None:
+        async with semaphore:
+            async with session_factory() as child_db:
+                child = await child_db.get(Job, child_id)
+                if child.status == JobStatus.QUEUED.value:
+                    child = await start_job(child_db, child)
+                finished[child_id] = child
+
+    def rolled_up_pct() -> int:
+        total = 0
+        for child_id in child_ids:
+            if child_id in finished:
+                total += 100
+            else:
+                state = job_events.latest(child_id)
+                total += (state or {}).get("progress_pct") or 0
+        return total // len(child_ids)
+
+    tasks = [asyncio.create_task(run_child(child_id)) for child_id in child_ids]
+    pending = set(tasks)
+    cancel_sent = False
+    try:
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=settings.job_plan_rollup_seconds)
+            await _update_progress(
+                db, job, min(rolled_up_pct(), 99), f"sprints {len(finished)}/{len(child_ids)}"
+            )
+            if (job.cancellation_requested or is_cancelled()) and not cancel_sent:
+                job.cancellation_requested = True
+                await db.execute(
+                    update(Job)
+                    .where(
+                        Job.parent_job_id == job.id,
+                        Job.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+                    )
+                    .values(cancellation_requested=True)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                for child_id in child_ids:
+                    request_cancellation(child_id)
+                cancel_sent = True
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    for task in tasks:
+        task.result()
+
+    summary = _plan_summary([finished[child_id] for child_id in child_ids])
+    if job.cancellation_requested:
+        job.result_json = json.dumps(summary)
+        raise JobCancelled()
+    failed = summary[JobStatus.FAILED.value] + summary[JobStatus.CANCELLED.value]
+    if failed:
+        job.result_json = json.dumps(summary)
+        raise PlanPipelineFailed(f"{failed}/{len(child_ids)} sprint pipeline başarısız")
+    await _update_progress(db, job, 100, "completed")
+    return summary
+
+
+def _schedule_retry(job: Job, exc: Exception, logger) -> bool:
+    """
+    Requeues a failed run for later when its type's retry policy allows it (the checkpoint is
+    kept, so the next run resumes). Plan children are retried through their parent instead.
+    """
+    if job.parent_job_id is not None:
+        return False
+    now = datetime.now(timezone.utc)
+    run_after = job_retry_policy(JobType(job.type)).next_run_after(exc, job.attempts, now)
+    if run_after is None:
+        return False
+    for field, value in _REQUEUE_VALUES.items():
+        setattr(job, field, value)
+    job.run_after = run_after
+    job.error_message = str(exc)
+    metrics.jobs_total.labels(type=job.type, status="retry_scheduled").inc()
+    logger.warning(
+        "job.retry_scheduled",
+        extra={
+            "job_id": job.id,
+            "project_id": job.project_id,
+            "error": str(exc),
+            "run_after": run_after.isoformat(),
+        },
+    )
+    return True
+
+
+async def _run_spec_step(db: AsyncSession, job: Job) -> dict:
+    """
+    Runs one spec-wizard step; the summary matches what the old synchronous endpoints returned.
+    The spec lock is checked again here: the project may have been locked while the job was queued.
+    """
+    if await db.scalar(select(Project.spec_locked).where(Project.id == job.project_id)):
+        raise ProjectSpecLocked("Project spec is locked. Please clone the project to make changes.")
+    job_type = JobType(job.type)
+    # regenerate: the same prompt must not come back from the response cache
+    bypass_cache = bool(json.loads(job.payload_json or "{}").get("regenerate"))
+    await _update_progress(db, job, 10, job_type.value)
+    if job_type == JobType.SPEC_QUALITY:
+        dod, nfr, risks = await run_quality_steps(db, job.project_id, bypass_cache=bypass_cache)
+        summary = {"step_type": StepType.DOD.value, "dod": len(dod), "nfr": len(nfr), "risks": len(risks)}
+    else:
+        runner, step_type = {
+            JobType.SPEC_OBJECTIVE: (run_objective_step, StepType.OBJECTIVE),
+            JobType.SPEC_TECH_STACK: (run_tech_stack_step, StepType.TECH_STACK),
+            JobType.SPEC_FEATURES: (run_feature_step, StepType.FEATURES),
+            JobType.SPEC_ARCHITECTURE: (run_architecture_step, StepType.ARCHITECTURE),
+        }[job_type]
+        items = await runner(db, job.project_id, bypass_cache=bypass_cache)
+        summary = {"step_type": step_type.value, "count": len(items)}
+    await _update_progress(db, job, 100, "completed")
+    return summary
+
+
+def _owned_by(locked_by: str | None):
+    """Matches rows still claimed by ``locked_by`` (a worker id, ``job:<id>`` or nobody)."""
+    return Job.locked_by.is_(None) if locked_by is None else Job.locked_by == locked_by
+
+
+async def _write_final_state(db: AsyncSession, job: Job, owner: str | None) -> bool:
+    """
+    Writes the outcome of a run only while the row is still RUNNING under ``owner``: a worker whose
+    lease was reaped (the job maybe already claimed again) must not overwrite the new run. Returns
+    False when the row was taken over; ``job`` then holds the current state from the database.
+    """
+    job_id = job.id
+    changes = {
+        attr.key: attr.value
+        for attr in inspect(job).attrs
+        if attr.key in _JOB_COLUMNS and attr.history.has_changes()
+    }
+    # drop the pending ORM changes so no flush writes them unconditionally
+    db.expire(job)
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING.value, _owned_by(owner))
+        .values(**changes)
+        .execution_options(synchronize_session=False)
+    )
+    owned = result.rowcount == 1
+    if owned:
+        await db.commit()
+    else:
+        await db.rollback()
+    await db.refresh(job)
+    return owned
+
+
 def _ensure_job_transition(job: Job, new_status: JobStatus) -> None:
     allowed = ALLOWED_JOB_TRANSITIONS.get(JobStatus(job.status), set())
     if new_status not in allowed:
@@ -105,54 +717,103 @@ async def start_job(db: AsyncSession, job: Job) -> Job:
         job.finished_at = datetime.now(timezone.utc)
         await db.commit()
         await db.refresh(job)
+        publish_job(job)
         return job
 
     _ensure_job_transition(job, JobStatus.RUNNING)
-    set_context(job_id=job.id, project_id=job.project_id, component="worker")
-    job.status = JobStatus.RUNNING.value
-    job.started_at = datetime.now(timezone.utc)
-    await db.flush()
+    owner = job.locked_by
+    # bekleme, job'un çalıştırılabilir olduğu andan (created_at ya da run_after) itibaren sayılır;
+    # run_after silinmez, job_queue_snapshot aynı başlangıcı kullanır
+    ready_at = _as_utc(job.run_after or job.created_at)
+    started_at = datetime.now(timezone.utc)
+    # The in-memory job may be stale: the cancel endpoint can flip a claimed job to CANCELLED (or
+    # the reaper hand it to another worker) before it starts, so only a row that is still queued
+    # and owned by the same claimant is started.
+    started = await db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == JobStatus.QUEUED.value, _owned_by(owner))
+        .values(status=JobStatus.RUNNING.value, started_at=started_at)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
     await db.refresh(job)
+    if started.rowcount != 1:
+        logger.info("job.start_skipped", extra={"job_id": job.id, "status": job.status})
+        return job
+    set_context(job_id=job.id, project_id=job.project_id, component="worker")
+    if ready_at is not None:
+        metrics.job_queue_wait_seconds.labels(type=job.type).observe(
+            max((started_at - ready_at).total_seconds(), 0.0)
+        )
+    publish_job(job)
+    reset_job_budget(job.id)
+    _progress_written_at[job.id] = time.monotonic()
     metrics.jobs_in_progress.labels(type=job.type).inc()
     logger.info("job.started", extra={"job_id": job.id, "project_id": job.project_id, "type": job.type})
 
+    interrupted = False
     try:
-        if JobType(job.type) == JobType.TASK_PIPELINE_FOR_SPRINT:
-            sprint = await db.get(Sprint, job.sprint_id)
-            if not sprint:
-                raise ValueError("Sprint not found for job")
-            result = await _run_task_pipeline_for_sprint(db, sprint, job)
-        else:
-            raise UnsupportedJobTypeError(job.type)
+        with cancellation_scope(job.id):
+            if JobType(job.type) == JobType.TASK_PIPELINE_FOR_SPRINT:
+                sprint = await db.get(Sprint, job.sprint_id)
+                if not sprint:
+                    raise ValueError("Sprint not found for job")
+                result = await _run_task_pipeline_for_sprint(db, sprint, job)
+            elif JobType(job.type) == JobType.TASK_PIPELINE_FOR_PLAN:
+                result = await _run_task_pipeline_for_plan(db, job)
+            elif JobType(job.type) in SPEC_STEP_JOB_TYPES.values():
+                result = await _run_spec_step(db, job)
+            else:
+                raise UnsupportedJobTypeError(job.type)
 
         job.status = JobStatus.COMPLETED.value
         job.result_json = json.dumps(result)
         metrics.jobs_total.labels(type=job.type, status="completed").inc()
         logger.info("job.completed", extra={"job_id": job.id, "project_id": job.project_id})
+    except asyncio.CancelledError:
+        # worker is shutting down; the job is requeued by release_jobs_for_worker
+        interrupted = True
+        logger.warning("job.interrupted", extra={"job_id": job.id, "project_id": job.project_id})
+        raise
     except JobCancelled:
         job.status = JobStatus.CANCELLED.value
         metrics.jobs_total.labels(type=job.type, status="cancelled").inc()
-    except (LLMQuotaExceeded, LLMJobBudgetExceeded) as exc:
-        job.status = JobStatus.FAILED.value
-        job.error_message = str(exc)
-        metrics.jobs_total.labels(type=job.type, status="failed").inc()
-        logger.warning(
-            "job.failed",
-            extra={"job_id": job.id, "project_id": job.project_id, "error": str(exc)},
-        )
+    except (LLMQuotaExceeded, LLMJobBudgetExceeded, LLMCircuitOpen) as exc:
+        if not _schedule_retry(job, exc, logger):
+            job.status = JobStatus.FAILED.value
+            job.error_message = str(exc)
+            metrics.jobs_total.labels(type=job.type, status="failed").inc()
+            logger.warning(
+                "job.failed",
+                extra={"job_id": job.id, "project_id": job.project_id, "error": str(exc)},
+            )
     except Exception as exc:  # noqa: BLE001
-        job.status = JobStatus.FAILED.value
-        job.error_message = str(exc)
-        metrics.jobs_total.labels(type=job.type, status="failed").inc()
-        logger.error(
-            "job.failed",
-            extra={"job_id": job.id, "project_id": job.project_id, "error": str(exc)},
-        )
+        if not _schedule_retry(job, exc, logger):
+            job.status = JobStatus.FAILED.value
+            job.error_message = str(exc)
+            metrics.jobs_total.labels(type=job.type, status="failed").inc()
+            logger.error(
+                "job.failed",
+                extra={"job_id": job.id, "project_id": job.project_id, "error": str(exc)},
+            )
     finally:
-        job.finished_at = datetime.now(timezone.utc)
         metrics.jobs_in_progress.labels(type=job.type).dec()
-        await db.commit()
-        await db.refresh(job)
+        _progress_written_at.pop(job.id, None)
+        if not interrupted:
+            if job.status != JobStatus.QUEUED.value:
+                job.finished_at = datetime.now(timezone.utc)
+            job_id = job.id
+            _finishing_jobs.add(job_id)
+            try:
+                owned = await _write_final_state(db, job, owner)
+            finally:
+                _finishing_jobs.discard(job_id)
+            if owned:
+                publish_job(job)
+            else:
+                logger.warning(
+                    "job.finish_skipped",
+                    extra={"job_id": job.id, "project_id": job.project_id, "locked_by": owner},
+                )
         clear_context()
     return job
@@ -0,0 +1,159 @@
+"""
+In-process pub/sub for job progress.
+
+The job engine publishes a small state snapshot (status, progress_pct, current_step,
+error_message) whenever a job changes; ``GET /jobs/{id}/events`` subscribers are fed from here
+without touching the database. Subscribers whose job runs on another node fall back to a cheap
+column-only DB read every ``job_events_db_poll_seconds``.
+"""
+import asyncio
+import json
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from app.core.enums import JobStatus
+from app.models.job import Job
+from app.services.job_cancellation import is_running_here
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value}
+STATE_FIELDS = ("status", "progress_pct", "current_step", "error_message")
+
+StateLoader = Callable[[], Awaitable[dict[str, Any] | None]]
+
+
+def job_state(job: Job) -> dict[str, Any]:
+    return {field: getattr(job, field) for field in STATE_FIELDS}
+
+
+class JobEventBus:
+    """Latest snapshot per job plus fan-out queues for live subscribers."""
+
+    def __init__(self, max_jobs: int = 1024) -> None:
+        self._latest: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._max_jobs = max_jobs
+
+    def publish(self, job_id: int, state: dict[str, Any]) -> dict[str, Any]:
+        previous = self._latest.get(job_id)
+        event = {"job_id": job_id, **state, "seq": (previous["seq"] if previous else 0) + 1}
+        self._latest[job_id] = event
+        self._latest.move_to_end(job_id)
+        while len(self._latest) > self._max_jobs:
+            self._latest.popitem(last=False)
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+        return event
+
+    def latest(self, job_id: int) -> dict[str, Any] | None:
+        return self._latest.get(job_id)
+
+    @contextmanager
+    def subscribe(self, job_id: int) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def clear(self) -> None:
+        self._latest.clear()
+        self._subscribers.clear()
+
+
+job_events = JobEventBus()
+
+
+def publish_job(job: Job) -> dict[str, Any]:
+    return job_events.publish(job.id, job_state(job))
+
+
+def _same_state(a: dict[str, Any] | None, b: dict[str, Any] | None) -> bool:
+    if a is None or b is None:
+        return a is b
+    return all(a.get(field) == b.get(field) for field in STATE_FIELDS)
+
+
+async def wait_for_job_event(
+    job_id: int,
+    *,
+    after_seq: int,
+    timeout: float,
+    load_state: StateLoader,
+    db_poll: float,
+    known: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Long-poll: returns the first snapshot newer than ``after_seq`` or, on timeout, the current one.
+    Jobs that are not running in this process (see ``is_running_here``) are also watched through
+    ``load_state`` every ``db_poll`` seconds; a DB state differing from ``known`` counts as new.
+    """
+    latest = job_events.latest(job_id)
+    if latest and latest["seq"] > after_seq:
+        return latest
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    baseline = known or latest
+    with job_events.subscribe(job_id) as queue:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                return await asyncio.wait_for(queue.get(), timeout=min(remaining, db_poll))
+            except asyncio.TimeoutError:
+                # a buffered snapshot is not enough: the API publishes jobs it only enqueued or cancelled
+                if is_running_here(job_id):
+                    continue
+            # run by another process (python -m app.worker, another node): fall back to the database
+            state = await load_state()
+            if baseline is None:
+                baseline = state
+            elif not _same_state(state, baseline):
+                return state
+            if state is not None and state["status"] in TERMINAL_STATUSES:
+                return state
+    # timed out: confirm against the DB so a job reaped or finished elsewhere is not missed
+    return await load_state() or job_events.latest(job_id)
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    return f"event: job\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def stream_job_events(
+    job_id: int,
+    initial: dict[str, Any],
+    *,
+    load_state: StateLoader,
+    keepalive: float,
+    db_poll: float,
+) -> AsyncIterator[str]:
+    """Server-Sent Events stream that ends once the job reaches a terminal status."""
+    yield format_sse(initial)
+    last = initial
+    seq = initial.get("seq", 0)
+    while last["status"] not in TERMINAL_STATUSES:
+        event = await wait_for_job_event(
+            job_id,
+            after_seq=seq,
+            timeout=keepalive,
+            load_state=load_state,
+            db_poll=db_poll,
+            known=last,
+        )
+        if event is None:
+            break
+        seq = max(seq, event.get("seq", 0))
+        if _same_state(event, last):
+            yield ": keepalive\n\n"
+            continue
+        yield format_sse(event)
+        last = event
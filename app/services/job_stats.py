@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import JobStatus
+from app.models.job import Job
+from app.observability import metrics
+from app.services.job_worker import _runnable
+
+# p50/p95 bekleme süresi için bakılan pencere
+QUEUE_WAIT_WINDOW = timedelta(hours=1)
+QUEUE_WAIT_SAMPLE_LIMIT = 1000
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite timezone bilgisini saklamıyor; değerler UTC yazılıyor
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def job_queue_snapshot(db: AsyncSession, *, now: datetime | None = None) -> dict:
+    """
+    Kuyruğun anlık durumu (plan job'larının child'ları parent'ın içinde koştuğu için sayılmaz):
+    - ``depth``: type -> status -> adet (queued + running)
+    - ``oldest_queued_age_seconds``: type -> çalıştırılabilir en eski queued job'un yaşı
+    - ``queue_wait_p50_seconds`` / ``queue_wait_p95_seconds``: son bir saatte başlayan job'ların
+      çalıştırılabilir oldukları andan (``run_after``, yoksa ``created_at``) started_at'e kadar
+      bekledikleri süre; ``masper_job_queue_wait_seconds`` histogram'ıyla aynı ölçü
+    """
+    now = now or datetime.now(timezone.utc)
+    depth_rows = (
+        await db.execute(
+            select(Job.type, Job.status, func.count(Job.id))
+            .where(
+                Job.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+                Job.parent_job_id.is_(None),
+            )
+            .group_by(Job.type, Job.status)
+        )
+    ).all()
+    depth: dict[str, dict[str, int]] = {}
+    for job_type, status, count in depth_rows:
+        depth.setdefault(job_type, {})[status] = count
+
+    # ertelenmiş (run_after > now) job'lar henüz beklemiyor; yaş run_after'dan itibaren sayılır
+    ready_at = func.coalesce(Job.run_after, Job.created_at)
+    oldest_rows = (
+        await db.execute(
+            select(Job.type, func.min(ready_at))
+            .where(Job.status == JobStatus.QUEUED.value, Job.parent_job_id.is_(None), _runnable(now))
+            .group_by(Job.type)
+        )
+    ).all()
+    oldest = {
+        job_type: max((now - _as_utc(first)).total_seconds(), 0.0)
+        for job_type, first in oldest_rows
+        if first is not None
+    }
+
+    started_rows = (
+        await db.execute(
+            select(ready_at, Job.started_at)
+            .where(Job.started_at.is_not(None), Job.started_at >= now - QUEUE_WAIT_WINDOW)
+            .order_by(Job.started_at.desc())
+            .limit(QUEUE_WAIT_SAMPLE_LIMIT)
+        )
+    ).all()
+    waits = sorted(
+        max((_as_utc(started) - _as_utc(ready)).total_seconds(), 0.0)
+        for ready, started in started_rows
+        if ready is not None
+    )
+    return {
+        "depth": depth,
+        "oldest_queued_age_seconds": oldest,
+        "queue_wait_p50_seconds": _percentile(waits, 50),
+        "queue_wait_p95_seconds": _percentile(waits, 95),
+    }
+
+
+async def refresh_job_queue_metrics(db: AsyncSession) -> dict:
+    """Queue gauge'larını DB'den tazeler; /metrics scrape'inde çağrılır."""
+    snapshot = await job_queue_snapshot(db)
+    # boşalan type/status kombinasyonları eski değerde takılı kalmasın
+    metrics.job_queue_depth.clear()
+    metrics.job_oldest_queued_age_seconds.clear()
+    for job_type, by_status in snapshot["depth"].items():
+        for status, count in by_status.items():
+            metrics.job_queue_depth.labels(type=job_type, status=status).set(count)
+    for job_type, age in snapshot["oldest_queued_age_seconds"].items():
+        metrics.job_oldest_queued_age_seconds.labels(type=job_type).set(age)
+    return snapshot
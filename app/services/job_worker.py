@@ -1,34 +1,307 @@
-from datetime import datetime, timezone
+import asyncio
+import os
+import random
+import socket
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
 
+from app.core.config import get_settings
 from app.core.enums import JobStatus
 from app.models.job import Job
-from app.services.job_engine import start_job
+from app.observability.logging import get_logger
+from app.services.job_cancellation import request_cancellation
+from app.services.job_engine import is_job_finishing, renew_lease, start_job
 
+# How many queued candidates a worker tries per claim round before re-reading the queue.
+CLAIM_CANDIDATES = 5
+# SQLite answers a contended read->write lock upgrade with an immediate "database is locked"
+# (the busy timeout does not apply); a claim round hitting it is rolled back and retried.
+CLAIM_LOCK_RETRIES = 8
 
-async def process_next_job(db: AsyncSession) -> Optional[Job]:
-    job = (
+SessionFactory = Callable[[], AsyncSession]
+
+
+def default_worker_id() -> str:
+    """host:pid:random — unique across processes and hosts."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _in_flight(model=Job):
+    """
+    Jobs holding a worker slot: running, or claimed and about to start. Plan children are owned
+    by their parent (``locked_by = job:<id>``) and run inside its slot, so they do not count.
+    """
+    return and_(
+        model.parent_job_id.is_(None),
+        or_(
+            model.status == JobStatus.RUNNING.value,
+            and_(model.status == JobStatus.QUEUED.value, model.locked_by.is_not(None)),
+        ),
+    )
+
+
+def _runnable(now: datetime):
+    """Queued jobs whose ``run_after`` (retry backoff / scheduled start) has passed."""
+    return or_(Job.run_after.is_(None), Job.run_after <= now)
+
+
+async def _in_flight_by_project(db: AsyncSession) -> dict[int, int]:
+    """Claimed or running jobs per project (the load each tenant currently holds)."""
+    rows = (
         await db.execute(
-            select(Job).where(Job.status == JobStatus.QUEUED.value).order_by(Job.created_at).limit(1)
+            select(Job.project_id, func.count(Job.id))
+            .where(_in_flight())
+            .group_by(Job.project_id)
+        )
+    ).all()
+    return {project_id: count for project_id, count in rows}
+
+
+async def select_claim_candidates(
+    db: AsyncSession, *, project_max_concurrency: int | None, limit: int = CLAIM_CANDIDATES
+) -> list[int]:
+    """
+    Returns queued job ids in fair-share claim order.
+
+    Higher ``priority`` always goes first. Within a priority, projects are served round-robin by
+    load: a project's n-th queued job ranks as if the project already had n more jobs in flight,
+    so one project with 30 queued pipelines interleaves with everyone else instead of starving
+    them. Projects at ``project_max_concurrency`` are skipped entirely.
+    """
+    ranked = (
+        select(
+            Job.id,
+            Job.project_id,
+            Job.priority,
+            Job.created_at,
+            func.row_number()
+            .over(
+                partition_by=Job.project_id,
+                order_by=(Job.priority.desc(), Job.created_at, Job.id),
+            )
+            .label("rn"),
         )
-    ).scalars().first()
+        .where(
+            Job.status == JobStatus.QUEUED.value,
+            Job.locked_by.is_(None),
+            _runnable(datetime.now(timezone.utc)),
+        )
+        .subquery()
+    )
+    rows = (await db.execute(select(ranked).where(ranked.c.rn <= limit))).all()
+    if not rows:
+        return []
+
+    in_flight = await _in_flight_by_project(db)
+    if project_max_concurrency:
+        rows = [r for r in rows if in_flight.get(r.project_id, 0) < project_max_concurrency]
+    rows.sort(
+        key=lambda r: (-r.priority, in_flight.get(r.project_id, 0) + r.rn, r.created_at, r.id)
+    )
+    return [r.id for r in rows[:limit]]
+
+
+async def claim_next_job(
+    db: AsyncSession,
+    worker_id: str,
+    *,
+    lease_seconds: float | None = None,
+    project_max_concurrency: int | None = None,
+) -> Optional[Job]:
+    """
+    Atomically claims the next queued job for ``worker_id``, in fair-share order
+    (see ``select_claim_candidates``).
+
+    The claim is a single conditional UPDATE (``WHERE status = queued AND locked_by IS NULL``,
+    ``run_after`` passed, plus the project concurrency cap); only one worker can match the row, on SQLite as well as
+    on Postgres. A successful claim starts a lease and bumps ``attempts``.
+    ``project_max_concurrency`` defaults to settings; 0 disables the cap. A round that loses a
+    SQLite lock upgrade is rolled back and retried with a short jittered backoff.
+    """
+    settings = get_settings()
+    if lease_seconds is None:
+        lease_seconds = settings.job_lease_seconds
+    if project_max_concurrency is None:
+        project_max_concurrency = settings.job_project_max_concurrency
+    attempt = 0
+    while True:
+        try:
+            job_id = await _claim_job_id(
+                db, worker_id, lease_seconds=lease_seconds, project_max_concurrency=project_max_concurrency
+            )
+            break
+        except OperationalError as exc:
+            await db.rollback()
+            if "database is locked" not in str(exc) or attempt >= CLAIM_LOCK_RETRIES:
+                raise
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, 0.01 * 2**attempt))
+    if job_id is None:
+        return None
+    return (
+        await db.execute(select(Job).where(Job.id == job_id).execution_options(populate_existing=True))
+    ).scalars().one()
+
+
+async def _claim_job_id(
+    db: AsyncSession, worker_id: str, *, lease_seconds: float, project_max_concurrency: int
+) -> Optional[int]:
+    """One claim attempt; returns the id of the job now locked by ``worker_id`` (committed)."""
+    while True:
+        candidate_ids = await select_claim_candidates(
+            db, project_max_concurrency=project_max_concurrency
+        )
+        if not candidate_ids:
+            await db.commit()
+            return None
+
+        for job_id in candidate_ids:
+            now = datetime.now(timezone.utc)
+            conditions = [
+                Job.id == job_id,
+                Job.status == JobStatus.QUEUED.value,
+                Job.locked_by.is_(None),
+                _runnable(now),
+            ]
+            if project_max_concurrency:
+                other = aliased(Job)
+                project_load = (
+                    select(func.count(other.id))
+                    .where(other.project_id == Job.project_id, _in_flight(other))
+                    .scalar_subquery()
+                )
+                conditions.append(project_load < project_max_concurrency)
+            result = await db.execute(
+                update(Job)
+                .where(*conditions)
+                .values(
+                    locked_by=worker_id,
+                    locked_at=now,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=Job.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                await db.commit()
+                return job_id
+        # every candidate was taken by another worker; release locks and look again
+        await db.commit()
+
+
+async def _heartbeat(
+    session_factory: SessionFactory,
+    job_id: int,
+    worker_id: str,
+    run: asyncio.Task,
+    *,
+    interval: float,
+    lease_seconds: float,
+) -> None:
+    """
+    Renews the job lease every ``interval`` seconds; cancels ``run`` if the lease is lost.
+
+    A failed renewal (e.g. ``database is locked`` while the job's own session holds SQLite's write
+    lock) is logged and retried on the next tick; the job is only given up once the last lease
+    that was actually written has run out.
+    """
+    logger = get_logger("masper.job", component="worker")
+    loop = asyncio.get_running_loop()
+    lease_ends = loop.time() + lease_seconds
+    while True:
+        await asyncio.sleep(interval)
+        renewing_at = loop.time()
+        try:
+            async with session_factory() as hb_db:
+                still_owned = await renew_lease(hb_db, job_id, worker_id, lease_seconds=lease_seconds)
+        except SQLAlchemyError as exc:
+            if loop.time() < lease_ends:
+                logger.warning(
+                    "job.heartbeat_failed",
+                    extra={"job_id": job_id, "worker_id": worker_id, "error": str(exc)},
+                )
+                continue
+            still_owned = False
+        if still_owned:
+            lease_ends = renewing_at + lease_seconds
+            continue
+        if is_job_finishing(job_id):
+            # the run released the lease itself by writing its outcome
+            return
+        logger.warning("job.lease_lost", extra={"job_id": job_id, "worker_id": worker_id})
+        run.cancel()
+        return
+
+
+async def _watch_cancellation(session_factory: SessionFactory, job_id: int, *, interval: float) -> None:
+    """
+    Polls ``cancellation_requested`` (set by the API, possibly on another node) and trips the job's
+    cancellation token, which interrupts in-flight LLM calls instead of waiting for the next pass.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        async with session_factory() as watch_db:
+            requested = await watch_db.scalar(
+                select(Job.cancellation_requested).where(Job.id == job_id)
+            )
+        if requested and request_cancellation(job_id):
+            return
+
+
+async def process_next_job(
+    db: AsyncSession,
+    *,
+    worker_id: str | None = None,
+    session_factory: SessionFactory | None = None,
+) -> Optional[Job]:
+    settings = get_settings()
+    worker_id = worker_id or default_worker_id()
+    job = await claim_next_job(db, worker_id, lease_seconds=settings.job_lease_seconds)
     if not job:
         return None
 
-    # lock marker
-    job.locked_at = datetime.now(timezone.utc)
-    await db.flush()
-    await db.commit()
-    return await start_job(db, job)
+    # Heartbeats need their own session; the job's session is busy running the pipeline.
+    session_factory = session_factory or async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    run = asyncio.create_task(start_job(db, job))
+    heartbeat = asyncio.create_task(
+        _heartbeat(
+            session_factory,
+            job.id,
+            worker_id,
+            run,
+            interval=settings.job_heartbeat_seconds,
+            lease_seconds=settings.job_lease_seconds,
+        )
+    )
+    watcher = asyncio.create_task(
+        _watch_cancellation(session_factory, job.id, interval=settings.job_cancel_poll_seconds)
+    )
+    try:
+        return await run
+    except asyncio.CancelledError:
+        if heartbeat.done() and not heartbeat.cancelled():
+            # lease lost: the reaper already requeued or failed the job
+            return job
+        raise
+    finally:
+        heartbeat.cancel()
+        watcher.cancel()
 
 
-async def run_worker_loop(db: AsyncSession, *, max_jobs: int | None = None) -> None:
+async def run_worker_loop(
+    db: AsyncSession, *, max_jobs: int | None = None, worker_id: str | None = None
+) -> None:
+    worker_id = worker_id or default_worker_id()
     processed = 0
     while True:
-        job = await process_next_job(db)
+        job = await process_next_job(db, worker_id=worker_id)
         if not job:
             break
         processed += 1
@@ -0,0 +1,74 @@
+import json
+from typing import Any
+
+
+class JsonArrayItemParser:
+    """
+    Parça parça gelen bir JSON nesnesinin üst seviye array alanlarındaki nesne/array elemanlarını,
+    kapanır kapanmaz döndürür::
+
+        parser = JsonArrayItemParser()
+        parser.feed('{"tasks": [{"title": "A"}, {"ti')  # -> [("tasks", 0, {"title": "A"})]
+        parser.feed('tle": "B"}]}')                     # -> [("tasks", 1, {"title": "B"})]
+
+    İlk ``{`` öncesindeki metin (ör. markdown code fence) yok sayılır. Array içindeki skaler
+    elemanlar item sayılmaz.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: str | None = None
+        self._key: str | None = None
+        self._array_key: str | None = None
+        self._item_start: int | None = None
+        self._counts: dict[str, int] = {}
+
+    def _in_top_level_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def feed(self, chunk: str) -> list[tuple[str, int, Any]]:
+        self.text += chunk
+        items: list[tuple[str, int, Any]] = []
+        text = self.text
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        # üst seviye nesnede key ya da skaler value
+                        self._last_string = json.loads(text[self._string_start : i + 1])
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and len(self._stack) == 1:
+                self._key = self._last_string
+            elif ch in "{[":
+                if not self._stack and ch != "{":
+                    continue
+                if self._in_top_level_array() and self._item_start is None:
+                    self._item_start = i
+                self._stack.append(ch)
+                if self._in_top_level_array():
+                    self._array_key = self._key
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if self._in_top_level_array() and self._item_start is not None:
+                    key = self._array_key or ""
+                    index = self._counts.get(key, 0)
+                    self._counts[key] = index + 1
+                    items.append((key, index, json.loads(text[self._item_start : i + 1])))
+                    self._item_start = None
+        return items
@@ -1,35 +1,341 @@
 import asyncio
+import contextlib
 import json
 import random
-from typing import Any
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 from pydantic import BaseModel, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.enums import LLMIntent
+from app.services.json_stream import JsonArrayItemParser
+from app.services.job_cancellation import JobCancelled, raise_if_cancelled, run_cancellable
+from app.services.llm_cache import get_cached_response, llm_cache_key, store_cached_response
 from app.services.llm_logs import log_llm_call
 from app.services.llm_policy import (
+    CIRCUIT_OPEN,
+    LLMCircuitOpen,
     LLMJobBudgetExceeded,
     LLMQuotaExceeded,
     backoff_sleep,
     check_and_increment_project_quota,
     check_job_budget,
+    check_provider_circuits,
+    estimate_tokens,
+    get_circuit_breaker,
+    provider_latency_p95,
+    record_provider_latency,
+    refund_job_budget,
+    wait_for_rate_limit,
 )
+from app.services.llm_synthetic import synthesize_response
 from app.observability import metrics
 from app.observability.logging import get_logger
+from app.observability.timing import add_llm_time
 
 
 class LLMError(Exception):
     """LLM çağrısı veya validasyon hatası."""
 
 
-async def _raw_llm_call(prompt: str, *, provider: str, model: str, temperature: float | None, max_tokens: int | None) -> str:
+@dataclass
+class LLMRawResponse:
+    """Provider usage bilgisini de taşıyan ham yanıt; düz ``str`` dönen provider'lar için token'lar tahmin edilir."""
+
+    content: str
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+
+
+class _LeaderGone(Exception):
+    """Single-flight leader'ı sonuç üretmeden durdu (task iptali / shutdown)."""
+
+
+class _ItemCallbackError(Exception):
+    """Streaming ``on_item`` callback'i düştü (ör. DB hatası); asıl hata ``__cause__``'da, provider'a yazılmaz."""
+
+
+# streaming modda her kapanan array elemanı için çağrılır: (alan adı, ör. "tasks"; eleman)
+ItemCallback = Callable[[str, Any], Awaitable[None]]
+# yarıda kalan/geçersiz bir denemenin verdiği elemanlar geri alınırken çağrılır; sonraki deneme baştan verir
+ResetCallback = Callable[[], Awaitable[None]]
+
+# request key -> leader'ın sonucu (model_dump); aynı anda gelen aynı istekler bunu bekler
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def _session_lock(db: AsyncSession | None) -> Any:
+    """
+    Aynı session ile eşzamanlı call_llm'ler (ör. pass1 epic fan-out) quota/cache/log için session'ı
+    sırayla kullanır; provider çağrıları paralel kalır.
+    """
+    if db is None:
+        return contextlib.nullcontext()
+    return db.info.setdefault("llm_session_lock", asyncio.Lock())
+
+
+_openai_client: Any = None
+_mock_client: Any = None
+
+# LLM_PROVIDER=mock için varsayılan adres: python -m app.mock_llm_server
+MOCK_LLM_BASE_URL = "http://127.0.0.1:8900/v1"
+
+
+def _pooled_http_client(**kwargs: Any) -> Any:
+    import httpx
+
+    settings = get_settings()
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        **kwargs,
+    )
+
+
+def _get_openai_client() -> Any:
+    """
+    Process başına tek ``openai.AsyncOpenAI`` client'ı; altındaki httpx pool'u bağlantıları
+    keep-alive ile yeniden kullanır. Retry'ı ``call_llm`` yaptığı için SDK retry'ı kapalı.
+    """
+    global _openai_client
+    if _openai_client is None:
+        try:
+            import openai  # type: ignore
+        except ImportError as exc:
+            raise LLMError("openai paketi yüklü değil. pip install openai ile kurun.") from exc
+
+        settings = get_settings()
+        http_client = _pooled_http_client()
+        _openai_client = openai.AsyncOpenAI(
+            api_key=settings.llm_api_key,
+            base_url=settings.llm_base_url,
+            timeout=http_client.timeout,
+            max_retries=0,
+            http_client=http_client,
+        )
+    return _openai_client
+
+
+def _get_mock_client() -> Any:
+    """``mock`` provider'ı için paylaşılan httpx client'ı (OpenAI-uyumlu local server)."""
+    global _mock_client
+    if _mock_client is None:
+        _mock_client = _pooled_http_client(base_url=get_settings().llm_base_url or MOCK_LLM_BASE_URL)
+    return _mock_client
+
+
+async def close_llm_clients() -> None:
+    """Paylaşılan provider client'larını kapatır (FastAPI lifespan / worker shutdown)."""
+    global _openai_client, _mock_client
+    client, _openai_client = _openai_client, None
+    if client is not None:
+        await client.close()
+    mock, _mock_client = _mock_client, None
+    if mock is not None:
+        await mock.aclose()
+
+
+def _openai_request(
+    prompt: str,
+    *,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    response_model: type[BaseModel] | None = None,
+) -> dict:
+    request = {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a JSON generator. Always return strictly valid JSON only.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"},
+    }
+    if response_model is not None:
+        request["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": response_model.__name__, "schema": response_model.model_json_schema()},
+        }
+    return request
+
+
+def _mock_http_error(status_code: int) -> LLMError:
+    return LLMError(f"Mock LLM HTTP {status_code}")
+
+
+async def _raw_llm_stream(
+    prompt: str,
+    *,
+    provider: str,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    response_model: type[BaseModel] | None = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming ham çağrı; içerik parçalarını geldikçe verir. Streaming desteklemeyen provider'lar
+    için ``_raw_llm_call`` yanıtı tek parça olarak döner.
+    """
+    if provider == "openai":
+        client = _get_openai_client()
+        stream = await client.chat.completions.create(
+            **_openai_request(prompt, model=model, temperature=temperature, max_tokens=max_tokens),
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        return
+    if provider == "mock":
+        request = _openai_request(
+            prompt, model=model, temperature=temperature, max_tokens=max_tokens, response_model=response_model
+        )
+        async with _get_mock_client().stream("POST", "chat/completions", json={**request, "stream": True}) as resp:
+            if resp.status_code != 200:
+                raise _mock_http_error(resp.status_code)
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                choices = json.loads(line[len("data: "):]).get("choices") or []
+                if choices and choices[0].get("delta", {}).get("content"):
+                    yield choices[0]["delta"]["content"]
+        return
+    raw = await _raw_llm_call(
+        prompt,
+        provider=provider,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        response_model=response_model,
+    )
+    yield raw.content if isinstance(raw, LLMRawResponse) else raw
+
+
+async def _emit_item(db: AsyncSession | None, on_item: ItemCallback, key: str, item: Any) -> None:
+    # callback'ler genelde aynı session'a yazar; eşzamanlı call_llm'lerle sıraya girer
+    async with _session_lock(db):
+        await on_item(key, item)
+
+
+async def _reset_items(db: AsyncSession | None, on_reset: ResetCallback) -> None:
+    async with _session_lock(db):
+        await on_reset()
+
+
+async def _stream_llm_call(
+    prompt: str,
+    *,
+    provider: str,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    response_model: type[BaseModel] | None,
+    db: AsyncSession | None,
+    on_item: ItemCallback,
+    on_reset: ResetCallback,
+) -> str:
+    """
+    Yanıtı stream eder, kapanan array elemanlarını ``on_item``'a verir ve tam metni döner.
+    Provider hata verir ya da timeout'a düşerse zincirdeki sıradakine geçilir (streaming'de hedge yok);
+    geçmeden önce ``on_reset`` çağrılır, yeni provider elemanları baştan verir. Circuit breaker'a
+    ilk chunk'a kadar geçen süre yazılır; ``on_item``'ın kendi hatası provider hatası sayılmaz.
+    """
+    chain = _provider_chain(provider, model)
+    for position, (name, link_model) in enumerate(chain):
+        parser = JsonArrayItemParser()
+        timeout = get_settings().llm_provider_timeouts.get(name)
+        breaker = get_circuit_breaker(name)
+        started = time.perf_counter()
+        first_chunk: float | None = None
+        try:
+            if breaker is not None:
+                breaker.before_call()
+            async with asyncio.timeout(timeout):
+                async for chunk in _raw_llm_stream(
+                    prompt,
+                    provider=name,
+                    model=link_model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    response_model=response_model,
+                ):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter()
+                    for key, _index, item in parser.feed(chunk):
+                        try:
+                            await _emit_item(db, on_item, key, item)
+                        except JobCancelled:
+                            raise
+                        except Exception as exc:  # noqa: BLE001
+                            raise _ItemCallbackError() from exc
+        except (JobCancelled, asyncio.CancelledError):
+            if breaker is not None:
+                breaker.release()
+            raise
+        except _ItemCallbackError as exc:
+            # provider sağlıklı: circuit'e yazılmaz, failover yapılmaz; karar retry döngüsünün
+            if breaker is not None:
+                breaker.release()
+            raise exc.__cause__
+        except Exception as exc:  # noqa: BLE001
+            timed_out = isinstance(exc, TimeoutError)
+            if not isinstance(exc, LLMCircuitOpen):
+                _record_circuit(breaker, ok=False, started=started)
+                metrics.llm_provider_calls_total.labels(
+                    provider=name, outcome="timeout" if timed_out else "error"
+                ).inc()
+            if position < len(chain) - 1:
+                get_logger("masper.llm", component="llm").warning(
+                    "llm.failover", extra={"provider": chain[position + 1][0], "error": str(exc)}
+                )
+                await on_reset()
+                continue
+            if timed_out:
+                raise LLMError(f"Provider '{name}' {timeout}s içinde yanıt vermedi") from exc
+            raise
+        # uzun ama sağlıklı üretim yavaş çağrı sayılmasın: gecikme ilk chunk'a kadar ölçülür
+        _record_circuit(breaker, ok=True, started=started, ended=first_chunk)
+        metrics.llm_provider_calls_total.labels(provider=name, outcome="success").inc()
+        return parser.text
+    raise LLMError("Provider zinciri boş")  # pragma: no cover - chain always has the primary
+
+
+async def _raw_llm_call(
+    prompt: str,
+    *,
+    provider: str,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    response_model: type[BaseModel] | None = None,
+) -> str | LLMRawResponse:
     """
-    Tek noktadan ham LLM çağrısı. Şimdilik dummy provider destekleniyor.
-    Gerçek provider eklendiğinde sadece bu fonksiyon genişletilir.
+    Tek noktadan ham LLM çağrısı: ``dummy`` (response şemasından sentetik yanıt), ``openai`` ve ``mock``
+    (``app.mock_llm_server``; response şeması ``response_format`` ile gönderilir).
+    Yeni provider eklendiğinde sadece bu fonksiyon genişletilir.
     """
     if provider == "dummy":
+        if response_model is not None:
+            # şemadan deterministik, geçerli payload: tüm pipeline provider'sız uçtan uca koşar
+            return json.dumps(
+                synthesize_response(
+                    response_model.model_json_schema(), prompt, array_items=get_settings().llm_dummy_array_items
+                ),
+                ensure_ascii=False,
+            )
         # Deterministic dummy output for tests/dev
         return json.dumps(
             {
@@ -39,32 +345,196 @@ async def _raw_llm_call(prompt: str, *, provider: str, model: str, temperature:
             }
         )
     if provider == "openai":
-        try:
-            import openai  # type: ignore
-        except ImportError as exc:  # pragma: no cover
-            raise LLMError("openai paketi yüklü değil. pip install openai ile kurun.") from exc
-
-        client = openai.OpenAI()
-        completion = client.chat.completions.create(  # type: ignore[attr-defined]
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a JSON generator. Always return strictly valid JSON only.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
+        client = _get_openai_client()
+        completion = await client.chat.completions.create(
+            **_openai_request(prompt, model=model, temperature=temperature, max_tokens=max_tokens)
         )
         content = completion.choices[0].message.content or ""
         if not content.strip():
             raise LLMError("LLM boş içerik döndürdü.")
-        return content
+        usage = getattr(completion, "usage", None)
+        return LLMRawResponse(
+            content,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+        )
+    if provider == "mock":
+        resp = await _get_mock_client().post(
+            "chat/completions",
+            json=_openai_request(
+                prompt, model=model, temperature=temperature, max_tokens=max_tokens, response_model=response_model
+            ),
+        )
+        if resp.status_code != 200:
+            raise _mock_http_error(resp.status_code)
+        body = resp.json()
+        usage = body.get("usage") or {}
+        return LLMRawResponse(
+            body["choices"][0]["message"]["content"] or "",
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
     raise LLMError(f"Provider '{provider}' desteklenmiyor")
 
 
+def _provider_chain(provider: str, model: str) -> list[tuple[str, str]]:
+    """``(provider, model)`` + ``LLM_FALLBACK_PROVIDERS`` (``"provider"`` ya da ``"provider:model"``)."""
+    chain = [(provider, model)]
+    for entry in get_settings().llm_fallback_providers:
+        name, _, fallback_model = entry.partition(":")
+        link = (name.strip(), fallback_model.strip() or model)
+        if link not in chain:
+            chain.append(link)
+    return chain
+
+
+async def _timed_raw_call(
+    prompt: str,
+    provider: str,
+    model: str,
+    *,
+    temperature: float | None,
+    max_tokens: int | None,
+    response_model: type[BaseModel] | None,
+) -> str | LLMRawResponse:
+    """
+    ``LLM_PROVIDER_TIMEOUTS`` süresiyle tek provider çağrısı; başarılı süreler hedge p95'ine,
+    sonuç provider'ın circuit breaker'ına yazılır. Circuit açıksa ``LLMCircuitOpen`` ile hemen döner.
+    """
+    timeout = get_settings().llm_provider_timeouts.get(provider)
+    breaker = get_circuit_breaker(provider)
+    if breaker is not None:
+        breaker.before_call()
+    started = time.perf_counter()
+    try:
+        raw = await asyncio.wait_for(
+            _raw_llm_call(
+                prompt,
+                provider=provider,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_model=response_model,
+            ),
+            timeout,
+        )
+    except asyncio.CancelledError:
+        # hedge kaybedeni / iptal: provider hakkında bilgi yok
+        if breaker is not None:
+            breaker.release()
+        raise
+    except asyncio.TimeoutError as exc:
+        _record_circuit(breaker, ok=False, started=started)
+        metrics.llm_provider_calls_total.labels(provider=provider, outcome="timeout").inc()
+        raise LLMError(f"Provider '{provider}' {timeout}s içinde yanıt vermedi") from exc
+    except Exception:
+        _record_circuit(breaker, ok=False, started=started)
+        metrics.llm_provider_calls_total.labels(provider=provider, outcome="error").inc()
+        raise
+    _record_circuit(breaker, ok=True, started=started)
+    record_provider_latency(provider, time.perf_counter() - started)
+    metrics.llm_provider_calls_total.labels(provider=provider, outcome="success").inc()
+    return raw
+
+
+def _record_circuit(breaker: Any, *, ok: bool, started: float, ended: float | None = None) -> None:
+    if breaker is not None:
+        breaker.record(ok=ok, seconds=(ended if ended is not None else time.perf_counter()) - started)
+
+
+async def _hedged_call(
+    call: Callable[[str, str], Awaitable[Any]],
+    primary: tuple[str, str],
+    secondary: tuple[str, str],
+    *,
+    prompt: str,
+    allow_hedge: Callable[[], Awaitable[bool]],
+    on_hedge: Callable[[], None],
+    usage: dict[str, int],
+) -> str | LLMRawResponse:
+    """
+    Primary, gözlenen p95 gecikmesini (en az ``LLM_HEDGE_MIN_DELAY_SECONDS``) aşarsa aynı istek
+    secondary'ye de gönderilir; ilk başarılı yanıt alınır, diğeri iptal edilir. İptal edilen kopyanın
+    prompt token'ları da harcanmış sayılır.
+    """
+    settings = get_settings()
+    p95 = provider_latency_p95(primary[0], min_samples=settings.llm_hedge_min_samples)
+    first = asyncio.ensure_future(call(*primary))
+    started = [first]
+    try:
+        if p95 is not None:
+            done, _ = await asyncio.wait({first}, timeout=max(p95, settings.llm_hedge_min_delay_seconds))
+            secondary_breaker = get_circuit_breaker(secondary[0])
+            hedgeable = secondary_breaker is None or secondary_breaker.state != CIRCUIT_OPEN
+            if not done and hedgeable and await allow_hedge():
+                on_hedge()
+                metrics.llm_hedged_calls_total.labels(outcome="fired").inc()
+                started.append(asyncio.ensure_future(call(*secondary)))
+        pending = set(started)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in sorted(done, key=lambda f: f is not first):
+                if fut.exception() is not None:
+                    error = error or fut.exception()
+                    continue
+                if fut is not first:
+                    metrics.llm_hedged_calls_total.labels(outcome="won").inc()
+                usage["prompt_tokens"] += estimate_tokens(prompt) * (len(started) - 1)
+                return fut.result()
+        raise first.exception() or error  # type: ignore[misc]
+    finally:
+        for fut in started:
+            fut.cancel()
+        await asyncio.gather(*started, return_exceptions=True)
+
+
+async def _chain_llm_call(
+    prompt: str,
+    *,
+    provider: str,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    response_model: type[BaseModel] | None,
+    allow_hedge: Callable[[], Awaitable[bool]],
+    usage: dict[str, int],
+) -> str | LLMRawResponse:
+    """
+    Provider zincirinde sırayla dener: hata ya da timeout'ta sıradaki provider'a geçilir (aynı
+    deneme sayılır). ``LLM_HEDGE_ENABLED`` ise ilk provider ikinciyle hedge edilir.
+    """
+    chain = _provider_chain(provider, model)
+    call = partial(_timed_raw_call, prompt, temperature=temperature, max_tokens=max_tokens, response_model=response_model)
+    hedging = get_settings().llm_hedge_enabled and len(chain) > 1
+    skip: set[int] = set()
+    last_err: Exception | None = None
+    for index, link in enumerate(chain):
+        if index in skip:
+            continue
+        if last_err is not None:
+            get_logger("masper.llm", component="llm").warning(
+                "llm.failover", extra={"provider": link[0], "error": str(last_err)}
+            )
+        try:
+            if index == 0 and hedging:
+                return await _hedged_call(
+                    call,
+                    chain[0],
+                    chain[1],
+                    prompt=prompt,
+                    allow_hedge=allow_hedge,
+                    on_hedge=lambda: skip.add(1),
+                    usage=usage,
+                )
+            return await call(*link)
+        except JobCancelled:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            last_err = exc
+    raise last_err  # type: ignore[misc]
+
+
 async def call_llm(
     prompt: str,
     response_model: type[BaseModel],
@@ -76,40 +546,298 @@ async def call_llm(
     step_type: str | None = None,
     job_id: int | None = None,
     intent: LLMIntent | None = None,
+    bypass_cache: bool = False,
+    on_item: ItemCallback | None = None,
+    on_reset: ResetCallback | None = None,
 ) -> BaseModel:
     """
     Tek LLM entrypoint'i.
     - prompt string alır
+    - aynı girdiyle önceki yanıt cache'te varsa provider'a gitmeden döner
+      (``bypass_cache=True`` cache'i okumaz ama yeni yanıtı yazar)
+    - aynı istek şu an başka bir çağrıda uçuştaysa onun sonucunu paylaşır (single-flight)
+    - ``on_item`` verilirse streaming mod: yanıttaki array elemanları (``tasks[]``, ``features[]``…)
+      kapandıkça callback'e verilir; cache/coalesced yanıtlarda tüm elemanlar sonuçtan verilir.
+      Bir deneme ya da provider yarıda kalır veya yanıtı geçersiz çıkarsa o ana kadar verilenler son
+      yanıtın parçası değildir: ``on_reset`` çağrılır ve sonraki deneme elemanları baştan verir
     - policy: quota + budget + retry/backoff
     - raw LLM çağrısı yapar
     - JSON parse eder
     - Pydantic response_model ile validate eder
     - Valid değilse LLMError fırlatır
     """
+    started = time.perf_counter()
     settings = get_settings()
     provider = settings.llm_provider
     model = settings.llm_model
     temp = temperature if temperature is not None else settings.llm_temperature
     tokens = max_tokens if max_tokens is not None else settings.llm_max_tokens
 
+    if intent and project_id is None:
+        raise LLMError("project_id is required when intent is provided for quota tracking")
+
+    request_key = llm_cache_key(
+        provider=provider,
+        model=model,
+        temperature=temp,
+        max_tokens=tokens,
+        prompt=prompt,
+        response_model=response_model,
+    )
+    cache_status = "disabled"
+    if settings.llm_cache_enabled:
+        if bypass_cache:
+            cache_status = "bypass"
+            metrics.llm_cache_lookups_total.labels(outcome="bypass").inc()
+        else:
+            cache_status = "miss"
+            async with _session_lock(db):
+                cached = await get_cached_response(request_key, db)
+            if cached is not None:
+                return await _shared_response(
+                    response_model,
+                    cached,
+                    "hit",
+                    prompt=prompt,
+                    db=db,
+                    project_id=project_id,
+                    step_type=step_type,
+                    intent=intent,
+                    started=started,
+                    on_item=on_item,
+                )
+
+    # single-flight: aynı isteği şu an yapan biri varsa onun sonucunu bekle
+    while (leader := _in_flight.get(request_key)) is not None:
+        try:
+            shared = await run_cancellable(asyncio.shield(leader))
+        except (LLMQuotaExceeded, LLMJobBudgetExceeded, JobCancelled, _LeaderGone):
+            # leader'ın kendi quota/budget/iptal durumu; bu çağrı kendi hesabına dener
+            raise_if_cancelled()
+            continue
+        return await _shared_response(
+            response_model,
+            shared,
+            "coalesced",
+            prompt=prompt,
+            db=db,
+            project_id=project_id,
+            step_type=step_type,
+            intent=intent,
+            started=started,
+            on_item=on_item,
+        )
+
+    flight: asyncio.Future = asyncio.get_running_loop().create_future()
+    _in_flight[request_key] = flight
+    try:
+        validated = await _call_provider(
+            prompt,
+            response_model,
+            provider=provider,
+            model=model,
+            temperature=temp,
+            max_tokens=tokens,
+            db=db,
+            project_id=project_id,
+            step_type=step_type,
+            job_id=job_id,
+            intent=intent,
+            cache_key=request_key if settings.llm_cache_enabled else None,
+            cache_status=cache_status,
+            started=started,
+            on_item=on_item,
+            on_reset=on_reset,
+        )
+    except BaseException as exc:
+        flight.set_exception(exc if isinstance(exc, Exception) else _LeaderGone())
+        flight.exception()  # bekleyen yoksa "exception was never retrieved" uyarısı çıkmasın
+        raise
+    else:
+        flight.set_result(validated.model_dump(mode="json"))
+        return validated
+    finally:
+        _in_flight.pop(request_key, None)
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+async def _shared_response(
+    response_model: type[BaseModel],
+    data: Any,
+    cache_status: str,
+    *,
+    prompt: str,
+    db: AsyncSession | None,
+    project_id: int | None,
+    step_type: str | None,
+    intent: LLMIntent | None,
+    started: float,
+    on_item: ItemCallback | None,
+) -> BaseModel:
+    """
+    Provider'a gitmeden dönen yanıt (cache ``hit`` ya da ``coalesced``); project quota'ya sayılmaz,
+    token harcaması 0 yazılır.
+    """
+    validated = response_model.model_validate(data)
+    if on_item is not None and isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, (dict, list)):
+                        await _emit_item(db, on_item, key, item)
+    if db and step_type:
+        async with _session_lock(db):
+            await log_llm_call(
+                db,
+                project_id=project_id,
+                step_type=step_type,
+                status="success",
+                request_payload=prompt,
+                response_payload=data,
+                intent=intent.value if intent else None,
+                prompt_tokens=0,
+                completion_tokens=0,
+                latency_ms=_elapsed_ms(started),
+                cache_status=cache_status,
+            )
+    outcome = "cache_hit" if cache_status == "hit" else cache_status
+    metrics.llm_calls_total.labels(intent=intent.value if intent else "unknown", outcome=outcome).inc()
+    return validated
+
+
+async def _call_provider(
+    prompt: str,
+    response_model: type[BaseModel],
+    *,
+    provider: str,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    db: AsyncSession | None,
+    project_id: int | None,
+    step_type: str | None,
+    job_id: int | None,
+    intent: LLMIntent | None,
+    cache_key: str | None,
+    cache_status: str,
+    started: float,
+    on_item: ItemCallback | None,
+    on_reset: ResetCallback | None,
+) -> BaseModel:
+    """
+    quota + budget + retry/backoff ile provider çağrısı; başarılı yanıt cache'e yazılır.
+    Log satırındaki token'lar tüm denemelerin toplamıdır (provider usage yoksa tahmin).
+    """
+    settings = get_settings()
     attempts = settings.llm_max_retries + 1
     last_err: Exception | None = None
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    streamed = 0
 
-    if intent and project_id is None:
-        raise LLMError("project_id is required when intent is provided for quota tracking")
+    async def emit(key: str, item: Any) -> None:
+        nonlocal streamed
+        streamed += 1
+        await on_item(key, item)
+
+    async def discard_streamed() -> None:
+        # başarısız denemenin verdiği elemanlar geri alınır; sonraki deneme aynı index'lerden başlar
+        nonlocal streamed
+        if streamed and on_reset is not None:
+            await _reset_items(db, on_reset)
+        streamed = 0
+
+    def accounting(attempt_no: int) -> dict:
+        return {
+            "intent": intent.value if intent else None,
+            **usage,
+            "latency_ms": _elapsed_ms(started),
+            "attempt": attempt_no,
+            "cache_status": cache_status,
+        }
+
+    async def allow_hedge() -> bool:
+        # hedge ayrı bir provider çağrısı: job budget ve project quota'dan düşer, limit doluysa yapılmaz
+        try:
+            check_job_budget(job_id, settings.llm_job_max_calls)
+        except LLMJobBudgetExceeded:
+            return False
+        if db and project_id is not None:
+            try:
+                async with _session_lock(db):
+                    await check_and_increment_project_quota(
+                        db, project_id, max_calls=settings.llm_project_daily_max_calls
+                    )
+            except LLMQuotaExceeded:
+                refund_job_budget(job_id)
+                return False
+        return True
 
     for attempt in range(attempts):
+        raise_if_cancelled()
         try:
+            # provider'lar düşükken quota/DB'ye ve retry'a kaynak harcamadan hemen dön
+            check_provider_circuits([name for name, _ in _provider_chain(provider, model)])
             if db and project_id is not None:
-                await check_and_increment_project_quota(
-                    db,
-                    project_id,
-                    max_calls=settings.llm_project_daily_max_calls,
-                )
+                async with _session_lock(db):
+                    await check_and_increment_project_quota(
+                        db,
+                        project_id,
+                        max_calls=settings.llm_project_daily_max_calls,
+                    )
             check_job_budget(job_id, settings.llm_job_max_calls)
+            # provider RPM/TPM limitine takılmak yerine kapasite açılana kadar bekle
+            await run_cancellable(
+                wait_for_rate_limit(
+                    estimate_tokens(prompt) + (max_tokens or settings.llm_rate_limit_completion_tokens)
+                )
+            )
 
-            raw = await _raw_llm_call(
-                prompt, provider=provider, model=model, temperature=temp, max_tokens=tokens
+            # a cancelled job abandons the in-flight request instead of waiting for it
+            llm_started = time.perf_counter()
+            try:
+                if on_item is not None:
+                    raw = await run_cancellable(
+                        _stream_llm_call(
+                            prompt,
+                            provider=provider,
+                            model=model,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            response_model=response_model,
+                            db=db,
+                            on_item=emit,
+                            on_reset=discard_streamed,
+                        )
+                    )
+                else:
+                    raw = await run_cancellable(
+                        _chain_llm_call(
+                            prompt,
+                            provider=provider,
+                            model=model,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            response_model=response_model,
+                            allow_hedge=allow_hedge,
+                            usage=usage,
+                        )
+                    )
+            finally:
+                add_llm_time(time.perf_counter() - llm_started)
+            if isinstance(raw, LLMRawResponse):
+                reported, raw = raw, raw.content
+            else:
+                reported = LLMRawResponse(raw or "")
+            usage["prompt_tokens"] += (
+                reported.prompt_tokens if reported.prompt_tokens is not None else estimate_tokens(prompt)
+            )
+            usage["completion_tokens"] += (
+                reported.completion_tokens
+                if reported.completion_tokens is not None
+                else estimate_tokens(str(raw or ""))
             )
             if not raw or not str(raw).strip():
                 raise LLMError("LLM yanıtı boş geldi; parse edilemedi.")
@@ -143,15 +871,21 @@ async def call_llm(
                     )
                     raise LLMError(f"LLM yanıtı JSON parse edilemedi: {err}") from err
             validated = response_model.model_validate(data)
-            if db and step_type:
-                await log_llm_call(
-                    db,
-                    project_id=project_id,
-                    step_type=step_type,
-                    status="success",
-                    request_payload=prompt,
-                    response_payload=validated.model_dump(),
-                )
+            async with _session_lock(db):
+                if cache_key is not None:
+                    await store_cached_response(
+                        cache_key, validated.model_dump(mode="json"), provider=provider, model=model, db=db
+                    )
+                if db and step_type:
+                    await log_llm_call(
+                        db,
+                        project_id=project_id,
+                        step_type=step_type,
+                        status="success",
+                        request_payload=prompt,
+                        response_payload=validated.model_dump(),
+                        **accounting(attempt + 1),
+                    )
             metrics.llm_calls_total.labels(intent=intent.value if intent else "unknown", outcome="success").inc()
             get_logger("masper.llm", component="llm").info(
                 "llm.success",
@@ -164,39 +898,52 @@ async def call_llm(
             return validated
         except (LLMQuotaExceeded, LLMJobBudgetExceeded):
             if db and step_type:
-                await log_llm_call(
-                    db,
-                    project_id=project_id,
-                    step_type=step_type,
-                    status="fail",
-                    request_payload=prompt,
-                    response_payload={"error": "quota_or_budget_exceeded"},
-                )
+                async with _session_lock(db):
+                    await log_llm_call(
+                        db,
+                        project_id=project_id,
+                        step_type=step_type,
+                        status="fail",
+                        request_payload=prompt,
+                        response_payload={"error": "quota_or_budget_exceeded"},
+                        **accounting(attempt + 1),
+                    )
             metrics.llm_calls_total.labels(intent=intent.value if intent else "unknown", outcome="quota_or_budget").inc()
             raise
+        except LLMCircuitOpen:
+            metrics.llm_calls_total.labels(intent=intent.value if intent else "unknown", outcome="circuit_open").inc()
+            raise
+        except JobCancelled:
+            metrics.llm_calls_total.labels(intent=intent.value if intent else "unknown", outcome="cancelled").inc()
+            raise
         except (json.JSONDecodeError, ValidationError, LLMError) as exc:
             last_err = exc
         except Exception as exc:  # noqa: BLE001
             last_err = exc
 
+        await discard_streamed()
         if attempt < attempts - 1:
-            await backoff_sleep(
-                attempt=attempt,
-                initial=settings.llm_initial_backoff_seconds,
-                maximum=settings.llm_max_backoff_seconds,
+            await run_cancellable(
+                backoff_sleep(
+                    attempt=attempt,
+                    initial=settings.llm_initial_backoff_seconds,
+                    maximum=settings.llm_max_backoff_seconds,
+                )
             )
         else:
             break
 
     if db and step_type:
-        await log_llm_call(
-            db,
-            project_id=project_id,
-            step_type=step_type,
-            status="fail",
-            request_payload=prompt,
-            response_payload={"error": str(last_err) if last_err else "unknown"},
-        )
+        async with _session_lock(db):
+            await log_llm_call(
+                db,
+                project_id=project_id,
+                step_type=step_type,
+                status="fail",
+                request_payload=prompt,
+                response_payload={"error": str(last_err) if last_err else "unknown"},
+                **accounting(attempt + 1),
+            )
     metrics.llm_calls_total.labels(intent=intent.value if intent else "unknown", outcome="fail").inc()
     get_logger("masper.llm", component="llm").error(
         "llm.failed",
@@ -0,0 +1,170 @@
+"""
+Content-addressed LLM yanıt cache'i.
+
+Key = sha256(provider, model, temperature, max_tokens, prompt, response_model şeması). İki katman:
+- process içi LRU (``LLM_CACHE_MEMORY_ENTRIES``)
+- ``llm_response_cache`` tablosu (``LLM_CACHE_TTL_SECONDS`` TTL, ``LLM_CACHE_DB_MAX_ENTRIES`` sınırı;
+  en fazla ``LLM_CACHE_EVICT_INTERVAL_SECONDS``'ta bir süresi dolanlar ve sınırı aşan en eski kayıtlar
+  silinir). DB katmanı çağıranın session'ını kullanır ve yazdığını quota sayacı gibi hemen commit
+  eder (çağıranın sonraki rollback'i kaydı silmez); session verilmeyen çağrılar sadece memory
+  katmanını görür.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.llm_cache import LLMResponseCache
+from app.observability import metrics
+
+# key -> (expires_at epoch, response)
+_memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+# tek seferde silinecek en fazla kayıt; kalan fazlalık sonraki eviction'a kalır
+_EVICT_BATCH = 500
+_last_evict = 0.0  # time.monotonic() of the last DB eviction in this process
+
+
+@lru_cache(maxsize=None)
+def _schema_fingerprint(response_model: type[BaseModel]) -> str:
+    return json.dumps(response_model.model_json_schema(), sort_keys=True)
+
+
+def llm_cache_key(
+    *,
+    provider: str,
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    prompt: str,
+    response_model: type[BaseModel],
+) -> str:
+    material = json.dumps(
+        [provider, model, temperature, max_tokens, prompt, _schema_fingerprint(response_model)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def clear_memory_cache() -> None:
+    global _last_evict
+    _memory.clear()
+    _last_evict = 0.0
+
+
+def _remember(key: str, response: Any, expires_at: float) -> None:
+    _memory[key] = (expires_at, response)
+    _memory.move_to_end(key)
+    while len(_memory) > get_settings().llm_cache_memory_entries:
+        _memory.popitem(last=False)
+
+
+async def get_cached_response(key: str, db: AsyncSession | None = None) -> Any | None:
+    """Önce memory, sonra DB katmanına bakar; DB hit'i memory'ye de alınır."""
+    entry = _memory.get(key)
+    if entry is not None:
+        if entry[0] > time.time():
+            _memory.move_to_end(key)
+            metrics.llm_cache_lookups_total.labels(outcome="memory_hit").inc()
+            return entry[1]
+        del _memory[key]
+
+    if db is not None:
+        now = datetime.now(timezone.utc)
+        row = (
+            await db.execute(
+                select(LLMResponseCache.response_json, LLMResponseCache.expires_at).where(
+                    LLMResponseCache.key == key, LLMResponseCache.expires_at > now
+                )
+            )
+        ).first()
+        if row is not None:
+            response = json.loads(row.response_json)
+            expires_at = row.expires_at if row.expires_at.tzinfo else row.expires_at.replace(tzinfo=timezone.utc)
+            _remember(key, response, expires_at.timestamp())
+            metrics.llm_cache_lookups_total.labels(outcome="db_hit").inc()
+            return response
+
+    metrics.llm_cache_lookups_total.labels(outcome="miss").inc()
+    return None
+
+
+async def store_cached_response(
+    key: str,
+    response: Any,
+    *,
+    provider: str,
+    model: str,
+    db: AsyncSession | None = None,
+) -> None:
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=settings.llm_cache_ttl_seconds)
+    _remember(key, response, expires_at.timestamp())
+    if db is None:
+        return
+
+    values = {
+        "key": key,
+        "provider": provider,
+        "model": model,
+        "response_json": json.dumps(response, ensure_ascii=False),
+        "created_at": now,
+        "expires_at": expires_at,
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        # aynı key'i eşzamanlı yazan iki çağrı çağıranın transaction'ını bozmasın
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(LLMResponseCache).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMResponseCache.key],
+            set_={k: stmt.excluded[k] for k in ("response_json", "created_at", "expires_at")},
+        )
+        await db.execute(stmt)
+    else:  # pragma: no cover - diğer dialect'ler
+        await db.merge(LLMResponseCache(**values))
+        await db.flush()
+    global _last_evict
+    if time.monotonic() - _last_evict >= settings.llm_cache_evict_interval_seconds:
+        _last_evict = time.monotonic()
+        await _evict(db, now, settings.llm_cache_db_max_entries)
+    await db.commit()
+
+
+async def _evict(db: AsyncSession, now: datetime, max_entries: int) -> None:
+    """
+    Süresi dolanları ve ``max_entries``'i aşan en eski kayıtları siler. Tablo sayılmaz: sınırdaki
+    kaydın ``created_at``'i index'ten okunur, silme ``_EVICT_BATCH`` ile sınırlıdır.
+    """
+    expired = (
+        select(LLMResponseCache.key)
+        .where(LLMResponseCache.expires_at <= now)
+        .limit(_EVICT_BATCH)
+    )
+    await db.execute(delete(LLMResponseCache).where(LLMResponseCache.key.in_(expired)))
+    cutoff = await db.scalar(
+        select(LLMResponseCache.created_at)
+        .order_by(LLMResponseCache.created_at.desc())
+        .offset(max_entries)
+        .limit(1)
+    )
+    if cutoff is not None:
+        oldest = (
+            select(LLMResponseCache.key)
+            .where(LLMResponseCache.created_at <= cutoff)
+            .order_by(LLMResponseCache.created_at)
+            .limit(_EVICT_BATCH)
+        )
+        await db.execute(delete(LLMResponseCache).where(LLMResponseCache.key.in_(oldest)))
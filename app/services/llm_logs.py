@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from typing import Any, Optional
 
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.imports import LLMCallLog
@@ -13,14 +14,61 @@ async def log_llm_call(
     status: str,
     request_payload: Any,
     response_payload: Any,
+    *,
+    intent: Optional[str] = None,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+    latency_ms: Optional[int] = None,
+    attempt: Optional[int] = None,
+    cache_status: Optional[str] = None,
 ) -> None:
+    tokens = None
+    if prompt_tokens is not None or completion_tokens is not None:
+        tokens = (prompt_tokens or 0) + (completion_tokens or 0)
     log = LLMCallLog(
         project_id=project_id,
         step_type=step_type,
         status=status,
         request_payload=request_payload,
         response_payload=response_payload,
+        intent=intent,
+        tokens=tokens,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency_ms=latency_ms,
+        attempt=attempt,
+        cache_status=cache_status,
         created_at=datetime.now(timezone.utc),
     )
     db.add(log)
     await db.flush()
+
+
+async def llm_call_rollup(
+    db: AsyncSession,
+    *,
+    project_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+) -> list[dict]:
+    """project / intent / step_type bazında çağrı, cache, token ve latency toplamları."""
+    group = (LLMCallLog.project_id, LLMCallLog.intent, LLMCallLog.step_type)
+    stmt = (
+        select(
+            *group,
+            func.count(LLMCallLog.id).label("calls"),
+            func.sum(case((LLMCallLog.status == "fail", 1), else_=0)).label("failures"),
+            func.sum(case((LLMCallLog.cache_status.in_(("hit", "coalesced")), 1), else_=0)).label("cache_hits"),
+            func.coalesce(func.sum(LLMCallLog.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(LLMCallLog.completion_tokens), 0).label("completion_tokens"),
+            func.coalesce(func.sum(LLMCallLog.tokens), 0).label("tokens"),
+            func.avg(LLMCallLog.latency_ms).label("avg_latency_ms"),
+            func.max(LLMCallLog.latency_ms).label("max_latency_ms"),
+        )
+        .group_by(*group)
+        .order_by(*group)
+    )
+    if project_id is not None:
+        stmt = stmt.where(LLMCallLog.project_id == project_id)
+    if since is not None:
+        stmt = stmt.where(LLMCallLog.created_at >= since)
+    return [dict(row._mapping) for row in (await db.execute(stmt)).all()]
@@ -1,12 +1,17 @@
-from datetime import date
+from collections import deque
+from datetime import date, datetime, time, timedelta, timezone
 import asyncio
+import json
 import random
+import threading
+import time as time_module
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.models.llm_usage import LLMUsage
+from app.observability import metrics
 
 
 class LLMQuotaExceeded(Exception):
@@ -17,6 +22,15 @@ class LLMJobBudgetExceeded(Exception):
     """Job bazlı LLM çağrı limiti aşıldı."""
 
 
+class LLMCircuitOpen(Exception):
+    """Provider'ın circuit breaker'ı açık; çağrı provider'a gitmeden hemen reddedildi."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"LLM provider '{provider}' circuit open; retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
 _job_call_counts: dict[int, int] = {}
 
 
@@ -43,6 +57,12 @@ async def check_and_increment_project_quota(
     await db.commit()
 
 
+def next_quota_reset() -> datetime:
+    """When the daily project quota (counted per local ``date.today()``) starts over, in UTC."""
+    tomorrow = date.today() + timedelta(days=1)
+    return datetime.combine(tomorrow, time.min).astimezone(timezone.utc)
+
+
 def check_job_budget(job_id: int | None, max_calls: int) -> None:
     if job_id is None:
         return
@@ -52,7 +72,324 @@ def check_job_budget(job_id: int | None, max_calls: int) -> None:
     _job_call_counts[job_id] = count + 1
 
 
+def refund_job_budget(job_id: int | None) -> None:
+    """Sayılıp yapılmayan çağrıyı (ör. quota'ya takılan hedge) job budget'ına geri verir."""
+    if job_id is not None and _job_call_counts.get(job_id):
+        _job_call_counts[job_id] -= 1
+
+
+def reset_job_budget(job_id: int) -> None:
+    """Budget is per run; a retried or resumed job starts counting again."""
+    _job_call_counts.pop(job_id, None)
+
+
 async def backoff_sleep(attempt: int, initial: float, maximum: float) -> None:
     delay = min(initial * (2**attempt), maximum)
     jitter = delay * 0.1
     await asyncio.sleep(delay + random.uniform(-jitter, jitter))
+
+
+def estimate_tokens(text: str) -> int:
+    """Offline token tahmini (~4 karakter/token); provider usage dönmediğinde kullanılır."""
+    return len(text) // 4 + 1
+
+
+class TokenBucketLimiter:
+    """
+    Provider RPM/TPM limitleri için client-side token bucket: bir bucket istek sayısını, diğeri
+    tahmini token'ı sayar (0 = o limit kapalı). Bucket'lar dakikada ``limit`` kadar dolar.
+
+    ``path`` verilirse durum flock ile kilitlenen bir JSON dosyasında tutulur; aynı makinedeki
+    worker process'leri aynı bütçeyi paylaşır. Verilmezse bucket process içidir.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        path: str | None = None,
+        clock=time_module.time,
+    ) -> None:
+        self.limits = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self.path = path
+        self._clock = clock
+        self._state: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def _take(self, state: dict[str, list[float]], tokens: int) -> float:
+        """Kapasite varsa düşer ve 0 döner; yoksa gereken bekleme süresini döner."""
+        now = self._clock()
+        needs = {"requests": 1, "tokens": tokens}
+        levels: dict[str, float] = {}
+        wait = 0.0
+        for name, limit in self.limits.items():
+            if limit <= 0:
+                continue
+            need = min(needs[name], limit)  # limitten büyük istek sonsuza kadar beklemesin
+            level, updated = state.get(name, [float(limit), now])
+            level = min(float(limit), level + max(now - updated, 0.0) * limit / 60.0)
+            levels[name] = level - need
+            if level < need:
+                wait = max(wait, (need - level) * 60.0 / limit)
+        if wait > 0:
+            return wait
+        for name, level in levels.items():
+            state[name] = [level, now]
+        return 0.0
+
+    def _take_from_file(self, tokens: int) -> float:
+        import fcntl
+
+        with open(self.path, "a+", encoding="utf-8") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0)
+                raw = fh.read()
+                state = json.loads(raw) if raw.strip() else {}
+                wait = self._take(state, tokens)
+                if wait == 0:
+                    fh.seek(0)
+                    fh.truncate()
+                    fh.write(json.dumps(state))
+                    fh.flush()
+                return wait
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def try_acquire(self, tokens: int) -> float:
+        if self.path:
+            return self._take_from_file(tokens)
+        with self._lock:
+            return self._take(self._state, tokens)
+
+    async def acquire(self, tokens: int) -> float:
+        """Kapasite açılana kadar bekler (hata fırlatmaz); toplam bekleme süresini döner."""
+        waited = 0.0
+        while True:
+            if self.path:
+                wait = await asyncio.to_thread(self.try_acquire, tokens)
+            else:
+                wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+_rate_limiter: TokenBucketLimiter | None = None
+
+
+def get_rate_limiter() -> TokenBucketLimiter | None:
+    """Settings'ten process başına tek limiter; limitler değişirse (ör. testlerde) yeniden kurulur."""
+    global _rate_limiter
+    settings = get_settings()
+    rpm, tpm, path = (
+        settings.llm_rate_limit_rpm,
+        settings.llm_rate_limit_tpm,
+        settings.llm_rate_limit_store_path,
+    )
+    if rpm <= 0 and tpm <= 0:
+        return None
+    limiter = _rate_limiter
+    if limiter is None or limiter.limits != {"requests": rpm, "tokens": tpm} or limiter.path != path:
+        limiter = _rate_limiter = TokenBucketLimiter(requests_per_minute=rpm, tokens_per_minute=tpm, path=path)
+    return limiter
+
+
+async def wait_for_rate_limit(tokens: int) -> float:
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0.0
+    waited = await limiter.acquire(tokens)
+    if waited:
+        metrics.llm_rate_limit_wait_seconds.observe(waited)
+    return waited
+
+
+# provider -> son başarılı ham çağrı süreleri (saniye); hedge gecikmesi bunların p95'idir
+_provider_latencies: dict[str, deque] = {}
+_LATENCY_WINDOW = 200
+
+
+def record_provider_latency(provider: str, seconds: float) -> None:
+    _provider_latencies.setdefault(provider, deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+
+def provider_latency_p95(provider: str, *, min_samples: int) -> float | None:
+    """Gözlenen p95 gecikme; ``min_samples``'tan az örnek varsa None (hedge yapılmaz)."""
+    samples = _provider_latencies.get(provider)
+    if not samples or len(samples) < max(min_samples, 1):
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+
+def reset_provider_latencies() -> None:
+    _provider_latencies.clear()
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+_CIRCUIT_STATE_VALUES = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Provider başına circuit breaker.
+
+    closed: son ``window_seconds`` içindeki çağrıların en az ``min_calls`` tanesinden
+    ``error_rate`` oranı hata ya da ``slow_call_seconds``'tan yavaşsa open'a geçer.
+    open: ``open_seconds`` boyunca çağrılar provider'a gitmeden ``LLMCircuitOpen`` ile reddedilir.
+    half_open: ``half_open_calls`` deneme çağrısına izin verilir; başarılıysa closed, değilse
+    tekrar open.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        *,
+        window_seconds: float,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        open_seconds: float,
+        half_open_calls: int,
+        clock=time_module.monotonic,
+    ):
+        self.provider = provider
+        self.window_seconds = window_seconds
+        self.min_calls = max(min_calls, 1)
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(half_open_calls, 1)
+        self._clock = clock
+        self._calls: deque = deque()  # (zaman, başarısız mı)
+        self._state = CIRCUIT_CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == CIRCUIT_OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(CIRCUIT_HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        self._trials = 0
+        if state == CIRCUIT_OPEN:
+            self._opened_at = self._clock()
+        if state == CIRCUIT_CLOSED:
+            self._calls.clear()
+        metrics.llm_circuit_state.labels(provider=self.provider).set(_CIRCUIT_STATE_VALUES[state])
+        metrics.llm_circuit_transitions_total.labels(provider=self.provider, state=state).inc()
+
+    def _prune(self) -> None:
+        horizon = self._clock() - self.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def failure_rate(self) -> float:
+        self._prune()
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, failed in self._calls if failed) / len(self._calls)
+
+    def retry_after(self) -> float:
+        """Open ise half-open'a kalan süre; aksi halde 0."""
+        if self.state != CIRCUIT_OPEN:
+            return 0.0
+        return max(self.open_seconds - (self._clock() - self._opened_at), 0.0)
+
+    def before_call(self) -> None:
+        """Çağrıya izin verir ya da ``LLMCircuitOpen`` fırlatır; izin verilen çağrı ``record``/``release`` ile kapanmalı."""
+        state = self.state
+        if state == CIRCUIT_OPEN:
+            raise LLMCircuitOpen(self.provider, self.retry_after())
+        if state == CIRCUIT_HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                raise LLMCircuitOpen(self.provider, 0.0)
+            self._trials += 1
+
+    def release(self) -> None:
+        """Sonucu bilinmeyen (iptal edilen) çağrı; half-open deneme hakkını geri verir."""
+        if self._state == CIRCUIT_HALF_OPEN and self._trials:
+            self._trials -= 1
+
+    def record(self, *, ok: bool, seconds: float) -> None:
+        failed = not ok or (self.slow_call_seconds > 0 and seconds > self.slow_call_seconds)
+        state = self.state
+        if state == CIRCUIT_HALF_OPEN:
+            self._transition(CIRCUIT_OPEN if failed else CIRCUIT_CLOSED)
+            return
+        if state == CIRCUIT_OPEN:
+            return  # open'dan önce başlamış çağrı
+        self._calls.append((self._clock(), failed))
+        self._prune()
+        if len(self._calls) >= self.min_calls and self.failure_rate() >= self.error_rate:
+            self._transition(CIRCUIT_OPEN)
+
+    def snapshot(self) -> dict:
+        self._prune()
+        return {
+            "provider": self.provider,
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "calls_in_window": len(self._calls),
+            "retry_after_seconds": round(self.retry_after(), 1) or None,
+        }
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker | None:
+    """Provider başına tek breaker; ``LLM_CIRCUIT_ENABLED=false`` ise None."""
+    settings = get_settings()
+    if not settings.llm_circuit_enabled:
+        return None
+    breaker = _circuit_breakers.get(provider)
+    if breaker is None:
+        breaker = _circuit_breakers[provider] = CircuitBreaker(
+            provider,
+            window_seconds=settings.llm_circuit_window_seconds,
+            min_calls=settings.llm_circuit_min_calls,
+            error_rate=settings.llm_circuit_error_rate,
+            slow_call_seconds=settings.llm_circuit_slow_call_seconds,
+            open_seconds=settings.llm_circuit_open_seconds,
+            half_open_calls=settings.llm_circuit_half_open_calls,
+        )
+    return breaker
+
+
+def check_provider_circuits(providers: list[str]) -> None:
+    """
+    Zincirdeki tüm provider'ların circuit'i açıksa quota/DB'ye dokunmadan ``LLMCircuitOpen``
+    fırlatır (en erken açılacak provider'ın süresiyle).
+    """
+    waits = []
+    for provider in providers:
+        breaker = get_circuit_breaker(provider)
+        if breaker is None or breaker.state != CIRCUIT_OPEN:
+            return
+        waits.append((breaker.retry_after(), provider))
+    if waits:
+        retry_after, provider = min(waits)
+        raise LLMCircuitOpen(provider, retry_after)
+
+
+def circuit_breaker_snapshots(providers: list[str]) -> list[dict]:
+    snapshots = []
+    for provider in providers:
+        breaker = get_circuit_breaker(provider)
+        if breaker is None:
+            continue
+        snapshots.append(breaker.snapshot())
+    return snapshots
+
+
+def reset_circuit_breakers() -> None:
+    _circuit_breakers.clear()
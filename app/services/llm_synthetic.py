@@ -0,0 +1,92 @@
+import random
+import re
+from typing import Any, Sequence
+
+# build_task_refinement_prompt / build_task_split_prompt satırları: "- (42) Başlık: açıklama"
+_PROMPT_TASK_ID = re.compile(r"^- \((\d+)\) ", re.MULTILINE)
+
+
+def prompt_task_ids(prompt: str) -> list[int]:
+    """Pass2/pass3 prompt'undaki task id'leri (prompt sırasıyla)."""
+    return [int(match) for match in _PROMPT_TASK_ID.findall(prompt)]
+
+
+def synthesize_response(schema: dict, prompt: str, *, array_items: int = 3) -> Any:
+    """Prompt'a göre seed'lenen ve prompt'taki task id'lerine bağlanan sentetik yanıt."""
+    return synthesize_payload(schema, seed=prompt, array_items=array_items, task_ids=prompt_task_ids(prompt))
+
+
+def synthesize_payload(
+    schema: dict, *, seed: str, array_items: int = 3, task_ids: Sequence[int] = ()
+) -> Any:
+    """
+    JSON schema'ya (``BaseModel.model_json_schema()``) uyan deterministik sentetik payload üretir.
+
+    Aynı ``seed`` aynı payload'ı verir. Yalnızca required alanlar doldurulur; array'ler
+    ``array_items`` eleman (``minItems``/``maxItems`` içinde) alır, sayılar min/max sınırlarına uyar.
+
+    ``task_ids`` verilirse task'a bağlı array'ler gerçek id'leri kullanır: ``task_id`` alanlı
+    elemanlar her id için bir tane üretilir (``depends_on_task_ids`` bir önceki task'a bağlanır),
+    ``parent_task_id`` alanlı elemanlar her parent için ``array_items`` tane.
+    """
+    rng = random.Random(seed)
+    defs = schema.get("$defs", {})
+
+    def resolve(node: dict) -> dict:
+        while "$ref" in node:
+            node = defs[node["$ref"].rsplit("/", 1)[-1]]
+        return node
+
+    def build(node: dict, name: str, index: int) -> Any:
+        node = resolve(node)
+        if "const" in node:
+            return node["const"]
+        if "enum" in node:
+            return rng.choice(node["enum"])
+        for combinator in ("anyOf", "oneOf", "allOf"):
+            if combinator in node:
+                options = [o for o in node[combinator] if resolve(o).get("type") != "null"]
+                return build(options[0] if options else node[combinator][0], name, index)
+        kind = node.get("type", "object")
+        if kind == "object":
+            props = node.get("properties", {})
+            return {key: build(props[key], key, index) for key in node.get("required", [])}
+        if kind == "array" and task_ids:
+            items = resolve(node.get("items", {}))
+            required = items.get("required", [])
+            if "task_id" in required:
+                return [
+                    {
+                        **build(items, name, i),
+                        "task_id": task_id,
+                        **(
+                            {"depends_on_task_ids": [task_ids[i - 2]] if i > 1 else []}
+                            if "depends_on_task_ids" in items.get("properties", {})
+                            else {}
+                        ),
+                    }
+                    for i, task_id in enumerate(task_ids, start=1)
+                ]
+            if "parent_task_id" in required:
+                return [
+                    {**build(items, name, n), "parent_task_id": task_id}
+                    for task_id in task_ids
+                    for n in range(1, array_items + 1)
+                ]
+        if kind == "array":
+            count = max(node.get("minItems", 0), array_items)
+            if "maxItems" in node:
+                count = min(count, node["maxItems"])
+            return [build(node.get("items", {}), name, i) for i in range(1, count + 1)]
+        if kind in ("integer", "number"):
+            low = int(node["minimum"]) if "minimum" in node else int(node.get("exclusiveMinimum", 0)) + 1
+            high = int(node["maximum"]) if "maximum" in node else int(node.get("exclusiveMaximum", low + 100)) - 1
+            value = rng.randint(low, max(low, high))
+            return value if kind == "integer" else float(value)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        if kind == "null":
+            return None
+        return f"{name.replace('_', ' ')} {index}"
+
+    return build(schema, schema.get("title", "item"), 1)
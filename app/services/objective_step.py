@@ -19,6 +19,8 @@ class ProjectNotFound(Exception):
 async def run_objective_step(
     db: AsyncSession,
     project_id: int,
+    *,
+    bypass_cache: bool = False,
 ) -> List[ProjectObjective]:
     project = await db.get(Project, project_id)
     if not project:
@@ -32,7 +34,14 @@ async def run_objective_step(
     prompt = build_objective_prompt(project, selected_items=selected_objs)
 
     try:
-        response = await call_llm(prompt, ObjectiveLLMResponse, db=db, project_id=project_id, step_type=StepType.OBJECTIVE.value)
+        response = await call_llm(
+            prompt,
+            ObjectiveLLMResponse,
+            db=db,
+            project_id=project_id,
+            step_type=StepType.OBJECTIVE.value,
+            bypass_cache=bypass_cache,
+        )
     except LLMError:
         await db.rollback()
         raise
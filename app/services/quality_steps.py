@@ -22,7 +22,7 @@ async def _load_project(db: AsyncSession, project_id: int) -> Project:
 
 
 async def run_quality_steps(
-    db: AsyncSession, project_id: int
+    db: AsyncSession, project_id: int, *, bypass_cache: bool = False
 ) -> Tuple[List[DoDItem], List[NFRItem], List[RiskItem]]:
     project = await _load_project(db, project_id)
     step = await get_or_create_step(db, project_id, StepType.DOD)
@@ -38,7 +38,14 @@ async def run_quality_steps(
         selected_risks=selected_risk,
     )
     try:
-        response = await call_llm(prompt, QualityLLMResponse, db=db, project_id=project_id, step_type=StepType.DOD.value)
+        response = await call_llm(
+            prompt,
+            QualityLLMResponse,
+            db=db,
+            project_id=project_id,
+            step_type=StepType.DOD.value,
+            bypass_cache=bypass_cache,
+        )
     except LLMError:
         await db.rollback()
         raise
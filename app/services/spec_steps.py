@@ -26,7 +26,9 @@ async def _load_project(db: AsyncSession, project_id: int) -> Project:
     return project
 
 
-async def run_tech_stack_step(db: AsyncSession, project_id: int) -> List[TechStackOption]:
+async def run_tech_stack_step(
+    db: AsyncSession, project_id: int, *, bypass_cache: bool = False
+) -> List[TechStackOption]:
     project = await _load_project(db, project_id)
     step = await get_or_create_step(db, project_id, StepType.TECH_STACK)
     await _move_step_to_in_progress(step)
@@ -36,7 +38,14 @@ async def run_tech_stack_step(db: AsyncSession, project_id: int) -> List[TechSta
 
     prompt = build_tech_stack_prompt(project, selected_items=selected_options)
     try:
-        response = await call_llm(prompt, TechStackLLMResponse, db=db, project_id=project_id, step_type=StepType.TECH_STACK.value)
+        response = await call_llm(
+            prompt,
+            TechStackLLMResponse,
+            db=db,
+            project_id=project_id,
+            step_type=StepType.TECH_STACK.value,
+            bypass_cache=bypass_cache,
+        )
     except LLMError:
         await db.rollback()
         raise
@@ -67,7 +76,9 @@ async def run_tech_stack_step(db: AsyncSession, project_id: int) -> List[TechSta
     return options
 
 
-async def run_feature_step(db: AsyncSession, project_id: int) -> List[Feature]:
+async def run_feature_step(
+    db: AsyncSession, project_id: int, *, bypass_cache: bool = False
+) -> List[Feature]:
     project = await _load_project(db, project_id)
     step = await get_or_create_step(db, project_id, StepType.FEATURES)
     await _move_step_to_in_progress(step)
@@ -77,7 +88,14 @@ async def run_feature_step(db: AsyncSession, project_id: int) -> List[Feature]:
 
     prompt = build_feature_prompt(project, selected_items=selected_features)
     try:
-        response = await call_llm(prompt, FeatureLLMResponse, db=db, project_id=project_id, step_type=StepType.FEATURES.value)
+        response = await call_llm(
+            prompt,
+            FeatureLLMResponse,
+            db=db,
+            project_id=project_id,
+            step_type=StepType.FEATURES.value,
+            bypass_cache=bypass_cache,
+        )
     except LLMError:
         await db.rollback()
         raise
@@ -105,7 +123,9 @@ async def run_feature_step(db: AsyncSession, project_id: int) -> List[Feature]:
     return features
 
 
-async def run_architecture_step(db: AsyncSession, project_id: int) -> List[ArchitectureComponent]:
+async def run_architecture_step(
+    db: AsyncSession, project_id: int, *, bypass_cache: bool = False
+) -> List[ArchitectureComponent]:
     project = await _load_project(db, project_id)
     step = await get_or_create_step(db, project_id, StepType.ARCHITECTURE)
     await _move_step_to_in_progress(step)
@@ -115,7 +135,14 @@ async def run_architecture_step(db: AsyncSession, project_id: int) -> List[Archi
 
     prompt = build_architecture_prompt(project, selected_items=selected_arch)
     try:
-        response = await call_llm(prompt, ArchitectureLLMResponse, db=db, project_id=project_id, step_type=StepType.ARCHITECTURE.value)
+        response = await call_llm(
+            prompt,
+            ArchitectureLLMResponse,
+            db=db,
+            project_id=project_id,
+            step_type=StepType.ARCHITECTURE.value,
+            bypass_cache=bypass_cache,
+        )
     except LLMError:
         await db.rollback()
         raise
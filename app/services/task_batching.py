@@ -0,0 +1,93 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Sequence, TypeVar
+
+from app.models.planning import Task
+from app.services.job_cancellation import raise_if_cancelled
+from app.services.llm_policy import estimate_tokens
+
+T = TypeVar("T")
+
+
+def batch_tasks_by_tokens(
+    tasks: Sequence[Task],
+    build_prompt: Callable[[Sequence[Task]], str],
+    *,
+    budget_tokens: int,
+    links: Iterable[tuple[int, int]] = (),
+) -> List[List[Task]]:
+    """
+    Task'ları prompt'u ``budget_tokens``'ı aşmayacak batch'lere böler.
+
+    ``links`` (ör. task dependency'leri) ile bağlı task'lar aynı komşuluk sayılır ve mümkünse aynı
+    batch'e düşer; komşuluklar epic ve sıra ile dizilip sırayla doldurulur, böylece aynı epic'in
+    task'ları da yan yana kalır. Tek başına budget'ı aşan komşuluk sırasıyla bölünür. Budget
+    0 ise tek batch döner.
+    """
+    if not tasks:
+        return []
+    if budget_tokens <= 0:
+        return [list(tasks)]
+
+    overhead = estimate_tokens(build_prompt([]))
+    cost = {t.id: max(estimate_tokens(build_prompt([t])) - overhead, 1) for t in tasks}
+    room = max(budget_tokens - overhead, 1)
+
+    parent = {t.id: t.id for t in tasks}
+
+    def find(task_id: int) -> int:
+        while parent[task_id] != task_id:
+            parent[task_id] = parent[parent[task_id]]
+            task_id = parent[task_id]
+        return task_id
+
+    for a, b in links:
+        if a in parent and b in parent:
+            parent[find(a)] = find(b)
+
+    def sort_key(t: Task) -> tuple:
+        return (t.epic_id or 0, t.order_index or 0, t.id)
+
+    groups: dict[int, list[Task]] = {}
+    for t in sorted(tasks, key=sort_key):
+        groups.setdefault(find(t.id), []).append(t)
+
+    batches: list[list[Task]] = []
+    current: list[Task] = []
+    used = 0
+    for group in sorted(groups.values(), key=lambda g: sort_key(g[0])):
+        size = sum(cost[t.id] for t in group)
+        if current and used + size > room:
+            batches.append(current)
+            current, used = [], 0
+        for t in group:
+            if current and used + cost[t.id] > room:
+                batches.append(current)
+                current, used = [], 0
+            current.append(t)
+            used += cost[t.id]
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def gather_bounded(calls: Sequence[Callable[[], Awaitable[T]]], *, max_parallel: int) -> List[T]:
+    """
+    ``calls``'ı en fazla ``max_parallel`` eşzamanlı çalıştırır, sonuçları aynı sırayla döner.
+    Biri düşerse diğerleri iptal edilir ve hata yükselir.
+    """
+    semaphore = asyncio.Semaphore(max(max_parallel, 1))
+
+    async def run(call: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            raise_if_cancelled()
+            return await call()
+
+    pending = [asyncio.create_task(run(call)) for call in calls]
+    try:
+        return await asyncio.gather(*pending)
+    except BaseException:
+        # bir çağrı düşerse diğerleri boşa beklemesin
+        for fut in pending:
+            fut.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
@@ -1,22 +1,25 @@
 from datetime import datetime, timezone
+from functools import partial
 from typing import List
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.enums import TaskGranularity, TaskStatus, PlanningDetailLevel
 from app.models.planning import Epic, Sprint, SprintEpic, Task
 from app.schemas.llm.tasks import TaskDraftResponse
 from app.services.llm_adapter import call_llm
 from app.services.prompts import build_task_draft_prompt
+from app.services.task_batching import gather_bounded
 
 
-async def generate_draft_tasks_for_epic(
+async def _draft_tasks_response(
     db: AsyncSession, epic: Epic, sprint: Sprint, *, job_id: int | None = None
-) -> List[Task]:
+) -> TaskDraftResponse:
     detail_level = PlanningDetailLevel.LOW
     prompt = build_task_draft_prompt(epic, sprint, detail_level=detail_level)
-    response = await call_llm(
+    return await call_llm(
         prompt,
         TaskDraftResponse,
         db=db,
@@ -25,8 +28,10 @@ async def generate_draft_tasks_for_epic(
         job_id=job_id,
         intent=None,
     )
-    tasks: list[Task] = []
-    base_index = (
+
+
+async def _next_order_index(db: AsyncSession, sprint: Sprint) -> int:
+    return (
         await db.scalar(
             select(Task.order_index)
             .where(Task.sprint_id == sprint.id)
@@ -34,6 +39,11 @@ async def generate_draft_tasks_for_epic(
         )
     ) or 0
 
+
+def _add_draft_tasks(
+    db: AsyncSession, epic: Epic, sprint: Sprint, response: TaskDraftResponse, base_index: int
+) -> List[Task]:
+    tasks: list[Task] = []
     for i, item in enumerate(response.tasks, start=1):
         task = Task(
             project_id=epic.project_id,
@@ -49,6 +59,14 @@ async def generate_draft_tasks_for_epic(
         )
         db.add(task)
         tasks.append(task)
+    return tasks
+
+
+async def generate_draft_tasks_for_epic(
+    db: AsyncSession, epic: Epic, sprint: Sprint, *, job_id: int | None = None
+) -> List[Task]:
+    response = await _draft_tasks_response(db, epic, sprint, job_id=job_id)
+    tasks = _add_draft_tasks(db, epic, sprint, response, await _next_order_index(db, sprint))
     await db.flush()
     await db.commit()
     return tasks
@@ -57,6 +75,10 @@ async def generate_draft_tasks_for_epic(
 async def generate_draft_tasks_for_sprint(
     db: AsyncSession, sprint: Sprint, *, job_id: int | None = None
 ) -> List[Task]:
+    """
+    Epic başına LLM çağrıları ``TASK_PASS1_MAX_PARALLEL`` sınırıyla paralel yapılır; task'lar
+    yanıtlar geldikten sonra epic sırasıyla tek seferde yazılır, order_index sıralı çalışmayla aynı kalır.
+    """
     sprint_epics = (
         await db.execute(
             select(SprintEpic).where(SprintEpic.sprint_id == sprint.id)
@@ -64,9 +86,20 @@ async def generate_draft_tasks_for_sprint(
     ).scalars().all()
     epic_ids = [se.epic_id for se in sprint_epics]
     epics = (
-        await db.execute(select(Epic).where(Epic.id.in_(epic_ids)))
+        await db.execute(select(Epic).where(Epic.id.in_(epic_ids)).order_by(Epic.id))
     ).scalars().all()
+
+    responses = await gather_bounded(
+        [partial(_draft_tasks_response, db, epic, sprint, job_id=job_id) for epic in epics],
+        max_parallel=get_settings().task_pass1_max_parallel,
+    )
+
     tasks: list[Task] = []
-    for epic in epics:
-        tasks.extend(await generate_draft_tasks_for_epic(db, epic, sprint, job_id=job_id))
+    base_index = await _next_order_index(db, sprint)
+    for epic, response in zip(epics, responses):
+        added = _add_draft_tasks(db, epic, sprint, response, base_index)
+        base_index += len(added)
+        tasks.extend(added)
+    await db.flush()
+    await db.commit()
     return tasks
@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
+from functools import partial
 from typing import List
 
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.enums import PlanningDetailLevel, TaskGranularity
 from app.models.planning import Sprint, Task, TaskDependency
 from app.models.project import Project
@@ -11,9 +13,16 @@ from app.models.quality import DoDItem, NFRItem
 from app.schemas.llm.tasks_refine import TaskRefinementResponse
 from app.services.llm_adapter import call_llm
 from app.services.prompts import build_task_refinement_prompt
+from app.services.task_batching import batch_tasks_by_tokens, gather_bounded
 
 
 async def refine_tasks_pass2_for_sprint(db: AsyncSession, sprint: Sprint, *, job_id: int | None = None) -> List[Task]:
+    """
+    Task'lar ``TASK_REFINE_BATCH_TOKENS`` prompt budget'ına göre epic komşuluğunu koruyan batch'lere
+    bölünür ve ``TASK_REFINE_MAX_PARALLEL`` sınırıyla paralel refine edilir; sonuçlar tek seferde yazılır.
+    Dependency'ler yalnızca sprint'in kendi task'larına kurulur; mevcut dependency'ler batch'lemede
+    bağlı task'ları aynı batch'te tutar.
+    """
     tasks = (
         await db.execute(
             select(Task).where(
@@ -46,15 +55,34 @@ async def refine_tasks_pass2_for_sprint(db: AsyncSession, sprint: Sprint, *, job
         )
     ).scalars().all()
 
-    prompt = build_task_refinement_prompt(tasks, dod_items, nfr_items, detail_level)
-    response = await call_llm(
-        prompt,
-        TaskRefinementResponse,
-        db=db,
-        project_id=project_id,
-        step_type="task_pass2",
-        job_id=job_id,
-        intent=None,
+    links = (
+        await db.execute(
+            select(TaskDependency.task_id, TaskDependency.depends_on_task_id).where(
+                TaskDependency.task_id.in_([t.id for t in tasks])
+            )
+        )
+    ).all()
+
+    def build_prompt(batch) -> str:
+        return build_task_refinement_prompt(batch, dod_items, nfr_items, detail_level)
+
+    async def refine(batch: list[Task]) -> TaskRefinementResponse:
+        return await call_llm(
+            build_prompt(batch),
+            TaskRefinementResponse,
+            db=db,
+            project_id=project_id,
+            step_type="task_pass2",
+            job_id=job_id,
+            intent=None,
+        )
+
+    settings = get_settings()
+    batches = batch_tasks_by_tokens(
+        tasks, build_prompt, budget_tokens=settings.task_refine_batch_tokens, links=links
+    )
+    responses = await gather_bounded(
+        [partial(refine, batch) for batch in batches], max_parallel=settings.task_refine_max_parallel
     )
 
     task_map = {t.id: t for t in tasks}
@@ -63,7 +91,8 @@ async def refine_tasks_pass2_for_sprint(db: AsyncSession, sprint: Sprint, *, job
     # Clear previous dependencies for these tasks to avoid duplicates
     await db.execute(delete(TaskDependency).where(TaskDependency.task_id.in_(task_ids)))
 
-    for item in response.tasks:
+    items = [item for response in responses for item in response.tasks]
+    for item in items:
         task = task_map.get(item.task_id)
         if not task:
             continue
@@ -77,7 +106,7 @@ async def refine_tasks_pass2_for_sprint(db: AsyncSession, sprint: Sprint, *, job
         task.updated_at = datetime.now(timezone.utc)
 
         for dep_id in item.depends_on_task_ids or []:
-            if dep_id == task.id:
+            if dep_id == task.id or dep_id not in task_map:
                 continue
             db.add(
                 TaskDependency(
@@ -1,44 +1,34 @@
 from datetime import datetime, timezone
+from functools import partial
 from typing import List
 
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from datetime import datetime, timezone
-
-from sqlalchemy import select, update
-
+from app.core.config import get_settings
 from app.core.enums import PlanningDetailLevel, TaskGranularity, TaskStatus
 from app.models.planning import Task, TaskDependency
 from app.models.project import Project
-from app.schemas.llm.tasks_split import TaskSplitResponse
+from app.schemas.llm.tasks_split import FineTaskItem, TaskSplitResponse
 from app.services.llm_adapter import call_llm
 from app.services.prompts import build_task_split_prompt
+from app.services.task_batching import batch_tasks_by_tokens, gather_bounded
 
 
 async def refine_tasks_pass3_for_sprint(db: AsyncSession, sprint_id: int, *, job_id: int | None = None) -> List[Task]:
-    # Clean previous fine tasks to avoid accumulation on reruns
-    await db.execute(
-        update(Task)
-        .where(
-            Task.sprint_id == sprint_id,
-            Task.refinement_round == 3,
-            Task.granularity == TaskGranularity.FINE,
-            Task.is_deleted == False,  # noqa: E712
-        )
-        .values(is_deleted=True, deleted_at=datetime.now(timezone.utc))
-    )
-    await db.execute(
-        TaskDependency.__table__.delete().where(
-            TaskDependency.depends_on_task_id.in_(
-                select(Task.id).where(
-                    Task.sprint_id == sprint_id,
-                    Task.refinement_round == 3,
-                    Task.is_deleted == True,  # noqa: E712
-                )
+    # previous fine tasks are replaced only once the new split is complete (see below); a failed
+    # rerun leaves them untouched
+    previous_ids = (
+        await db.execute(
+            select(Task.id).where(
+                Task.sprint_id == sprint_id,
+                Task.refinement_round == 3,
+                Task.granularity == TaskGranularity.FINE,
+                Task.is_deleted == False,  # noqa: E712
             )
         )
-    )
+    ).scalars().all()
     medium_tasks = (
         await db.execute(
             select(Task).where(
@@ -57,17 +47,6 @@ async def refine_tasks_pass3_for_sprint(db: AsyncSession, sprint_id: int, *, job
         select(Project.planning_detail_level).where(Project.id == project_id)
     ) or PlanningDetailLevel.NORMAL
 
-    prompt = build_task_split_prompt(medium_tasks, detail_level)
-    response = await call_llm(
-        prompt,
-        TaskSplitResponse,
-        db=db,
-        project_id=project_id,
-        step_type="task_pass3",
-        job_id=job_id,
-        intent=None,
-    )
-
     parent_map = {t.id: t for t in medium_tasks}
     max_order = (
         await db.scalar(
@@ -76,12 +55,21 @@ async def refine_tasks_pass3_for_sprint(db: AsyncSession, sprint_id: int, *, job
             .order_by(Task.order_index.desc())
         )
     ) or 0
-    new_tasks: list[Task] = []
+    links = (
+        await db.execute(
+            select(TaskDependency.task_id, TaskDependency.depends_on_task_id).where(
+                TaskDependency.task_id.in_(parent_map.keys())
+            )
+        )
+    ).all()
+    children: dict[tuple[int, int], Task] = {}
+    persisted: set[tuple[int, int]] = set()
 
-    for idx, item in enumerate(response.tasks, start=1):
+    def add_child(key: tuple[int, int], item: FineTaskItem) -> None:
+        persisted.add(key)
         parent = parent_map.get(item.parent_task_id)
         if not parent:
-            continue
+            return
         child = Task(
             project_id=parent.project_id,
             sprint_id=parent.sprint_id,
@@ -96,11 +84,96 @@ async def refine_tasks_pass3_for_sprint(db: AsyncSession, sprint_id: int, *, job
             status=TaskStatus.READY_FOR_DEV,
             granularity=TaskGranularity.FINE,
             refinement_round=3,
-            order_index=max_order + idx,
+            # geçici sıra; batch'ler bitince (batch, yanıt sırası) ile yeniden numaralanır
+            order_index=max_order + len(persisted),
             created_at=datetime.now(timezone.utc),
         )
         db.add(child)
-        new_tasks.append(child)
+        children[key] = child
+
+    def build_prompt(batch) -> str:
+        return build_task_split_prompt(batch, detail_level)
+
+    async def drop_children(keys: list[tuple[int, int]]) -> None:
+        # session job'la paylaşılır: rollback yerine yalnızca bu pass'in satırları silinir
+        ids = []
+        for key in keys:
+            persisted.discard(key)
+            child = children.pop(key, None)
+            if child is None:
+                continue
+            if child.id is not None:
+                ids.append(child.id)
+            db.expunge(child)
+        if ids:
+            await db.execute(delete(Task).where(Task.id.in_(ids)))
+        await db.commit()
+
+    async def split(batch_no: int, batch: list[Task]) -> TaskSplitResponse:
+        streamed = 0
+
+        async def persist_streamed_task(key: str, raw_item: dict) -> None:
+            # büyük yanıtlarda fine task'lar yanıtın sonunu beklemeden görünür olsun
+            nonlocal streamed
+            if key != "tasks":
+                return
+            streamed += 1
+            try:
+                item = FineTaskItem.model_validate(raw_item)
+            except ValidationError:
+                return  # tüm yanıtın validasyonu karar verir; eleman aşağıda tekrar ele alınır
+            add_child((batch_no, streamed), item)
+            await db.commit()
+
+        async def drop_streamed_tasks() -> None:
+            # yarıda kalan denemenin task'ları son yanıtın parçası değil; retry baştan stream eder
+            nonlocal streamed
+            streamed = 0
+            await drop_children([key for key in list(persisted) if key[0] == batch_no])
+
+        return await call_llm(
+            build_prompt(batch),
+            TaskSplitResponse,
+            db=db,
+            project_id=project_id,
+            step_type="task_pass3",
+            job_id=job_id,
+            intent=None,
+            on_item=persist_streamed_task,
+            on_reset=drop_streamed_tasks,
+        )
+
+    settings = get_settings()
+    batches = batch_tasks_by_tokens(
+        medium_tasks, build_prompt, budget_tokens=settings.task_refine_batch_tokens, links=links
+    )
+    try:
+        responses = await gather_bounded(
+            [partial(split, batch_no, batch) for batch_no, batch in enumerate(batches)],
+            max_parallel=settings.task_refine_max_parallel,
+        )
+    except Exception:
+        # başarılı batch'lerin stream ettiği task'lar da geri alınır; sprint önceki haliyle kalır
+        await drop_children(list(persisted))
+        raise
+
+    for batch_no, response in enumerate(responses):
+        for idx, item in enumerate(response.tasks, start=1):
+            if (batch_no, idx) not in persisted:
+                add_child((batch_no, idx), item)
+    for offset, key in enumerate(sorted(children), start=1):
+        children[key].order_index = max_order + offset
+
+    # Clean previous fine tasks to avoid accumulation on reruns; same commit as the new ones
+    if previous_ids:
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(previous_ids))
+            .values(is_deleted=True, deleted_at=datetime.now(timezone.utc))
+        )
+        await db.execute(
+            TaskDependency.__table__.delete().where(TaskDependency.depends_on_task_id.in_(previous_ids))
+        )
 
     # parent tasks stale to signal replacement (reset stale->todo before we rerun)
     for parent in parent_map.values():
@@ -0,0 +1,172 @@
+"""
+Standalone job worker pool.
+
+    python -m app.worker --concurrency 8
+
+Runs N asyncio worker slots against the shared job queue. Each slot claims jobs with its own
+session from ``AsyncSessionLocal``; idle slots poll with exponential backoff. On SIGTERM/SIGINT
+slots stop claiming, in-flight jobs get ``worker_shutdown_grace_seconds`` to finish and anything
+still running after that is handed back to the queue. A reaper task requeues (or fails) jobs whose
+lease expired because the worker holding them died.
+"""
+import argparse
+import asyncio
+import signal
+
+from app.core.config import get_settings
+from app.observability.logging import get_logger, init_logging
+from app.services.job_engine import reap_expired_jobs, release_jobs_for_worker
+from app.services.job_worker import SessionFactory, default_worker_id, process_next_job
+from app.services.llm_adapter import close_llm_clients
+
+
+def next_poll_delay(current: float, *, minimum: float, maximum: float) -> float:
+    """Doubles the idle poll delay, bounded by [minimum, maximum]."""
+    return max(minimum, min(current * 2, maximum))
+
+
+async def run_worker_slot(
+    session_factory: SessionFactory,
+    worker_id: str,
+    stop: asyncio.Event,
+    *,
+    poll_min: float,
+    poll_max: float,
+) -> int:
+    """
+    Claims and runs jobs until ``stop`` is set. Returns the number of jobs processed. An error
+    escaping a claim or a run is logged and the slot backs off like an idle poll instead of dying.
+    """
+    logger = get_logger("masper.worker", component="worker")
+    delay = poll_min
+    processed = 0
+    while not stop.is_set():
+        try:
+            async with session_factory() as db:
+                job = await process_next_job(db, worker_id=worker_id, session_factory=session_factory)
+        except Exception:  # noqa: BLE001
+            logger.exception("worker.slot_error", extra={"worker_id": worker_id})
+            job = None
+        if job:
+            processed += 1
+            delay = poll_min
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        delay = next_poll_delay(delay, minimum=poll_min, maximum=poll_max)
+    return processed
+
+
+async def run_reaper(
+    session_factory: SessionFactory,
+    stop: asyncio.Event,
+    *,
+    interval: float,
+    max_attempts: int,
+) -> None:
+    """Periodically recovers jobs with expired leases until ``stop`` is set."""
+    logger = get_logger("masper.worker", component="worker")
+    while not stop.is_set():
+        try:
+            async with session_factory() as db:
+                await reap_expired_jobs(db, max_attempts=max_attempts)
+        except Exception:  # noqa: BLE001
+            logger.exception("worker.reaper_error")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker_pool(
+    session_factory: SessionFactory,
+    stop: asyncio.Event,
+    *,
+    concurrency: int,
+    poll_min: float,
+    poll_max: float,
+    shutdown_grace: float,
+    worker_id: str | None = None,
+) -> int:
+    """Runs ``concurrency`` worker slots until ``stop`` is set; returns total jobs processed."""
+    logger = get_logger("masper.worker", component="worker")
+    settings = get_settings()
+    base_id = worker_id or default_worker_id()
+    slot_ids = [f"{base_id}/{i}" for i in range(concurrency)]
+    slots = [
+        asyncio.create_task(
+            run_worker_slot(session_factory, slot_id, stop, poll_min=poll_min, poll_max=poll_max)
+        )
+        for slot_id in slot_ids
+    ]
+    reaper = asyncio.create_task(
+        run_reaper(
+            session_factory,
+            stop,
+            interval=settings.job_reaper_interval_seconds,
+            max_attempts=settings.job_max_attempts,
+        )
+    )
+    logger.info("worker.started", extra={"worker_id": base_id, "concurrency": concurrency})
+
+    await stop.wait()
+    await reaper
+    done, pending = await asyncio.wait(slots, timeout=shutdown_grace)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    requeued = 0
+    async with session_factory() as db:
+        for slot_id in slot_ids:
+            requeued += await release_jobs_for_worker(db, slot_id)
+
+    processed = sum(t.result() for t in done if not t.cancelled() and t.exception() is None)
+    logger.info(
+        "worker.stopped",
+        extra={"worker_id": base_id, "processed": processed, "requeued": requeued},
+    )
+    return processed
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Masper job worker pool")
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency)
+    parser.add_argument("--poll-min", type=float, default=settings.worker_poll_min_seconds)
+    parser.add_argument("--poll-max", type=float, default=settings.worker_poll_max_seconds)
+    parser.add_argument("--shutdown-grace", type=float, default=settings.worker_shutdown_grace_seconds)
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> None:  # pragma: no cover - process entrypoint
+    from app.db.session import AsyncSessionLocal, engine
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await run_worker_pool(
+            AsyncSessionLocal,
+            stop,
+            concurrency=args.concurrency,
+            poll_min=args.poll_min,
+            poll_max=args.poll_max,
+            shutdown_grace=args.shutdown_grace,
+        )
+    finally:
+        await close_llm_clients()
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover - process entrypoint
+    init_logging()
+    asyncio.run(_main(_parse_args(argv)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
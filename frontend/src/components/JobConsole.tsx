@@ -3,10 +3,12 @@
 import { useEffect, useMemo, useState } from "react";
 import {
   Job,
+  JobEvent,
   createTaskPipelineJob,
   getJob,
   getJobs,
   cancelJob,
+  jobEventsUrl,
   runNextJob,
 } from "@/lib/api";
 
@@ -33,6 +35,28 @@ export function JobConsole({ projectId, sprintId }: Props) {
 
   useEffect(() => {
     if (!selectedJobId) return;
+    if (typeof EventSource !== "undefined") {
+      // SSE: server pushes progress; no polling
+      const source = new EventSource(jobEventsUrl(selectedJobId));
+      source.addEventListener("job", (e) => {
+        const event: JobEvent = JSON.parse((e as MessageEvent).data);
+        setJobs((prev) =>
+          prev.map((j) =>
+            j.id === event.job_id
+              ? {
+                  ...j,
+                  status: event.status,
+                  progress_pct: event.progress_pct,
+                  current_step: event.current_step,
+                  error_message: event.error_message,
+                }
+              : j
+          )
+        );
+        if (["completed", "failed", "cancelled"].includes(event.status)) source.close();
+      });
+      return () => source.close();
+    }
     const interval = setInterval(() => {
       getJob(selectedJobId)
         .then((job) => {
@@ -31,6 +31,15 @@ export type Job = {
   finished_at?: string | null;
 };
 
+export type JobEvent = {
+  job_id: number;
+  status: string;
+  progress_pct?: number | null;
+  current_step?: string | null;
+  error_message?: string | null;
+  seq: number;
+};
+
 export type Task = {
   id: number;
   title: string;
@@ -363,6 +372,7 @@ export const getSprints = (projectId: number) =>
 export const getJobs = (projectId: number) =>
   request<Job[]>(`/projects/${projectId}/jobs`);
 export const getJob = (jobId: number) => request<Job>(`/jobs/${jobId}`);
+export const jobEventsUrl = (jobId: number) => `${API_BASE}/jobs/${jobId}/events`;
 export const createTaskPipelineJob = (projectId: number, sprintId: number) =>
   request<Job>("/jobs/task-pipeline-for-sprint", {
     method: "POST",
@@ -381,16 +391,33 @@ export const getWizardSummary = (projectId: number) =>
   request<WizardSummary>(`/projects/${projectId}/spec-wizard/summary`);
 export const getWizardDetail = (projectId: number) =>
   request<WizardDetail>(`/projects/${projectId}/spec-wizard/detail`);
-export const runObjective = (projectId: number) =>
-  request(`/projects/${projectId}/steps/objective/run`, { method: "POST" });
-export const runTechStack = (projectId: number) =>
-  request(`/projects/${projectId}/steps/tech-stack/run`, { method: "POST" });
-export const runFeatures = (projectId: number) =>
-  request(`/projects/${projectId}/steps/features/run`, { method: "POST" });
-export const runArchitecture = (projectId: number) =>
-  request(`/projects/${projectId}/steps/architecture/run`, { method: "POST" });
-export const runQuality = (projectId: number) =>
-  request(`/projects/${projectId}/steps/quality/run`, { method: "POST" });
+const TERMINAL_JOB_STATUSES = ["completed", "failed", "cancelled"];
+
+// Long-polls /jobs/{id}/events until the job finishes; rejects if it failed or was cancelled.
+export async function waitForJob(jobId: number, waitSeconds = 25): Promise<JobEvent> {
+  let seq = 0;
+  for (;;) {
+    const event = await request<JobEvent>(`/jobs/${jobId}/events?wait=${waitSeconds}&after_seq=${seq}`);
+    if (TERMINAL_JOB_STATUSES.includes(event.status)) {
+      if (event.status !== "completed") {
+        throw new Error(event.error_message || `Job ${event.status}`);
+      }
+      return event;
+    }
+    seq = Math.max(seq, event.seq);
+  }
+}
+
+// Wizard steps run as background jobs (202 + job); these resolve once the job is done.
+const runStepJob = async (projectId: number, step: string) => {
+  const job = await request<Job>(`/projects/${projectId}/steps/${step}/run`, { method: "POST" });
+  return waitForJob(job.id);
+};
+export const runObjective = (projectId: number) => runStepJob(projectId, "objective");
+export const runTechStack = (projectId: number) => runStepJob(projectId, "tech-stack");
+export const runFeatures = (projectId: number) => runStepJob(projectId, "features");
+export const runArchitecture = (projectId: number) => runStepJob(projectId, "architecture");
+export const runQuality = (projectId: number) => runStepJob(projectId, "quality");
 
 // Approval endpoints
 export const approveStep = (projectId: number, stepType: string) =>
@@ -403,12 +430,17 @@ export const rejectStep = (projectId: number, stepType: string, feedback: string
     headers: { "Content-Type": "application/json" },
   });
 
-export const regenerateStep = (projectId: number, stepType: string, feedback?: string) =>
-  request(`/projects/${projectId}/steps/${stepType}/regenerate`, {
+export const regenerateStep = async (projectId: number, stepType: string, feedback?: string) => {
+  const res = await request<{ job_id?: number | null }>(`/projects/${projectId}/steps/${stepType}/regenerate`, {
     method: "POST",
     body: JSON.stringify({ feedback }),
     headers: { "Content-Type": "application/json" },
   });
+  if (res?.job_id) {
+    await waitForJob(res.job_id);
+  }
+  return res;
+};
 
 export const toggleItemSelection = (projectId: number, itemType: string, itemId: number) =>
   request(`/items/${itemType}/${itemId}/toggle-select`, {
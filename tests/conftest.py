@@ -11,17 +11,42 @@ import app.models  # noqa: F401 - register models
 from app.db.base import Base
 from app.db.session import get_db
 from app.main import create_app
+from app.models.planning import Sprint, SprintPlan
+from app.models.project import Project
 from app.services import llm_adapter
+from app.services.job_events import job_events
+from app.services.llm_cache import clear_memory_cache
+from app.services.llm_policy import reset_circuit_breakers
+
+
+@pytest.fixture(autouse=True)
+def reset_job_events():
+    # job ids restart in every test database; don't leak progress snapshots between tests
+    job_events.clear()
+    yield
+    job_events.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_cache():
+    # tests fake the provider with different answers for the same prompt, and failing fakes
+    # must not leave a provider's circuit open for the next test
+    clear_memory_cache()
+    reset_circuit_breakers()
+    yield
+    clear_memory_cache()
+    reset_circuit_breakers()
 
 
 @pytest.fixture
-def test_app():
-    # Use a temp SQLite file to allow multiple connections
+def session_factory():
+    # Temp SQLite file so every session (worker, heartbeat, API request) gets its own connection;
+    # a generous busy timeout because concurrent writers queue up on SQLite's single write lock
     fd, db_path = tempfile.mkstemp()
     os.close(fd)
-    database_url = f"sqlite+aiosqlite:///{db_path}"
-
-    engine = create_async_engine(database_url, future=True)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", future=True, connect_args={"timeout": 60}
+    )
 
     async def init_models():
         async with engine.begin() as conn:
@@ -29,10 +54,30 @@ def test_app():
 
     asyncio.get_event_loop().run_until_complete(init_models())
 
-    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+
+    asyncio.get_event_loop().run_until_complete(engine.dispose())
+    os.remove(db_path)
 
+
+async def seed_project(session: AsyncSession, *, sprints: int = 1) -> tuple[Project, SprintPlan, list[Sprint]]:
+    """Project with one sprint plan and ``sprints`` sprints (S1, S2, ...), committed."""
+    project = Project(name="P", description="D")
+    session.add(project)
+    await session.flush()
+    plan = SprintPlan(project_id=project.id, name="Plan")
+    session.add(plan)
+    await session.flush()
+    created = [Sprint(sprint_plan_id=plan.id, index=i, name=f"S{i}") for i in range(1, sprints + 1)]
+    session.add_all(created)
+    await session.commit()
+    return project, plan, created
+
+
+@pytest.fixture
+def test_app(session_factory):
     async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
-        async with SessionLocal() as session:
+        async with session_factory() as session:
             yield session
 
     app = create_app()
@@ -41,13 +86,12 @@ def test_app():
 
     yield client
 
-    asyncio.get_event_loop().run_until_complete(engine.dispose())
-    os.remove(db_path)
-
 
 @pytest.fixture
 def llm_dummy(monkeypatch):
-    async def fake_raw(prompt: str, provider: str, model: str, temperature: float | None, max_tokens: int | None):
+    async def fake_raw(
+        prompt: str, provider: str, model: str, temperature: float | None, max_tokens: int | None, response_model=None
+    ):
         return '{"objectives":[{"title":"Test Obj","description":"Desc","priority":1}]}'
 
     monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
@@ -98,6 +98,12 @@ def item_flow_client(monkeypatch):
     asyncio.get_event_loop().run_until_complete(engine.dispose())
 
 
+def _run_step(client, project_id: int, step: str) -> None:
+    # steps are queued as jobs (202); run-next executes the job in-process
+    assert client.post(f"/projects/{project_id}/steps/{step}/run").status_code == 202
+    assert client.post("/jobs/run-next").json()["status"] == "completed"
+
+
 async def _create_project(session):
     project = Project(name="Proj", description="Desc")
     session.add(project)
@@ -114,7 +120,7 @@ async def test_full_item_selection_approval_flow(item_flow_client):
         project = await _create_project(session)
 
     # Generate features via endpoint (creates pending/complete step)
-    assert client.post(f"/projects/{project.id}/steps/features/run").status_code == 200
+    _run_step(client, project.id, "features")
 
     # select all then approve
     sel_resp = client.post(f"/projects/{project.id}/items/feature/select-all")
@@ -143,11 +149,11 @@ async def test_multi_step_selection_flow_all_items(item_flow_client):
         project = await _create_project(session)
 
     # run all steps to create items
-    assert client.post(f"/projects/{project.id}/steps/objective/run").status_code == 200
-    assert client.post(f"/projects/{project.id}/steps/tech-stack/run").status_code == 200
-    assert client.post(f"/projects/{project.id}/steps/features/run").status_code == 200
-    assert client.post(f"/projects/{project.id}/steps/architecture/run").status_code == 200
-    assert client.post(f"/projects/{project.id}/steps/quality/run").status_code == 200
+    _run_step(client, project.id, "objective")
+    _run_step(client, project.id, "tech-stack")
+    _run_step(client, project.id, "features")
+    _run_step(client, project.id, "architecture")
+    _run_step(client, project.id, "quality")
 
     # select all item types
     for item_type in ["objective", "tech_stack", "feature", "architecture", "dod", "nfr", "risk"]:
@@ -171,7 +177,7 @@ async def test_reject_and_regenerate_preserves_selected(item_flow_client):
         project = await _create_project(session)
 
     # initial generation
-    assert client.post(f"/projects/{project.id}/steps/features/run").status_code == 200
+    _run_step(client, project.id, "features")
 
     detail = client.get(f"/projects/{project.id}/spec-wizard/detail").json()
     first_feature_id = detail["features"][0]["id"]
@@ -194,7 +200,8 @@ async def test_reject_and_regenerate_preserves_selected(item_flow_client):
 
     # regenerate
     regen_resp = client.post(f"/projects/{project.id}/steps/{StepType.FEATURES.value}/regenerate")
-    assert regen_resp.status_code == 200
+    assert regen_resp.status_code == 202
+    assert client.post("/jobs/run-next").json()["id"] == regen_resp.json()["job_id"]
 
     async with SessionLocal() as session:
         # selected remains and not deleted
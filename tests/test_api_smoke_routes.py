@@ -98,7 +98,7 @@ def api_client(monkeypatch):
     monkeypatch.setattr(tasks_router, "refine_tasks_pass3_for_sprint", fake_refine_tasks_pass3_for_sprint)
 
     # patch job services
-    async def fake_create_job_for_task_pipeline(db, project, sprint, payload_dict=None):
+    async def fake_create_job_for_task_pipeline(db, project, sprint, payload_dict=None, **kwargs):
         job = Job(
             project_id=project.id,
             sprint_id=sprint.id,
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus, TaskGranularity
+from app.db.base import Base
+from app.models.planning import Epic, Sprint, SprintEpic, SprintPlan, Task, TaskDependency
+from app.models.project import Project
+from app.schemas.llm.objective import ObjectiveLLMResponse
+from app.schemas.llm.quality import QualityLLMResponse
+from app.schemas.llm.tasks_split import TaskSplitResponse
+from app.services import job_engine, llm_adapter
+from app.services.llm_synthetic import prompt_task_ids
+
+
+@pytest.mark.asyncio
+async def test_dummy_provider_answers_any_response_model(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_provider", "dummy")
+    monkeypatch.setattr(get_settings(), "llm_dummy_array_items", 5)
+    quality = await llm_adapter.call_llm("quality", QualityLLMResponse)
+    assert len(quality.dod_items) == len(quality.risks) == 5
+    assert all(1 <= r.impact <= 5 for r in quality.risks)
+    assert len((await llm_adapter.call_llm("objectives", ObjectiveLLMResponse)).objectives) == 5
+
+    split = await llm_adapter.call_llm("- (7) A: x\n- (3) B: y", TaskSplitResponse)
+    assert [t.parent_task_id for t in split.tasks] == [7] * 5 + [3] * 5
+    assert prompt_task_ids("- (12) T: d\nnot - (13) a task") == [12]
+
+
+@pytest.mark.asyncio
+async def test_task_pipeline_runs_end_to_end_on_dummy_provider(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_provider", "dummy")
+    monkeypatch.setattr(settings, "llm_dummy_array_items", 6)
+    monkeypatch.setattr(settings, "task_refine_batch_tokens", 200)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.flush()
+        plan = SprintPlan(project_id=project.id, name="Plan")
+        session.add(plan)
+        await session.flush()
+        sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+        epics = [Epic(project_id=project.id, name=f"E{i}") for i in range(2)]
+        session.add(sprint)
+        session.add_all(epics)
+        await session.flush()
+        session.add_all([SprintEpic(sprint_id=sprint.id, epic_id=e.id) for e in epics])
+        await session.commit()
+
+        job = await job_engine.create_job_for_task_pipeline(session, project, sprint, payload_dict=None)
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.COMPLETED.value, job.error_message
+
+        async def count(granularity):
+            return await session.scalar(
+                select(func.count(Task.id)).where(
+                    Task.granularity == granularity, Task.is_deleted == False  # noqa: E712
+                )
+            )
+
+        # 2 epic x 6 task -> pass2 hepsini refine eder -> her parent için 6 fine task
+        assert await count(TaskGranularity.MEDIUM) == 12
+        assert await count(TaskGranularity.FINE) == 72
+        assert await session.scalar(select(func.count()).select_from(TaskDependency)) > 0
+
+    await engine.dispose()
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus
+from app.models.job import Job
+from app.services import job_engine, job_worker, llm_adapter
+from app.services.job_cancellation import (
+    JobCancelled,
+    cancellation_scope,
+    request_cancellation,
+    run_cancellable,
+)
+from tests.conftest import seed_project
+
+
+class Echo(BaseModel):
+    ok: bool
+
+
+@pytest.mark.asyncio
+async def test_run_cancellable_interrupts_pending_awaitable():
+    assert await run_cancellable(asyncio.sleep(0, result="plain")) == "plain"
+    assert request_cancellation(404) is False
+
+    interrupted = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            interrupted.set()
+            raise
+
+    with cancellation_scope(1):
+        assert await run_cancellable(asyncio.sleep(0, result="done")) == "done"
+        asyncio.get_running_loop().call_later(0.02, request_cancellation, 1)
+        with pytest.raises(JobCancelled):
+            await asyncio.wait_for(run_cancellable(slow()), timeout=1)
+        with pytest.raises(JobCancelled):
+            await run_cancellable(asyncio.sleep(0))
+    assert interrupted.is_set()
+    assert request_cancellation(1) is False
+
+
+@pytest.mark.asyncio
+async def test_call_llm_abandons_in_flight_request(monkeypatch):
+    calls = []
+
+    async def hanging_call(prompt, **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", hanging_call)
+    with cancellation_scope(2):
+        asyncio.get_running_loop().call_later(0.02, request_cancellation, 2)
+        with pytest.raises(JobCancelled):
+            await asyncio.wait_for(llm_adapter.call_llm("p", Echo), timeout=1)
+    # cancellation is not retried like a provider error
+    assert calls == ["p"]
+
+
+@pytest.mark.asyncio
+async def test_worker_cancels_running_llm_call_from_another_session(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_cancel_poll_seconds", 0.02)
+
+    async def hanging_call(prompt, **kwargs):
+        await asyncio.sleep(30)
+
+    async def pass1(db, sprint, job_id=None):
+        await llm_adapter.call_llm("draft", Echo, job_id=job_id)
+        return []
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", hanging_call)
+    monkeypatch.setattr(job_engine, "generate_draft_tasks_for_sprint", pass1)
+
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        job = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job_id = job.id
+
+    async def cancel_via_api():
+        await asyncio.sleep(0.1)
+        async with session_factory() as other:
+            running = await other.get(Job, job_id)
+            running.cancellation_requested = True
+            await other.commit()
+
+    canceller = asyncio.create_task(cancel_via_api())
+    async with session_factory() as session:
+        job = await asyncio.wait_for(job_worker.process_next_job(session), timeout=2)
+    await canceller
+    assert job.status == JobStatus.CANCELLED.value
+    assert job.finished_at is not None
@@ -0,0 +1,73 @@
+import json
+from collections import Counter
+
+import pytest
+
+import app.models  # noqa: F401
+from app.core.enums import JobStatus, TaskStatus
+from app.services import job_engine
+from tests.conftest import seed_project
+
+
+class FineTask:
+    status = TaskStatus.READY_FOR_DEV
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_after_last_finished_pass(session_factory, monkeypatch):
+    calls: Counter[str] = Counter()
+
+    async def fake_pass1(db, sprint, job_id=None):
+        calls["pass1"] += 1
+        return [object(), object()]
+
+    async def fake_pass2(db, sprint, job_id=None):
+        calls["pass2"] += 1
+        return [object(), object(), object()]
+
+    async def flaky_pass3(db, sprint_id, job_id=None):
+        calls["pass3"] += 1
+        if calls["pass3"] == 1:
+            raise RuntimeError("quota")
+        return [FineTask()]
+
+    monkeypatch.setattr(job_engine, "generate_draft_tasks_for_sprint", fake_pass1)
+    monkeypatch.setattr(job_engine, "refine_tasks_pass2_for_sprint", fake_pass2)
+    monkeypatch.setattr(job_engine, "refine_tasks_pass3_for_sprint", flaky_pass3)
+
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        job = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.FAILED.value
+        assert set(json.loads(job.checkpoint_json)["passes"]) == {"pass1", "pass2"}
+
+        job = await job_engine.retry_job(session, job)
+        assert job.status == JobStatus.QUEUED.value
+        assert job.error_message is None and job.finished_at is None
+
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.COMPLETED.value
+        assert calls == Counter({"pass1": 1, "pass2": 1, "pass3": 2})
+        assert json.loads(job.result_json) == {
+            "draft_tasks": 2,
+            "refined_tasks": 3,
+            "fine_tasks": 1,
+            "ready_for_dev_tasks": 1,
+        }
+
+        with pytest.raises(job_engine.InvalidJobTransition):
+            await job_engine.retry_job(session, job)
+
+
+def test_retry_endpoint_rejects_unknown_and_unfinished_jobs(test_app):
+    assert test_app.post("/jobs/999/retry").status_code == 404
+
+    project = test_app.post("/projects", json={"name": "P", "description": "D"}).json()
+    assert test_app.post(f"/projects/{project['id']}/planning/generate-sprint-plan").status_code == 200
+    sprints = test_app.get(f"/projects/{project['id']}/sprints").json()
+    job = test_app.post(
+        "/jobs/task-pipeline-for-sprint",
+        json={"project_id": project["id"], "sprint_id": sprints[0]["id"]},
+    ).json()
+    assert test_app.post(f"/jobs/{job['id']}/retry").status_code == 409
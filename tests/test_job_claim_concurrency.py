@@ -0,0 +1,149 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+import app.models  # noqa: F401
+from app.core.enums import JobStatus, JobType
+from app.models.job import Job
+from app.services import job_engine, job_worker
+from tests.conftest import seed_project
+
+WORKERS = 32
+JOBS = 80
+# full worker runs (claim, heartbeat, final write) contend harder on SQLite's single write lock
+RUN_WORKERS = 8
+
+
+async def _seed_queue(SessionLocal, count: int) -> None:
+    async with SessionLocal() as session:
+        project, _, (sprint,) = await seed_project(session)
+        for _ in range(count):
+            session.add(
+                Job(
+                    project_id=project.id,
+                    sprint_id=sprint.id,
+                    type=JobType.TASK_PIPELINE_FOR_SPRINT.value,
+                    status=JobStatus.QUEUED.value,
+                    payload_json="{}",
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_are_exclusive(session_factory):
+    await _seed_queue(session_factory, JOBS)
+
+    claims: list[tuple[str, int]] = []
+
+    async def claimer(worker_id: str) -> None:
+        async with session_factory() as session:
+            while True:
+                job = await job_worker.claim_next_job(session, worker_id, project_max_concurrency=0)
+                if job is None:
+                    return
+                assert job.locked_by == worker_id
+                claims.append((worker_id, job.id))
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*(claimer(f"w{i}") for i in range(WORKERS)))
+
+    claimed_ids = [job_id for _, job_id in claims]
+    assert len(claimed_ids) == JOBS
+    assert len(set(claimed_ids)) == JOBS
+
+    async with session_factory() as session:
+        rows = (await session.execute(select(Job.id, Job.locked_by))).all()
+    assert {row.id: row.locked_by for row in rows} == {job_id: w for w, job_id in claims}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_run_each_job_once(session_factory, monkeypatch):
+    await _seed_queue(session_factory, JOBS)
+
+    runs: Counter[int] = Counter()
+
+    async def fake_run(db, sprint, job):
+        runs[job.id] += 1
+        await asyncio.sleep(0)
+        return {"ok": 1}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", fake_run)
+
+    async def worker(worker_id: str) -> None:
+        async with session_factory() as session:
+            await job_worker.run_worker_loop(session, worker_id=worker_id)
+
+    await asyncio.gather(*(worker(f"w{i}") for i in range(RUN_WORKERS)))
+
+    assert len(runs) == JOBS
+    assert set(runs.values()) == {1}
+    async with session_factory() as session:
+        statuses = (await session.execute(select(Job.status))).scalars().all()
+    assert statuses == [JobStatus.COMPLETED.value] * JOBS
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_already_claimed_job(session_factory):
+    await _seed_queue(session_factory, 1)
+
+    async with session_factory() as session:
+        first = await job_worker.claim_next_job(session, "a")
+        second = await job_worker.claim_next_job(session, "b")
+        assert first is not None and first.locked_by == "a"
+        assert second is None
+
+
+@pytest.mark.asyncio
+async def test_job_cancelled_between_claim_and_start_is_not_run(session_factory, monkeypatch):
+    await _seed_queue(session_factory, 1)
+
+    async def fail_run(db, sprint, job):  # pragma: no cover - must not run
+        raise AssertionError("cancelled job started")
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", fail_run)
+    async with session_factory() as session:
+        job = await job_worker.claim_next_job(session, "a")
+        async with session_factory() as api:
+            row = await api.get(Job, job.id)
+            row.status = JobStatus.CANCELLED.value
+            await api.commit()
+        # the worker still holds the stale QUEUED object
+        assert job.status == JobStatus.QUEUED.value
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.CANCELLED.value
+        assert job.started_at is None
+
+
+@pytest.mark.asyncio
+async def test_claim_retries_when_sqlite_reports_a_lock(session_factory, monkeypatch):
+    await _seed_queue(session_factory, 1)
+    real_select = job_worker.select_claim_candidates
+    calls = {"n": 0}
+
+    async def locked_once(db, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise OperationalError("UPDATE jobs", {}, Exception("database is locked"))
+        return await real_select(db, **kwargs)
+
+    monkeypatch.setattr(job_worker, "select_claim_candidates", locked_once)
+    async with session_factory() as session:
+        job = await job_worker.claim_next_job(session, "a")
+    assert job is not None and job.locked_by == "a"
+    assert calls["n"] == 2
+
+    async def always_broken(db, **kwargs):
+        raise OperationalError("SELECT", {}, Exception("no such table: jobs"))
+
+    monkeypatch.setattr(job_worker, "select_claim_candidates", always_broken)
+    async with session_factory() as session:
+        with pytest.raises(OperationalError):
+            await job_worker.claim_next_job(session, "b")
+
+
+def test_default_worker_id_is_unique():
+    assert job_worker.default_worker_id() != job_worker.default_worker_id()
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+import app.models  # noqa: F401
+from app.core.enums import JobStatus
+from app.models.job import Job
+from app.services import job_engine
+from tests.conftest import seed_project
+
+
+@pytest.mark.asyncio
+async def test_identical_active_job_is_returned_instead_of_queued_twice(session_factory):
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        first = await job_engine.create_job_for_task_pipeline(session, project, sprint, {"a": 1, "b": 2})
+        again = await job_engine.create_job_for_task_pipeline(session, project, sprint, {"b": 2, "a": 1})
+        assert again.id == first.id
+
+        other = await job_engine.create_job_for_task_pipeline(session, project, sprint, {"a": 2})
+        assert other.id != first.id
+
+        # once the first one finished, the same request queues a fresh job
+        first.status = JobStatus.COMPLETED.value
+        await session.commit()
+        fresh = await job_engine.create_job_for_task_pipeline(session, project, sprint, {"a": 1, "b": 2})
+        assert fresh.id not in {first.id, other.id}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_submissions_create_one_job(session_factory):
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+
+    async def submit():
+        async with session_factory() as session:
+            return (await job_engine.create_job_for_task_pipeline(session, project, sprint)).id
+
+    ids = await asyncio.gather(*(submit() for _ in range(8)))
+    assert len(set(ids)) == 1
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count(Job.id))) == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_and_rejects_other_requests(session_factory):
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        job = await job_engine.create_job_for_task_pipeline(
+            session, project, sprint, {"a": 1}, idempotency_key="click-1"
+        )
+        job.status = JobStatus.COMPLETED.value
+        await session.commit()
+
+        # the key identifies the submission even after the job finished
+        replay = await job_engine.create_job_for_task_pipeline(
+            session, project, sprint, {"a": 1}, idempotency_key="click-1"
+        )
+        assert replay.id == job.id
+        with pytest.raises(job_engine.IdempotencyKeyConflict):
+            await job_engine.create_job_for_task_pipeline(
+                session, project, sprint, {"a": 2}, idempotency_key="click-1"
+            )
+
+
+@pytest.mark.asyncio
+async def test_retry_is_refused_while_an_identical_job_is_active(session_factory):
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        failed = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        failed.status = JobStatus.FAILED.value
+        await session.commit()
+        active = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        assert active.id != failed.id
+
+        with pytest.raises(job_engine.DuplicateJobActive):
+            await job_engine.retry_job(session, failed)
+
+
+def test_double_submit_endpoint_returns_same_job(test_app):
+    project = test_app.post("/projects", json={"name": "P", "description": "D"}).json()
+    assert test_app.post(f"/projects/{project['id']}/planning/generate-sprint-plan").status_code == 200
+    sprint = test_app.get(f"/projects/{project['id']}/sprints").json()[0]
+    body = {"project_id": project["id"], "sprint_id": sprint["id"]}
+
+    first = test_app.post("/jobs/task-pipeline-for-sprint", json=body).json()
+    second = test_app.post("/jobs/task-pipeline-for-sprint", json=body).json()
+    assert first["id"] == second["id"]
+
+    keyed = test_app.post(
+        "/jobs/task-pipeline-for-sprint", json={**body, "priority": 5}, headers={"Idempotency-Key": "k1"}
+    )
+    assert keyed.json()["idempotency_key"] == "k1"
+    conflict = test_app.post(
+        "/jobs/task-pipeline-for-sprint", json={**body, "priority": 6}, headers={"Idempotency-Key": "k1"}
+    )
+    assert conflict.status_code == 409
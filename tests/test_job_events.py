@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.enums import JobStatus, JobType
+from app.models.job import Job
+from app.models.planning import Sprint, SprintPlan
+from app.models.project import Project
+from app.services import job_events as events
+from app.services.job_cancellation import cancellation_scope
+from app.services.job_events import JobEventBus, job_events
+
+
+def _running(pct: int, step: str) -> dict:
+    return {"status": "running", "progress_pct": pct, "current_step": step, "error_message": None}
+
+
+def test_bus_sequences_and_evicts():
+    bus = JobEventBus(max_jobs=2)
+    assert bus.publish(1, _running(10, "pass1"))["seq"] == 1
+    assert bus.publish(1, _running(50, "pass2"))["seq"] == 2
+    bus.publish(2, _running(0, "queued"))
+    bus.publish(3, _running(0, "queued"))
+    assert bus.latest(1) is None
+    assert bus.latest(3)["job_id"] == 3
+
+    with bus.subscribe(3) as queue:
+        bus.publish(3, _running(10, "pass1"))
+        assert queue.get_nowait()["progress_pct"] == 10
+    assert 3 not in bus._subscribers  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_buffered_or_next_local_event():
+    job_events.publish(7, _running(10, "pass1"))
+
+    async def no_db():
+        raise AssertionError("local jobs must not hit the DB")
+
+    event = await events.wait_for_job_event(7, after_seq=0, timeout=1, load_state=no_db, db_poll=0.5)
+    assert event["seq"] == 1
+
+    async def later():
+        await asyncio.sleep(0.1)
+        job_events.publish(7, _running(50, "pass2"))
+
+    publisher = asyncio.create_task(later())
+    with cancellation_scope(7):
+        event = await events.wait_for_job_event(7, after_seq=1, timeout=1, load_state=no_db, db_poll=0.01)
+    await publisher
+    assert event["current_step"] == "pass2"
+
+
+@pytest.mark.asyncio
+async def test_wait_polls_db_for_job_published_here_but_run_elsewhere():
+    # the API publishes on enqueue; the job itself runs in a separate worker process
+    job_events.publish(8, {**_running(0, None), "status": "queued"})
+    states = iter([{**_running(0, None), "status": "queued"}, _running(10, "pass1")])
+    reads = []
+
+    async def load_state():
+        reads.append(1)
+        return {"job_id": 8, **next(states), "seq": 0}
+
+    event = await events.wait_for_job_event(
+        8, after_seq=1, timeout=5, load_state=load_state, db_poll=0.01, known=job_events.latest(8)
+    )
+    assert event["current_step"] == "pass1"
+    assert len(reads) == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_falls_back_to_db_for_remote_jobs():
+    states = iter([_running(10, "pass1"), _running(10, "pass1"), _running(50, "pass2")])
+
+    async def load_state():
+        return {"job_id": 9, **next(states), "seq": 0}
+
+    event = await events.wait_for_job_event(9, after_seq=0, timeout=1, load_state=load_state, db_poll=0.01)
+    assert event["current_step"] == "pass2"
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_with_current_state():
+    async def load_state():
+        return {"job_id": 5, **_running(10, "pass1"), "seq": 0}
+
+    event = await events.wait_for_job_event(
+        5, after_seq=0, timeout=0.03, load_state=load_state, db_poll=0.01
+    )
+    assert event["progress_pct"] == 10
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_changes_until_terminal():
+    initial = job_events.publish(3, _running(10, "pass1"))
+
+    async def no_db():
+        return None
+
+    async def drive():
+        await asyncio.sleep(0.02)
+        job_events.publish(3, _running(80, "pass3"))
+        await asyncio.sleep(0.02)
+        job_events.publish(3, {**_running(100, "completed"), "status": "completed"})
+
+    driver = asyncio.create_task(drive())
+    chunks = [
+        chunk
+        async for chunk in events.stream_job_events(
+            3, initial, load_state=no_db, keepalive=1, db_poll=0.5
+        )
+    ]
+    await driver
+    payloads = [json.loads(c.split("data: ", 1)[1]) for c in chunks if c.startswith("event:")]
+    assert [p["progress_pct"] for p in payloads] == [10, 80, 100]
+    assert payloads[-1]["status"] == "completed"
+
+
+def _seed_job(client, status: str) -> int:
+    from app.db.session import get_db
+
+    override = client.app.dependency_overrides[get_db]
+
+    async def seed():
+        async for session in override():
+            project = Project(name="P", description="D")
+            session.add(project)
+            await session.flush()
+            plan = SprintPlan(project_id=project.id, name="Plan")
+            session.add(plan)
+            await session.flush()
+            sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+            session.add(sprint)
+            await session.flush()
+            job = Job(
+                project_id=project.id,
+                sprint_id=sprint.id,
+                type=JobType.TASK_PIPELINE_FOR_SPRINT.value,
+                status=status,
+                payload_json="{}",
+                progress_pct=100,
+                current_step="completed",
+            )
+            session.add(job)
+            await session.commit()
+            return job.id
+
+    return asyncio.get_event_loop().run_until_complete(seed())
+
+
+def test_sse_endpoint_streams_terminal_state(test_app):
+    job_id = _seed_job(test_app, JobStatus.COMPLETED.value)
+    with test_app.stream("GET", f"/jobs/{job_id}/events") as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        body = "".join(resp.iter_text())
+    data = json.loads(body.split("data: ", 1)[1])
+    assert data["status"] == "completed"
+    assert data["progress_pct"] == 100
+
+
+def test_long_poll_endpoint_and_missing_job(test_app):
+    job_id = _seed_job(test_app, JobStatus.COMPLETED.value)
+    resp = test_app.get(f"/jobs/{job_id}/events", params={"wait": 0})
+    assert resp.status_code == 200
+    assert resp.json()["current_step"] == "completed"
+
+    assert test_app.get("/jobs/999/events", params={"wait": 0}).status_code == 404
@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.models.planning import Sprint, SprintPlan
+from app.models.project import Project
+from app.services import job_engine, job_worker
+
+
+async def _setup():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def _project_with_sprint(session, name: str) -> tuple[Project, Sprint]:
+    project = Project(name=name, description="D")
+    session.add(project)
+    await session.flush()
+    plan = SprintPlan(project_id=project.id, name="Plan")
+    session.add(plan)
+    await session.flush()
+    sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+    session.add(sprint)
+    await session.commit()
+    return project, sprint
+
+
+@pytest.mark.asyncio
+async def test_claims_round_robin_across_projects():
+    engine, SessionLocal = await _setup()
+    async with SessionLocal() as session:
+        big, big_sprint = await _project_with_sprint(session, "big")
+        small, small_sprint = await _project_with_sprint(session, "small")
+        # distinct payloads: identical submissions would be deduplicated
+        for i in range(10):
+            await job_engine.create_job_for_task_pipeline(session, big, big_sprint, {"n": i})
+        for i in range(2):
+            await job_engine.create_job_for_task_pipeline(session, small, small_sprint, {"n": i})
+
+        order = []
+        for i in range(5):
+            job = await job_worker.claim_next_job(session, f"w{i}", project_max_concurrency=0)
+            order.append(job.project_id)
+        assert order == [big.id, small.id, big.id, small.id, big.id]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_claimed_first():
+    engine, SessionLocal = await _setup()
+    async with SessionLocal() as session:
+        project, sprint = await _project_with_sprint(session, "p")
+        other, other_sprint = await _project_with_sprint(session, "o")
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        urgent = await job_engine.create_job_for_task_pipeline(session, other, other_sprint, priority=10)
+
+        job = await job_worker.claim_next_job(session, "w", project_max_concurrency=0)
+        assert job.id == urgent.id
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_project_concurrency_cap_skips_saturated_project():
+    engine, SessionLocal = await _setup()
+    async with SessionLocal() as session:
+        project, sprint = await _project_with_sprint(session, "p")
+        for i in range(3):
+            await job_engine.create_job_for_task_pipeline(session, project, sprint, {"n": i})
+
+        first = await job_worker.claim_next_job(session, "w1", project_max_concurrency=1)
+        assert first is not None
+        assert await job_worker.claim_next_job(session, "w2", project_max_concurrency=1) is None
+
+        other, other_sprint = await _project_with_sprint(session, "o")
+        queued = await job_engine.create_job_for_task_pipeline(session, other, other_sprint)
+        second = await job_worker.claim_next_job(session, "w2", project_max_concurrency=1)
+        assert second.id == queued.id
+    await engine.dispose()
+
+
+
+@pytest.mark.asyncio
+async def test_waiting_plan_children_do_not_hold_project_slots():
+    engine, SessionLocal = await _setup()
+    async with SessionLocal() as session:
+        project, sprint = await _project_with_sprint(session, "p")
+        sprints = [sprint]
+        for index in (2, 3, 4):
+            sprints.append(Sprint(sprint_plan_id=sprint.sprint_plan_id, index=index, name=f"S{index}"))
+        session.add_all(sprints[1:])
+        await session.commit()
+        plan = await session.get(SprintPlan, sprint.sprint_plan_id)
+        plan_job = await job_engine.create_job_for_plan_pipeline(session, project, plan)
+        assert (await job_worker.claim_next_job(session, "w1", project_max_concurrency=2)).id == plan_job.id
+        await job_engine._ensure_child_jobs(session, plan_job, sprints)  # type: ignore[attr-defined]
+
+        assert await job_worker._in_flight_by_project(session) == {project.id: 1}  # type: ignore[attr-defined]
+        queued = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        second = await job_worker.claim_next_job(session, "w2", project_max_concurrency=2)
+        assert second.id == queued.id
+    await engine.dispose()
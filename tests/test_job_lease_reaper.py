@@ -0,0 +1,185 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus, JobType
+from app.models.job import Job
+from app.services import job_engine, job_worker
+from tests.conftest import seed_project
+
+
+@pytest.mark.asyncio
+async def test_reaper_requeues_then_fails_expired_jobs(session_factory):
+    now = datetime.now(timezone.utc)
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        for attempts, lease in ((1, -60), (3, -60), (1, 60)):
+            session.add(
+                Job(
+                    project_id=project.id,
+                    sprint_id=sprint.id,
+                    type=JobType.TASK_PIPELINE_FOR_SPRINT.value,
+                    status=JobStatus.RUNNING.value,
+                    payload_json="{}",
+                    locked_by="dead-worker",
+                    attempts=attempts,
+                    lease_expires_at=now + timedelta(seconds=lease),
+                    progress_pct=50,
+                    current_step="pass2",
+                )
+            )
+        await session.commit()
+
+        counts = await job_engine.reap_expired_jobs(session, max_attempts=3, now=now)
+        assert counts == {"requeued": 1, "failed": 1}
+
+        jobs = (await session.execute(select(Job).order_by(Job.id).execution_options(populate_existing=True))).scalars().all()
+        requeued, failed, alive = jobs
+        assert requeued.status == JobStatus.QUEUED.value
+        assert requeued.locked_by is None and requeued.progress_pct == 0
+        assert failed.status == JobStatus.FAILED.value
+        assert "Lease expired" in failed.error_message
+        assert alive.status == JobStatus.RUNNING.value and alive.locked_by == "dead-worker"
+
+
+@pytest.mark.asyncio
+async def test_claim_starts_lease_and_counts_attempts(session_factory):
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job = await job_worker.claim_next_job(session, "w1", lease_seconds=30)
+        assert job.attempts == 1
+        assert job.lease_expires_at is not None
+
+        assert await job_engine.renew_lease(session, job.id, "w1", lease_seconds=30)
+        assert not await job_engine.renew_lease(session, job.id, "someone-else", lease_seconds=30)
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_interrupts_running_job(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_heartbeat_seconds", 0.02)
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+
+    async def stuck_run(db, sp, job):
+        # another node's reaper decides this worker is dead
+        async with session_factory() as other:
+            far_future = datetime.now(timezone.utc) + timedelta(hours=1)
+            await job_engine.reap_expired_jobs(other, max_attempts=3, now=far_future)
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", stuck_run)
+
+    async with session_factory() as session:
+        job = await asyncio.wait_for(
+            job_worker.process_next_job(session, worker_id="w1", session_factory=session_factory),
+            timeout=5,
+        )
+        assert job is not None
+
+    async with session_factory() as session:
+        stored = (await session.execute(select(Job))).scalars().one()
+    assert stored.status == JobStatus.QUEUED.value
+    assert stored.attempts == 1
+    assert stored.finished_at is None
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_lease_alive(session_factory, monkeypatch):
+    # the run outlives the lease several heartbeats over; the margins leave room for scheduler jitter
+    monkeypatch.setattr(get_settings(), "job_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(get_settings(), "job_lease_seconds", 0.6)
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+
+    async def slow_run(db, sp, job):
+        await asyncio.sleep(0.9)
+        async with session_factory() as other:
+            counts = await job_engine.reap_expired_jobs(other, max_attempts=3)
+        assert counts == {"requeued": 0, "failed": 0}
+        return {"ok": 1}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", slow_run)
+
+    async with session_factory() as session:
+        job = await job_worker.process_next_job(session, worker_id="w1", session_factory=session_factory)
+    assert job.status == JobStatus.COMPLETED.value
+
+
+class _NullSession:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_survives_database_errors_until_the_lease_runs_out(monkeypatch):
+    calls = []
+
+    async def locked(db, job_id, worker_id, *, lease_seconds):
+        calls.append(job_id)
+        if len(calls) <= 2:
+            raise OperationalError("UPDATE jobs", {}, Exception("database is locked"))
+        return True
+
+    monkeypatch.setattr(job_worker, "renew_lease", locked)
+    run = asyncio.create_task(asyncio.sleep(30))
+    heartbeat = asyncio.create_task(
+        job_worker._heartbeat(  # type: ignore[attr-defined]
+            _NullSession, 1, "w1", run, interval=0.01, lease_seconds=5
+        )
+    )
+    while len(calls) < 4:
+        await asyncio.sleep(0.01)
+    assert not run.done() and not heartbeat.done()
+    heartbeat.cancel()
+    run.cancel()
+
+    # renewals keep failing: the job is given up once its last lease has expired
+    async def always_locked(db, job_id, worker_id, *, lease_seconds):
+        raise OperationalError("UPDATE jobs", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(job_worker, "renew_lease", always_locked)
+    run = asyncio.create_task(asyncio.sleep(30))
+    await asyncio.wait_for(
+        job_worker._heartbeat(_NullSession, 1, "w1", run, interval=0.01, lease_seconds=0.05),  # type: ignore[attr-defined]
+        timeout=5,
+    )
+    await asyncio.gather(run, return_exceptions=True)
+    assert run.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_reaped_worker_does_not_overwrite_the_new_run(session_factory, monkeypatch):
+    # no heartbeat during the run, so the stale worker finishes without noticing
+    monkeypatch.setattr(get_settings(), "job_heartbeat_seconds", 30)
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+
+    async def reaped_and_reclaimed(db, sp, job):
+        async with session_factory() as other:
+            far_future = datetime.now(timezone.utc) + timedelta(hours=1)
+            await job_engine.reap_expired_jobs(other, max_attempts=3, now=far_future)
+            assert (await job_worker.claim_next_job(other, "w2")).id == job.id
+        return {"ok": 1}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", reaped_and_reclaimed)
+    async with session_factory() as session:
+        job = await job_worker.process_next_job(session, worker_id="w1", session_factory=session_factory)
+    assert job.locked_by == "w2"
+
+    async with session_factory() as session:
+        stored = (await session.execute(select(Job))).scalars().one()
+    assert stored.status == JobStatus.QUEUED.value
+    assert stored.locked_by == "w2"
+    assert stored.result_json is None and stored.finished_at is None
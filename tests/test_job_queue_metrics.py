@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.enums import JobStatus, JobType
+from app.db.base import Base
+from app.models.job import Job
+from app.models.planning import Sprint, SprintPlan
+from app.models.project import Project
+from app.observability.timing import add_llm_time, track_pass
+from app.services import job_engine, job_worker
+from app.services.job_stats import job_queue_snapshot
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+SPRINT = JobType.TASK_PIPELINE_FOR_SPRINT.value
+PLAN = JobType.TASK_PIPELINE_FOR_PLAN.value
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def _setup():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.flush()
+        plan = SprintPlan(project_id=project.id, name="Plan")
+        session.add(plan)
+        await session.flush()
+        sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+        session.add(sprint)
+        await session.commit()
+    return engine, SessionLocal, project, sprint
+
+
+@pytest.mark.asyncio
+async def test_queue_snapshot_depth_age_and_wait():
+    engine, SessionLocal, project, sprint = await _setup()
+
+    def job(job_type, status, **kwargs):
+        return Job(project_id=project.id, type=job_type, status=status.value, payload_json="{}", **kwargs)
+
+    async with SessionLocal() as session:
+        session.add_all(
+            [
+                job(SPRINT, JobStatus.QUEUED, created_at=NOW - timedelta(minutes=10)),
+                job(SPRINT, JobStatus.QUEUED, created_at=NOW - timedelta(minutes=2)),
+                # ertelenmiş retry: run_after geçtiği andan itibaren bekliyor sayılır
+                job(PLAN, JobStatus.QUEUED, created_at=NOW - timedelta(hours=2), run_after=NOW - timedelta(seconds=30)),
+                job(PLAN, JobStatus.QUEUED, created_at=NOW - timedelta(hours=3), run_after=NOW + timedelta(hours=1)),
+                job(SPRINT, JobStatus.RUNNING, created_at=NOW - timedelta(seconds=50), started_at=NOW - timedelta(seconds=40)),
+                job(SPRINT, JobStatus.COMPLETED, created_at=NOW - timedelta(seconds=90), started_at=NOW - timedelta(seconds=60)),
+                job(SPRINT, JobStatus.COMPLETED, created_at=NOW - timedelta(hours=5), started_at=NOW - timedelta(hours=4)),
+                # retried job: waited 20s after its run_after, not 2h since creation
+                job(
+                    SPRINT,
+                    JobStatus.COMPLETED,
+                    created_at=NOW - timedelta(hours=2),
+                    run_after=NOW - timedelta(seconds=50),
+                    started_at=NOW - timedelta(seconds=30),
+                ),
+                # plan child waiting inside its parent: not part of the queue
+                job(SPRINT, JobStatus.QUEUED, created_at=NOW - timedelta(hours=6), parent_job_id=3, locked_by="job:3"),
+            ]
+        )
+        await session.commit()
+
+        snapshot = await job_queue_snapshot(session, now=NOW)
+    assert snapshot["depth"] == {SPRINT: {"queued": 2, "running": 1}, PLAN: {"queued": 2}}
+    assert snapshot["oldest_queued_age_seconds"] == {SPRINT: 600.0, PLAN: 30.0}
+    # son bir saatte başlayan üç job: 10s, 20s ve 30s bekledi
+    assert snapshot["queue_wait_p50_seconds"] == 20.0
+    assert snapshot["queue_wait_p95_seconds"] == 30.0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pass_timings_split_llm_and_db_time():
+    engine, SessionLocal, project, sprint = await _setup()
+    labels = {"pass": "pass_test", "part": "db"}
+    db_before = _sample("masper_job_pass_duration_seconds_sum", labels)
+
+    async with SessionLocal() as session:
+        with track_pass("pass_test") as timings:
+            await session.execute(select(Job.id))
+            add_llm_time(0.25)
+        # pass dışındaki sorgular sayılmaz
+        await session.execute(select(Job.id))
+
+    assert timings.llm_seconds == 0.25
+    assert timings.db_seconds > 0
+    assert _sample("masper_job_pass_duration_seconds_count", {"pass": "pass_test", "part": "total"}) >= 1
+    assert _sample("masper_job_pass_duration_seconds_sum", labels) - db_before == pytest.approx(timings.db_seconds)
+    add_llm_time(1.0)  # aktif pass yokken no-op
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sprint_pipeline_records_queue_wait_and_pass_durations(monkeypatch):
+    engine, SessionLocal, project, sprint = await _setup()
+
+    async def fake_pass(db, sprint, job_id=None):
+        return []
+
+    monkeypatch.setattr(job_engine, "generate_draft_tasks_for_sprint", fake_pass)
+    monkeypatch.setattr(job_engine, "refine_tasks_pass2_for_sprint", fake_pass)
+
+    async def fake_pass3(db, sprint_id, job_id=None):
+        return []
+
+    monkeypatch.setattr(job_engine, "refine_tasks_pass3_for_sprint", fake_pass3)
+    wait_before = _sample("masper_job_queue_wait_seconds_count", {"type": SPRINT})
+    pass_before = {
+        name: _sample("masper_job_pass_duration_seconds_count", {"pass": name, "part": "total"})
+        for name in ("pass1", "pass2", "pass3")
+    }
+
+    async with SessionLocal() as session:
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job = await job_worker.process_next_job(session)
+    assert job.status == JobStatus.COMPLETED.value
+    assert _sample("masper_job_queue_wait_seconds_count", {"type": SPRINT}) == wait_before + 1
+    for name, before in pass_before.items():
+        assert _sample("masper_job_pass_duration_seconds_count", {"pass": name, "part": "total"}) == before + 1
+    await engine.dispose()
+
+
+def test_metrics_and_overview_expose_queue(test_app):
+    project = test_app.post("/projects", json={"name": "P", "description": "D"}).json()
+    assert test_app.post(f"/projects/{project['id']}/planning/generate-sprint-plan").status_code == 200
+    sprint = test_app.get(f"/projects/{project['id']}/sprints").json()[0]
+    test_app.post("/jobs/task-pipeline-for-sprint", json={"project_id": project["id"], "sprint_id": sprint["id"]})
+
+    body = test_app.get("/metrics").text
+    assert f'masper_job_queue_depth{{status="queued",type="{SPRINT}"}} 1.0' in body
+    assert "masper_job_oldest_queued_age_seconds" in body
+
+    queue = test_app.get("/status/overview").json()["job_queue"]
+    assert queue["depth"] == {SPRINT: {"queued": 1}}
+    assert SPRINT in queue["oldest_queued_age_seconds"]
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus, JobType
+from app.db.base import Base
+from app.models.planning import Sprint, SprintPlan
+from app.models.project import Project
+from app.services import job_engine, job_worker
+from app.services.llm_adapter import LLMError
+from app.services.llm_policy import LLMJobBudgetExceeded, LLMQuotaExceeded, next_quota_reset
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def test_retry_policy_backoff_and_limits():
+    policy = job_engine.JobRetryPolicy(
+        retry_on=(LLMError, LLMQuotaExceeded),
+        max_attempts=5,
+        backoff_seconds=10,
+        max_backoff_seconds=30,
+    )
+    assert policy.next_run_after(LLMError("x"), 0, NOW) == NOW + timedelta(seconds=10)
+    assert policy.next_run_after(LLMError("x"), 2, NOW) == NOW + timedelta(seconds=20)
+    assert policy.next_run_after(LLMError("x"), 4, NOW) == NOW + timedelta(seconds=30)
+    assert policy.next_run_after(LLMError("x"), 5, NOW) is None
+    assert policy.next_run_after(ValueError("bad input"), 1, NOW) is None
+    assert policy.next_run_after(LLMQuotaExceeded("q"), 1, NOW) == max(next_quota_reset(), NOW)
+
+    sprint_policy = job_engine.job_retry_policy(JobType.TASK_PIPELINE_FOR_SPRINT)
+    assert sprint_policy.max_attempts == get_settings().job_max_attempts
+    assert sprint_policy.next_run_after(LLMJobBudgetExceeded("b"), 1, NOW) is None
+
+
+async def _setup():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.flush()
+        plan = SprintPlan(project_id=project.id, name="Plan")
+        session.add(plan)
+        await session.flush()
+        sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+        session.add(sprint)
+        await session.commit()
+    return engine, SessionLocal, project, sprint
+
+
+@pytest.mark.asyncio
+async def test_worker_only_claims_jobs_whose_run_after_passed():
+    engine, SessionLocal, project, sprint = await _setup()
+    async with SessionLocal() as session:
+        later = await job_engine.create_job_for_task_pipeline(
+            session, project, sprint, {"n": 1}, run_after=datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+        now = await job_engine.create_job_for_task_pipeline(
+            session, project, sprint, {"n": 2}, run_after=datetime.utcnow() - timedelta(seconds=1)
+        )
+        claimed = await job_worker.claim_next_job(session, "w1", project_max_concurrency=0)
+        assert claimed.id == now.id
+        assert await job_worker.claim_next_job(session, "w2", project_max_concurrency=0) is None
+
+        later.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await session.commit()
+        claimed = await job_worker.claim_next_job(session, "w2", project_max_concurrency=0)
+        assert claimed.id == later.id
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_requeued_with_backoff_then_succeeds(monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_retry_backoff_seconds", 0)
+    engine, SessionLocal, project, sprint = await _setup()
+    runs = []
+
+    async def flaky_run(db, sp, job):
+        runs.append(job.attempts)
+        if len(runs) == 1:
+            raise LLMError("provider timeout")
+        return {"ok": 1}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", flaky_run)
+
+    async with SessionLocal() as session:
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job = await job_worker.process_next_job(session)
+        assert job.status == JobStatus.QUEUED.value
+        assert job.run_after is not None
+        assert job.locked_by is None and job.finished_at is None
+        assert "provider timeout" in job.error_message
+
+        job = await job_worker.process_next_job(session)
+        assert job.status == JobStatus.COMPLETED.value
+        # kept: the queue wait of the retry is measured from it
+        assert job.run_after is not None and job.run_after <= job.started_at
+        assert runs == [1, 2]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_budget_overrun_is_not_retried(monkeypatch):
+    engine, SessionLocal, project, sprint = await _setup()
+
+    async def greedy_run(db, sp, job):
+        raise LLMJobBudgetExceeded("budget")
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", greedy_run)
+    async with SessionLocal() as session:
+        await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job = await job_worker.process_next_job(session)
+        assert job.status == JobStatus.FAILED.value
+        assert job.finished_at is not None
+    await engine.dispose()
+
+
+def test_create_endpoint_accepts_run_after(test_app):
+    project = test_app.post("/projects", json={"name": "P", "description": "D"}).json()
+    assert test_app.post(f"/projects/{project['id']}/planning/generate-sprint-plan").status_code == 200
+    sprint = test_app.get(f"/projects/{project['id']}/sprints").json()[0]
+    job = test_app.post(
+        "/jobs/task-pipeline-for-sprint",
+        json={"project_id": project["id"], "sprint_id": sprint["id"], "run_after": "2030-01-01T03:00:00Z"},
+    ).json()
+    assert job["run_after"].startswith("2030-01-01T03:00:00")
+    assert "run_after" not in job["payload_json"]
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+import app.models  # noqa: F401
+from app import worker
+from app.core.enums import JobStatus
+from app.models.job import Job
+from app.services import job_engine
+from tests.conftest import seed_project
+
+
+async def _seed_jobs(SessionLocal, count: int) -> None:
+    async with SessionLocal() as session:
+        project, _, (sprint,) = await seed_project(session)
+        for i in range(count):
+            await job_engine.create_job_for_task_pipeline(session, project, sprint, {"n": i})
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_drains_queue(session_factory, monkeypatch):
+    await _seed_jobs(session_factory, 12)
+    stop = asyncio.Event()
+    done: list[int] = []
+
+    async def fake_run(db, sprint, job):
+        await asyncio.sleep(0.01)
+        done.append(job.id)
+        if len(done) == 12:
+            stop.set()
+        return {"ok": 1}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", fake_run)
+
+    processed = await asyncio.wait_for(
+        worker.run_worker_pool(
+            session_factory,
+            stop,
+            concurrency=4,
+            poll_min=0.01,
+            poll_max=0.05,
+            shutdown_grace=5,
+            worker_id="test",
+        ),
+        timeout=10,
+    )
+    assert processed == 12
+    assert sorted(done) == list(range(1, 13))
+    async with session_factory() as session:
+        owners = (await session.execute(select(Job.locked_by))).scalars().all()
+    assert set(owners) <= {f"test/{i}" for i in range(4)}
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_requeues_in_flight_job_on_shutdown(session_factory, monkeypatch):
+    await _seed_jobs(session_factory, 1)
+    stop = asyncio.Event()
+
+    async def hanging_run(db, sprint, job):
+        stop.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", hanging_run)
+
+    processed = await asyncio.wait_for(
+        worker.run_worker_pool(
+            session_factory,
+            stop,
+            concurrency=2,
+            poll_min=0.01,
+            poll_max=0.05,
+            shutdown_grace=0.05,
+        ),
+        timeout=10,
+    )
+    assert processed == 0
+    async with session_factory() as session:
+        job = (await session.execute(select(Job))).scalars().one()
+    assert job.status == JobStatus.QUEUED.value
+    assert job.locked_by is None
+    assert job.started_at is None
+
+
+@pytest.mark.asyncio
+async def test_idle_slot_backs_off_and_stops(session_factory):
+    stop = asyncio.Event()
+    slot = asyncio.create_task(
+        worker.run_worker_slot(session_factory, "idle", stop, poll_min=0.01, poll_max=0.02)
+    )
+    await asyncio.sleep(0.1)
+    stop.set()
+    assert await asyncio.wait_for(slot, timeout=5) == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_survives_an_error_escaping_a_job(session_factory, monkeypatch):
+    await _seed_jobs(session_factory, 2)
+    stop = asyncio.Event()
+    real_process = worker.process_next_job
+    calls = {"n": 0}
+    done: list[int] = []
+
+    async def flaky_process(db, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("database is locked")
+        return await real_process(db, **kwargs)
+
+    async def fake_run(db, sprint, job):
+        done.append(job.id)
+        if len(done) == 2:
+            stop.set()
+        return {"ok": 1}
+
+    monkeypatch.setattr(worker, "process_next_job", flaky_process)
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", fake_run)
+    processed = await asyncio.wait_for(
+        worker.run_worker_slot(session_factory, "flaky", stop, poll_min=0.01, poll_max=0.02), timeout=10
+    )
+    assert processed == 2
+    assert len(done) == 2
+
+
+@pytest.mark.asyncio
+async def test_reaper_survives_an_error(session_factory, monkeypatch):
+    stop = asyncio.Event()
+    calls = {"n": 0}
+
+    async def flaky_reap(db, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("database is locked")
+        stop.set()
+        return 0
+
+    monkeypatch.setattr(worker, "reap_expired_jobs", flaky_reap)
+    await asyncio.wait_for(worker.run_reaper(session_factory, stop, interval=0.01, max_attempts=3), timeout=5)
+    assert calls["n"] == 2
+
+
+def test_next_poll_delay_is_bounded():
+    assert worker.next_poll_delay(0.5, minimum=0.5, maximum=10) == 1.0
+    assert worker.next_poll_delay(8, minimum=0.5, maximum=10) == 10
+    assert worker.next_poll_delay(0, minimum=0.5, maximum=10) == 0.5
+
+
+def test_parse_args_uses_settings_defaults():
+    args = worker._parse_args(["--concurrency", "3"])  # type: ignore[attr-defined]
+    assert args.concurrency == 3
+    assert args.poll_min > 0
+    assert args.shutdown_grace > 0
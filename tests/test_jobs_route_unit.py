@@ -1,12 +1,20 @@
+import json
+
 import pytest
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus
 from app.db.base import Base
 from app.api.routes import jobs as jobs_routes
+from app.models.job import Job
 from app.schemas.jobs import JobCreateTaskPipeline
 from app.models.project import Project
 from app.models.planning import Sprint, SprintPlan
+from app.services.job_engine import create_job_for_task_pipeline
+from tests.conftest import seed_project
 
 
 @pytest.mark.asyncio
@@ -32,3 +40,33 @@ async def test_create_task_pipeline_job_route_unit():
         assert job.status == "queued"
 
     await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_polls_with_short_lived_sessions(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_events_db_poll_seconds", 0.01)
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        job = await create_job_for_task_pipeline(session, project, sprint)
+        job_id = job.id
+
+    request_queries = []
+    async with session_factory() as request_db:
+        real_execute = request_db.execute
+
+        async def execute(*args, **kwargs):
+            request_queries.append(args)
+            return await real_execute(*args, **kwargs)
+
+        request_db.execute = execute
+        resp = await jobs_routes.job_events_endpoint(job_id, wait=None, after_seq=0, db=request_db)
+    # get_db'nin cleanup'ı bitti; stream yalnızca kendi kısa ömürlü session'larıyla poll eder
+    body = resp.body_iterator
+    first = await body.__anext__()
+    assert json.loads(first.split("data: ", 1)[1])["status"] == JobStatus.QUEUED.value
+    async with session_factory() as session:
+        await session.execute(update(Job).where(Job.id == job_id).values(status=JobStatus.COMPLETED.value))
+        await session.commit()
+    chunks = [chunk async for chunk in body]
+    assert json.loads(chunks[-1].split("data: ", 1)[1])["status"] == JobStatus.COMPLETED.value
+    assert request_queries == []
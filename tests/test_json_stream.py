@@ -0,0 +1,32 @@
+from app.services.json_stream import JsonArrayItemParser
+
+
+def _feed_all(text: str, step: int = 1) -> list:
+    parser = JsonArrayItemParser()
+    items = []
+    for i in range(0, len(text), step):
+        items.extend(parser.feed(text[i : i + step]))
+    return items
+
+
+def test_items_are_yielded_as_soon_as_they_close():
+    parser = JsonArrayItemParser()
+    assert parser.feed('{"tasks": [{"title": "A"}, {"ti') == [("tasks", 0, {"title": "A"})]
+    assert parser.feed('tle": "B"}') == [("tasks", 1, {"title": "B"})]
+    assert parser.feed("]}") == []
+    assert parser.text == '{"tasks": [{"title": "A"}, {"title": "B"}]}'
+
+
+def test_strings_nesting_fences_and_scalars():
+    text = (
+        '```json\n{"summary": "not [an] {array}", "tasks": ['
+        '{"title": "quote \\" and brace }", "deps": [1, 2]}, {"n": {"a": [3]}}],'
+        ' "count": 2, "features": [1, "x", {"k": 1}]}\n```'
+    )
+    expected = [
+        ("tasks", 0, {"title": 'quote " and brace }', "deps": [1, 2]}),
+        ("tasks", 1, {"n": {"a": [3]}}),
+        ("features", 0, {"k": 1}),
+    ]
+    assert _feed_all(text) == expected
+    assert _feed_all(text, step=7) == expected
@@ -10,7 +10,9 @@ class DemoResponse(BaseModel):
 
 @pytest.mark.asyncio
 async def test_llm_adapter_happy_path(monkeypatch):
-    async def fake_raw(prompt: str, provider: str, model: str, temperature: float | None, max_tokens: int | None):
+    async def fake_raw(
+        prompt: str, provider: str, model: str, temperature: float | None, max_tokens: int | None, response_model=None
+    ):
         return '{"foo":"bar"}'
 
     monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
@@ -20,7 +22,9 @@ async def test_llm_adapter_happy_path(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_llm_adapter_invalid_json(monkeypatch):
-    async def fake_raw(prompt: str, provider: str, model: str, temperature: float | None, max_tokens: int | None):
+    async def fake_raw(
+        prompt: str, provider: str, model: str, temperature: float | None, max_tokens: int | None, response_model=None
+    ):
         return '{"foo": }'
 
     monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
@@ -13,7 +13,7 @@ class DemoResponse(BaseModel):
 async def test_llm_adapter_retries_then_succeeds(monkeypatch):
     calls = {"count": 0}
 
-    async def fake_raw(prompt, provider, model, temperature, max_tokens):
+    async def fake_raw(prompt, provider, model, temperature, max_tokens, response_model=None):
         calls["count"] += 1
         if calls["count"] < 3:
             raise llm_adapter.LLMError("transient")
@@ -27,7 +27,7 @@ async def test_llm_adapter_retries_then_succeeds(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_llm_adapter_gives_up_after_retries(monkeypatch):
-    async def fake_raw(prompt, provider, model, temperature, max_tokens):
+    async def fake_raw(prompt, provider, model, temperature, max_tokens, response_model=None):
         raise llm_adapter.LLMError("always fail")
 
     monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
@@ -1,11 +1,16 @@
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import LLMIntent
 from app.db.base import Base
 from app.models.imports import LLMCallLog
 from app.models.project import Project
 from app.services import llm_adapter
+from app.services.llm_logs import llm_call_rollup
+from app.services.llm_policy import estimate_tokens
 
 
 @pytest.mark.asyncio
@@ -15,7 +20,7 @@ async def test_llm_call_logs_success(monkeypatch):
         await conn.run_sync(Base.metadata.create_all)
     SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
-    async def fake_raw(prompt: str, provider: str, model: str, temperature, max_tokens):
+    async def fake_raw(prompt: str, provider: str, model: str, temperature, max_tokens, response_model=None):
         return '{"foo":"bar"}'
 
     monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
@@ -38,3 +43,65 @@ async def test_llm_call_logs_success(monkeypatch):
         assert logs[0].status == "success"
 
     await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_llm_call_log_records_tokens_latency_attempt_and_cache(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_initial_backoff_seconds", 0)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    calls = []
+
+    async def fake_raw(prompt, **kwargs):
+        calls.append(prompt)
+        if prompt == "flaky" and len(calls) == 1:
+            raise llm_adapter.LLMError("timeout")
+        if prompt == "metered":
+            return llm_adapter.LLMRawResponse('{"foo":"bar"}', prompt_tokens=120, completion_tokens=30)
+        return '{"foo":"bar"}'
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
+
+    class RespModel(llm_adapter.BaseModel):
+        foo: str
+
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.commit()
+        kwargs = {"db": session, "project_id": project.id, "step_type": "task_pass1"}
+
+        await llm_adapter.call_llm("flaky", RespModel, **kwargs)
+        await llm_adapter.call_llm("metered", RespModel, intent=LLMIntent.OBJECTIVE_STEP, **kwargs)
+        await llm_adapter.call_llm("metered", RespModel, intent=LLMIntent.OBJECTIVE_STEP, **kwargs)
+        await session.commit()
+
+        logs = (await session.execute(select(LLMCallLog).order_by(LLMCallLog.id))).scalars().all()
+        flaky, metered, cached = logs
+        assert (flaky.attempt, flaky.cache_status) == (2, "miss")
+        # provider usage yoksa tahmin; iki denemeden sadece biri yanıt döndü
+        assert flaky.prompt_tokens == estimate_tokens("flaky")
+        assert flaky.tokens == flaky.prompt_tokens + flaky.completion_tokens
+        assert flaky.latency_ms is not None
+        assert (metered.prompt_tokens, metered.completion_tokens, metered.tokens) == (120, 30, 150)
+        assert metered.intent == LLMIntent.OBJECTIVE_STEP.value
+        assert (cached.cache_status, cached.tokens, cached.status) == ("hit", 0, "success")
+
+        rollup = await llm_call_rollup(session, project_id=project.id)
+        by_intent = {row["intent"]: row for row in rollup}
+        assert by_intent[LLMIntent.OBJECTIVE_STEP.value]["calls"] == 2
+        assert by_intent[LLMIntent.OBJECTIVE_STEP.value]["cache_hits"] == 1
+        assert by_intent[LLMIntent.OBJECTIVE_STEP.value]["tokens"] == 150
+        assert by_intent[None]["calls"] == 1
+        assert await llm_call_rollup(session, project_id=project.id + 1) == []
+
+    await engine.dispose()
+
+
+def test_llm_usage_endpoint(test_app):
+    resp = test_app.get("/status/llm/usage", params={"since_hours": 1})
+    assert resp.status_code == 200
+    assert resp.json() == []
+    assert test_app.get("/status/llm/usage", params={"since_hours": 0}).status_code == 422
@@ -0,0 +1,232 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobType
+from app.db.base import Base
+from app.main import create_app
+from app.models.llm_usage import LLMUsage
+from app.models.project import Project
+from app.services import llm_adapter
+from app.services.job_engine import job_retry_policy
+from app.services.llm_policy import CircuitBreaker, LLMCircuitOpen, get_circuit_breaker
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, **overrides):
+    options = dict(
+        window_seconds=60, min_calls=4, error_rate=0.5, slow_call_seconds=10, open_seconds=30, half_open_calls=1
+    )
+    options.update(overrides)
+    return CircuitBreaker("p", clock=clock, **options)
+
+
+def test_breaker_opens_on_error_rate_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for ok in (True, False, True):
+        breaker.before_call()
+        breaker.record(ok=ok, seconds=0.1)
+    assert breaker.state == "closed"  # min_calls'a ulaşılmadı
+    breaker.record(ok=True, seconds=11)  # yavaş çağrı hata sayılır -> 2/4
+    assert breaker.state == "open"
+    with pytest.raises(LLMCircuitOpen) as info:
+        breaker.before_call()
+    assert info.value.retry_after == pytest.approx(30)
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(LLMCircuitOpen):
+        breaker.before_call()  # tek deneme hakkı kullanımda
+    breaker.release()  # iptal edilen deneme hakkını geri verir
+    breaker.before_call()
+    breaker.record(ok=False, seconds=0.1)
+    assert breaker.state == "open"
+
+    clock.now += 30
+    breaker.before_call()
+    breaker.record(ok=True, seconds=0.1)
+    assert breaker.snapshot() == {
+        "provider": "p",
+        "state": "closed",
+        "failure_rate": 0.0,
+        "calls_in_window": 0,
+        "retry_after_seconds": None,
+    }
+
+
+def test_old_failures_leave_the_rolling_window():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record(ok=False, seconds=0.1)
+    clock.now += 61
+    breaker.record(ok=False, seconds=0.1)
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["calls_in_window"] == 1
+
+
+class Item(BaseModel):
+    title: str
+
+
+class ItemsResponse(BaseModel):
+    tasks: list[Item]
+
+
+@pytest.fixture
+def small_breaker(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_provider", "primary")
+    monkeypatch.setattr(settings, "llm_circuit_min_calls", 2)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_initial_backoff_seconds", 0)
+    monkeypatch.setattr(settings, "llm_max_retries", 1)
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_quota_or_retries(monkeypatch, small_breaker):
+    calls = []
+
+    async def down(prompt, *, provider, **kwargs):
+        calls.append(provider)
+        raise llm_adapter.LLMError("503")
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", down)
+    with pytest.raises(llm_adapter.LLMError):
+        await llm_adapter.call_llm("p", DemoResponse)
+    assert calls == ["primary", "primary"]
+    assert get_circuit_breaker("primary").state == "open"
+    assert REGISTRY.get_sample_value("masper_llm_circuit_state", {"provider": "primary"}) == 2
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.commit()
+        with pytest.raises(LLMCircuitOpen):
+            await llm_adapter.call_llm("q", DemoResponse, db=session, project_id=project.id, step_type="s")
+        assert await session.scalar(select(func.count()).select_from(LLMUsage)) == 0
+    assert calls == ["primary", "primary"]
+    await engine.dispose()
+
+    # fallback varsa açık provider atlanır
+    monkeypatch.setattr(get_settings(), "llm_fallback_providers", ["backup"])
+
+    async def backup_only(prompt, *, provider, **kwargs):
+        calls.append(provider)
+        return '{"foo": "%s"}' % provider
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", backup_only)
+    assert (await llm_adapter.call_llm("r", DemoResponse)).foo == "backup"
+    assert calls[-1:] == ["backup"] and calls.count("primary") == 2
+
+
+@pytest.mark.asyncio
+async def test_streaming_calls_feed_the_breaker(monkeypatch, small_breaker):
+    monkeypatch.setattr(get_settings(), "llm_max_retries", 0)
+
+    async def broken_stream(prompt, **kwargs):
+        raise llm_adapter.LLMError("reset")
+        yield ""  # pragma: no cover
+
+    async def on_item(key, item):
+        pass
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", broken_stream)
+    for prompt in ("a", "b"):
+        with pytest.raises(llm_adapter.LLMError):
+            await llm_adapter.call_llm(prompt, DemoResponse, on_item=on_item)
+    with pytest.raises(LLMCircuitOpen):
+        await llm_adapter.call_llm("c", DemoResponse, on_item=on_item)
+
+
+@pytest.mark.asyncio
+async def test_streaming_latency_is_measured_to_the_first_chunk(monkeypatch, small_breaker):
+    monkeypatch.setattr(get_settings(), "llm_max_retries", 0)
+    monkeypatch.setattr(get_settings(), "llm_circuit_slow_call_seconds", 0.05)
+
+    def stream(first_chunk_delay):
+        async def fake_stream(prompt, **kwargs):
+            await asyncio.sleep(first_chunk_delay)
+            yield '{"foo": '
+            await asyncio.sleep(0.1)  # uzun ama sağlıklı üretim
+            yield '"ok"}'
+
+        return fake_stream
+
+    async def on_item(key, item):
+        pass
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", stream(0))
+    for prompt in ("a", "b"):
+        assert (await llm_adapter.call_llm(prompt, DemoResponse, on_item=on_item)).foo == "ok"
+    assert get_circuit_breaker("primary").failure_rate() == 0
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", stream(0.1))
+    await llm_adapter.call_llm("c", DemoResponse, on_item=on_item)
+    assert get_circuit_breaker("primary").failure_rate() == pytest.approx(1 / 3)
+
+
+@pytest.mark.asyncio
+async def test_item_callback_errors_do_not_count_against_the_provider(monkeypatch, small_breaker):
+    monkeypatch.setattr(get_settings(), "llm_fallback_providers", ["backup"])
+    providers = []
+
+    async def fake_stream(prompt, *, provider, **kwargs):
+        providers.append(provider)
+        yield '{"tasks": [{"title": "A"}]}'
+
+    async def on_item(key, item):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", fake_stream)
+    for prompt in ("a", "b"):
+        with pytest.raises(llm_adapter.LLMError, match="database is locked"):
+            await llm_adapter.call_llm(prompt, ItemsResponse, on_item=on_item)
+    # tüketici hatası failover'a yol açmaz, retry aynı provider'la yapılır; devre kapalı kalır
+    assert providers == ["primary"] * 4
+    assert get_circuit_breaker("primary").state == "closed"
+    assert get_circuit_breaker("primary").failure_rate() == 0
+
+
+def test_open_circuit_maps_to_delayed_job_retry_and_503():
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    policy = job_retry_policy(JobType.TASK_PIPELINE_FOR_SPRINT)
+    assert (policy.next_run_after(LLMCircuitOpen("openai", 12.0), 1, now) - now).total_seconds() == 12.0
+
+    api = create_app()
+
+    @api.get("/boom")
+    async def boom():
+        raise LLMCircuitOpen("openai", 7.4)
+
+    with TestClient(api) as client:
+        resp = client.get("/boom")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "7"
+        info = client.get("/status/llm").json()
+    assert {c["provider"]: c["state"] for c in info["circuits"]} == {get_settings().llm_provider: "closed"}
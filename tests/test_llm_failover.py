@@ -0,0 +1,230 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.db.base import Base
+from app.models.project import Project
+from app.services import llm_adapter, llm_policy
+from app.services.llm_policy import provider_latency_p95, record_provider_latency
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+def _provider_calls(provider: str, outcome: str) -> float:
+    return REGISTRY.get_sample_value(
+        "masper_llm_provider_calls_total", {"provider": provider, "outcome": outcome}
+    ) or 0.0
+
+
+def _hedges(outcome: str) -> float:
+    return REGISTRY.get_sample_value("masper_llm_hedged_calls_total", {"outcome": outcome}) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def chain(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_provider", "primary")
+    monkeypatch.setattr(settings, "llm_fallback_providers", ["backup:backup-model"])
+    monkeypatch.setattr(settings, "llm_max_retries", 0)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 5)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.02)
+    llm_policy.reset_provider_latencies()
+    yield
+    llm_policy.reset_provider_latencies()
+
+
+def _fake_providers(monkeypatch, behaviour):
+    calls = []
+
+    async def fake_raw(prompt, *, provider, model, **kwargs):
+        calls.append((provider, model))
+        return await behaviour[provider]()
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_failing_or_slow_primary_fails_over_to_the_next_provider(monkeypatch):
+    async def down():
+        raise llm_adapter.LLMError("503")
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def ok():
+        return '{"foo": "backup"}'
+
+    calls = _fake_providers(monkeypatch, {"primary": down, "backup": ok})
+    errors = _provider_calls("primary", "error")
+    assert (await llm_adapter.call_llm("p1", DemoResponse)).foo == "backup"
+    assert calls == [("primary", get_settings().llm_model), ("backup", "backup-model")]
+    assert _provider_calls("primary", "error") == errors + 1
+
+    monkeypatch.setattr(get_settings(), "llm_provider_timeouts", {"primary": 0.05})
+    calls = _fake_providers(monkeypatch, {"primary": slow, "backup": ok})
+    timeouts = _provider_calls("primary", "timeout")
+    assert (await llm_adapter.call_llm("p2", DemoResponse)).foo == "backup"
+    assert _provider_calls("primary", "timeout") == timeouts + 1
+
+    # zincirin sonu da düşerse hata yükselir
+    _fake_providers(monkeypatch, {"primary": down, "backup": down})
+    with pytest.raises(llm_adapter.LLMError, match="503"):
+        await llm_adapter.call_llm("p3", DemoResponse)
+
+
+@pytest.mark.asyncio
+async def test_slow_tail_is_hedged_to_secondary_and_charged_to_budgets(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_hedge_enabled", True)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fast():
+        return '{"foo": "hedge"}'
+
+    # gözlenen p95 yokken hedge yapılmaz
+    async def quick():
+        return '{"foo": "primary"}'
+
+    _fake_providers(monkeypatch, {"primary": quick, "backup": fast})
+    for i in range(5):
+        assert (await llm_adapter.call_llm(f"warm{i}", DemoResponse)).foo == "primary"
+    assert provider_latency_p95("primary", min_samples=5) is not None
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    logged = []
+    real_log = llm_adapter.log_llm_call
+
+    async def capture_log(db, **kwargs):
+        logged.append(kwargs)
+        return await real_log(db, **kwargs)
+
+    monkeypatch.setattr(llm_adapter, "log_llm_call", capture_log)
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.commit()
+
+        calls = _fake_providers(monkeypatch, {"primary": slow, "backup": fast})
+        fired, won = _hedges("fired"), _hedges("won")
+        result = await llm_adapter.call_llm(
+            "hedge me", DemoResponse, db=session, project_id=project.id, step_type="s", job_id=901
+        )
+        assert result.foo == "hedge"
+        assert [c[0] for c in calls] == ["primary", "backup"]
+        assert cancelled == [True]
+        assert (_hedges("fired"), _hedges("won")) == (fired + 1, won + 1)
+        # hedge ayrı bir çağrı: job budget'ı ve iptal edilen kopyanın prompt token'ları sayılır
+        assert llm_policy._job_call_counts[901] == 2
+        assert logged[-1]["prompt_tokens"] == 2 * llm_policy.estimate_tokens("hedge me")
+
+        # budget dolu -> hedge yapılmaz, primary beklenir
+        monkeypatch.setattr(get_settings(), "llm_job_max_calls", 1)
+
+        async def slowish():
+            await asyncio.sleep(0.1)
+            return '{"foo": "primary"}'
+
+        calls = _fake_providers(monkeypatch, {"primary": slowish, "backup": fast})
+        llm_policy.reset_job_budget(902)
+        result = await llm_adapter.call_llm("no budget", DemoResponse, job_id=902)
+        assert result.foo == "primary"
+        assert [c[0] for c in calls] == ["primary"]
+        assert llm_policy._job_call_counts[902] == 1
+
+        # quota dolu -> hedge yapılmaz, job budget'ı geri verilir
+        monkeypatch.setattr(get_settings(), "llm_job_max_calls", 50)
+        monkeypatch.setattr(get_settings(), "llm_project_daily_max_calls", 3)
+        calls = _fake_providers(monkeypatch, {"primary": slowish, "backup": fast})
+        result = await llm_adapter.call_llm("no quota", DemoResponse, db=session, project_id=project.id, job_id=903)
+        assert result.foo == "primary"
+        assert llm_policy._job_call_counts[903] == 1
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_hedge_failure_falls_back_to_the_other_copy(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_hedge_enabled", True)
+    for _ in range(5):
+        record_provider_latency("primary", 0.001)
+
+    async def slow_ok():
+        await asyncio.sleep(0.1)
+        return '{"foo": "primary"}'
+
+    async def broken():
+        raise llm_adapter.LLMError("backup down")
+
+    _fake_providers(monkeypatch, {"primary": slow_ok, "backup": broken})
+    assert (await llm_adapter.call_llm("h1", DemoResponse)).foo == "primary"
+
+    async def down():
+        raise llm_adapter.LLMError("primary down")
+
+    # primary hedge gecikmesinden önce düşerse sıradaki provider normal failover ile denenir
+    calls = _fake_providers(monkeypatch, {"primary": down, "backup": slow_ok})
+    assert (await llm_adapter.call_llm("h2", DemoResponse)).foo == "primary"
+    assert [c[0] for c in calls] == ["primary", "backup"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_failover_resets_items_from_the_failed_provider(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_provider_timeouts", {"backup": 5})
+
+    async def fake_stream(prompt, *, provider, **kwargs):
+        if provider == "primary":
+            yield '{"tasks": [{"title": "P1"}, {"ti'
+            raise llm_adapter.LLMError("connection reset")
+        yield '{"tasks": [{"title": "B1"}, {"title": "B2"}]}'
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", fake_stream)
+    seen = []
+
+    async def on_item(key, item):
+        seen.append(item["title"])
+
+    async def on_reset():
+        seen.append("reset")
+
+    errors = _provider_calls("primary", "error")
+    result = await llm_adapter.call_llm("stream", ItemsResponse, on_item=on_item, on_reset=on_reset)
+    assert [t["title"] for t in result.model_dump()["tasks"]] == ["B1", "B2"]
+    # backup'ın elemanları baştan verilir, primary'nin yarım elemanları geri alınır
+    assert seen == ["P1", "reset", "B1", "B2"]
+    assert _provider_calls("primary", "error") == errors + 1
+
+    async def hanging_stream(prompt, *, provider, **kwargs):
+        await asyncio.sleep(5)
+        yield ""
+
+    monkeypatch.setattr(get_settings(), "llm_fallback_providers", [])
+    monkeypatch.setattr(get_settings(), "llm_provider_timeouts", {"primary": 0.05})
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", hanging_stream)
+    with pytest.raises(llm_adapter.LLMError, match="yanıt vermedi"):
+        await llm_adapter.call_llm("hang", ItemsResponse, on_item=on_item)
+
+
+class Item(BaseModel):
+    title: str
+
+
+class ItemsResponse(BaseModel):
+    tasks: list[Item]
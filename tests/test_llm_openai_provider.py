@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.main import create_app
+from app.services import llm_adapter
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+class FakeAsyncOpenAI:
+    instances: list["FakeAsyncOpenAI"] = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+        FakeAsyncOpenAI.instances.append(self)
+
+    async def _create(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        message = types.SimpleNamespace(content='{"foo": "%s"}' % kwargs["model"])
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    FakeAsyncOpenAI.instances = []
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(AsyncOpenAI=FakeAsyncOpenAI))
+    monkeypatch.setattr(llm_adapter, "_openai_client", None)
+    monkeypatch.setattr(llm_adapter.get_settings(), "llm_provider", "openai")
+    monkeypatch.setattr(llm_adapter.get_settings(), "llm_timeout_seconds", 12.0)
+    return FakeAsyncOpenAI
+
+
+@pytest.mark.asyncio
+async def test_openai_calls_share_one_async_client_and_run_concurrently(fake_openai):
+    results = await asyncio.gather(*(llm_adapter.call_llm(f"p{i}", DemoResponse) for i in range(3)))
+    assert [r.foo for r in results] == [llm_adapter.get_settings().llm_model] * 3
+
+    assert len(fake_openai.instances) == 1
+    client = fake_openai.instances[0]
+    # await'ler event loop'u bloklamıyor: üç çağrı aynı anda uçuşta
+    assert client.max_in_flight == 3
+    assert client.kwargs["max_retries"] == 0
+    assert client.kwargs["timeout"].read == 12.0
+    http_client = client.kwargs["http_client"]
+
+    await llm_adapter.close_llm_clients()
+    assert client.closed
+    assert llm_adapter._openai_client is None
+    await http_client.aclose()
+    await llm_adapter.close_llm_clients()  # idempotent
+
+
+def test_app_lifespan_closes_shared_client(fake_openai):
+    client = FakeAsyncOpenAI()
+    llm_adapter._openai_client = client
+    with TestClient(create_app()) as api:
+        assert api.get("/health").status_code == 200
+    assert client.closed
+    assert llm_adapter._openai_client is None
+
+
+@pytest.mark.asyncio
+async def test_missing_openai_package_is_an_llm_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "openai", None)
+    monkeypatch.setattr(llm_adapter, "_openai_client", None)
+    with pytest.raises(llm_adapter.LLMError, match="openai paketi"):
+        await llm_adapter._raw_llm_call("p", provider="openai", model="m", temperature=None, max_tokens=None)
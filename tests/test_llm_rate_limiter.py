@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+from app.services import llm_adapter, llm_policy
+from app.services.llm_policy import TokenBucketLimiter, estimate_tokens
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_limits_requests_and_tokens():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(requests_per_minute=2, tokens_per_minute=0, clock=clock)
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == pytest.approx(30.0)
+    clock.now += 30
+    assert limiter.try_acquire(10) == 0
+
+    tokens = TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=150, clock=clock)
+    assert tokens.try_acquire(100) == 0
+    # 50 token kaldı, 100 için 50 eksik -> 20 saniye
+    assert tokens.try_acquire(100) == pytest.approx(20.0)
+    # limitten büyük istek tam bucket'ı bekler, sonsuza kadar değil
+    clock.now += 60
+    assert tokens.try_acquire(10_000) == 0
+
+
+def test_file_store_is_shared_between_limiters(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "llm-bucket.json")
+    worker_a = TokenBucketLimiter(requests_per_minute=1, tokens_per_minute=0, path=path, clock=clock)
+    worker_b = TokenBucketLimiter(requests_per_minute=1, tokens_per_minute=0, path=path, clock=clock)
+    assert worker_a.try_acquire(1) == 0
+    assert worker_b.try_acquire(1) == pytest.approx(60.0)
+    clock.now += 60
+    assert worker_b.try_acquire(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_call_llm_waits_for_capacity_instead_of_failing(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_rate_limit_rpm", 1)
+    clock = FakeClock()
+    monkeypatch.setattr(
+        llm_policy, "_rate_limiter", TokenBucketLimiter(requests_per_minute=1, tokens_per_minute=0, clock=clock)
+    )
+    slept = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+        await real_sleep(0)
+
+    monkeypatch.setattr(llm_policy.asyncio, "sleep", fake_sleep)
+
+    async def fake_raw(prompt, **kwargs):
+        return '{"foo": "bar"}'
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
+    await llm_adapter.call_llm("first", DemoResponse)
+    assert slept == []
+    assert (await llm_adapter.call_llm("second", DemoResponse)).foo == "bar"
+    assert slept == [pytest.approx(60.0)]
+    # cache hit provider'a gitmez, bucket'tan da yemez
+    await llm_adapter.call_llm("second", DemoResponse)
+    assert len(slept) == 1
+
+
+def test_limiter_is_disabled_by_default():
+    assert llm_policy.get_rate_limiter() is None
+    assert estimate_tokens("x" * 400) == 101
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.db.base import Base
+from app.models.llm_cache import LLMResponseCache
+from app.services import llm_adapter, llm_cache
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+class OtherResponse(BaseModel):
+    foo: str
+    bar: int = 0
+
+
+def _lookups(outcome: str) -> float:
+    return REGISTRY.get_sample_value("masper_llm_cache_lookups_total", {"outcome": outcome}) or 0.0
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    calls = []
+
+    async def fake_raw(prompt, *, provider, model, temperature, max_tokens, response_model=None):
+        calls.append(prompt)
+        return '{"foo": "answer-%d"}' % len(calls)
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_identical_call_is_served_from_memory(provider):
+    hits_before = _lookups("memory_hit")
+    first = await llm_adapter.call_llm("same prompt", DemoResponse)
+    again = await llm_adapter.call_llm("same prompt", DemoResponse)
+    assert again == first
+    assert provider == ["same prompt"]
+    assert _lookups("memory_hit") == hits_before + 1
+
+    # prompt, temperature ve response şeması key'in parçası
+    await llm_adapter.call_llm("other prompt", DemoResponse)
+    await llm_adapter.call_llm("same prompt", DemoResponse, temperature=0.9)
+    await llm_adapter.call_llm("same prompt", OtherResponse)
+    assert len(provider) == 4
+
+    # bypass provider'a gider ve cache'i tazeler
+    fresh = await llm_adapter.call_llm("same prompt", DemoResponse, bypass_cache=True)
+    assert fresh.foo == "answer-5"
+    assert (await llm_adapter.call_llm("same prompt", DemoResponse)).foo == "answer-5"
+    assert len(provider) == 5
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled(provider, monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+    await llm_adapter.call_llm("p", DemoResponse)
+    await llm_adapter.call_llm("p", DemoResponse)
+    assert len(provider) == 2
+
+
+@pytest.mark.asyncio
+async def test_db_tier_survives_process_cache_and_honours_ttl(provider):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        first = await llm_adapter.call_llm("persist me", DemoResponse, db=session)
+        await session.commit()
+
+    # yeni process gibi: memory boş, yanıt DB'den gelir
+    llm_cache.clear_memory_cache()
+    db_hits_before = _lookups("db_hit")
+    async with SessionLocal() as session:
+        again = await llm_adapter.call_llm("persist me", DemoResponse, db=session)
+    assert again == first
+    assert provider == ["persist me"]
+    assert _lookups("db_hit") == db_hits_before + 1
+
+    # süresi dolmuş kayıt kullanılmaz
+    llm_cache.clear_memory_cache()
+    async with SessionLocal() as session:
+        await session.execute(
+            update(LLMResponseCache).values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await session.commit()
+        await llm_adapter.call_llm("persist me", DemoResponse, db=session)
+        await session.commit()
+    assert len(provider) == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_db_tier_evicts_oldest_entries_over_limit(provider, monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_cache_db_max_entries", 2)
+    monkeypatch.setattr(get_settings(), "llm_cache_memory_entries", 1)
+    monkeypatch.setattr(get_settings(), "llm_cache_evict_interval_seconds", 0)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        for prompt in ("p1", "p2", "p3"):
+            await llm_adapter.call_llm(prompt, DemoResponse, db=session)
+        await session.commit()
+        assert await session.scalar(select(func.count()).select_from(LLMResponseCache)) == 2
+        assert len(llm_cache._memory) == 1
+
+        # p1 silindi -> yeniden provider; p3 hâlâ DB'de
+        await llm_adapter.call_llm("p3", DemoResponse, db=session)
+        assert provider == ["p1", "p2", "p3"]
+        await llm_adapter.call_llm("p1", DemoResponse, db=session)
+        assert provider == ["p1", "p2", "p3", "p1"]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_db_eviction_is_periodic_and_stores_survive_caller_rollback(provider, monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_cache_db_max_entries", 1)
+    monkeypatch.setattr(get_settings(), "llm_cache_evict_interval_seconds", 3600)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        for prompt in ("p1", "p2", "p3"):
+            await llm_adapter.call_llm(prompt, DemoResponse, db=session)
+        # cache yazısı kendi commit'iyle kalıcı; çağıranın rollback'i silmez
+        await session.rollback()
+        # ilk yazıda eviction koştu, aralık dolmadan sonrakiler sınırı aşsa da silmez
+        assert await session.scalar(select(func.count()).select_from(LLMResponseCache)) == 3
+
+        # aralık dolunca tek eviction fazlalığı en eskiden başlayarak siler
+        monkeypatch.setattr(llm_cache, "_last_evict", 0.0)
+        await llm_adapter.call_llm("p4", DemoResponse, db=session)
+        keys = set((await session.execute(select(LLMResponseCache.key))).scalars())
+        assert len(keys) == 1
+    await engine.dispose()
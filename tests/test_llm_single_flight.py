@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+from app.services import llm_adapter
+from app.services.job_cancellation import JobCancelled, cancellation_scope, request_cancellation
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+def _coalesced() -> float:
+    return REGISTRY.get_sample_value("masper_llm_calls_total", {"intent": "unknown", "outcome": "coalesced"}) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    # cache kapalıyken bile eşzamanlı aynı istekler tek provider çağrısına iner
+    monkeypatch.setattr(get_settings(), "llm_cache_enabled", False)
+    monkeypatch.setattr(get_settings(), "llm_max_retries", 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_provider_call(monkeypatch):
+    calls = []
+
+    async def slow_raw(prompt, **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return '{"foo": "bar"}'
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", slow_raw)
+    before = _coalesced()
+    results = await asyncio.gather(*(llm_adapter.call_llm("same", DemoResponse) for _ in range(5)))
+    assert calls == ["same"]
+    assert {r.foo for r in results} == {"bar"}
+    assert _coalesced() == before + 4
+    assert llm_adapter._in_flight == {}
+
+    # uçuş bittikten sonra gelen çağrı yeniden provider'a gider
+    await llm_adapter.call_llm("same", DemoResponse)
+    assert calls == ["same", "same"]
+
+
+@pytest.mark.asyncio
+async def test_provider_failure_is_shared_with_followers(monkeypatch):
+    calls = []
+
+    async def failing_raw(prompt, **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        raise llm_adapter.LLMError("provider down")
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", failing_raw)
+    results = await asyncio.gather(
+        *(llm_adapter.call_llm("same", DemoResponse) for _ in range(3)), return_exceptions=True
+    )
+    assert len(calls) == 1
+    assert all(isinstance(r, llm_adapter.LLMError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_follower_retries_on_its_own_when_leader_is_cancelled(monkeypatch):
+    calls = []
+
+    async def raw(prompt, **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return '{"foo": "bar"}'
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", raw)
+
+    async def leader():
+        with cancellation_scope(31):
+            asyncio.get_running_loop().call_later(0.01, request_cancellation, 31)
+            return await llm_adapter.call_llm("same", DemoResponse)
+
+    async def follower():
+        await asyncio.sleep(0)
+        return await llm_adapter.call_llm("same", DemoResponse)
+
+    led, followed = await asyncio.gather(leader(), follower(), return_exceptions=True)
+    assert isinstance(led, JobCancelled)
+    assert followed.foo == "bar"
+    assert len(calls) == 2
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus, TaskGranularity, TaskStatus
+from app.models.imports import LLMCallLog
+from app.models.job import Job
+from app.models.planning import Epic, Sprint, Task
+from app.models.project import Project
+from app.services import job_engine, llm_adapter, task_split
+from tests.conftest import seed_project
+
+
+class Item(BaseModel):
+    title: str
+
+
+class ItemsResponse(BaseModel):
+    tasks: list[Item]
+
+
+def _chunks(text: str, size: int = 5) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.asyncio
+async def test_items_reach_callback_before_the_stream_ends(monkeypatch):
+    events = []
+    body = json.dumps({"tasks": [{"title": "A"}, {"title": "B"}, {"title": "C"}]})
+
+    async def fake_stream(prompt, **kwargs):
+        for chunk in _chunks(body):
+            events.append("chunk")
+            yield chunk
+        events.append("end")
+
+    async def on_item(key, item):
+        events.append((key, item["title"]))
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", fake_stream)
+    resp = await llm_adapter.call_llm("stream me", ItemsResponse, on_item=on_item)
+    assert [t.title for t in resp.tasks] == ["A", "B", "C"]
+    emitted = [e for e in events if e not in ("chunk", "end")]
+    assert emitted == [("tasks", "A"), ("tasks", "B"), ("tasks", "C")]
+    assert events.index(("tasks", "A")) < events.index("end")
+
+    # cache hit'te elemanlar sonuçtan verilir
+    events.clear()
+    await llm_adapter.call_llm("stream me", ItemsResponse, on_item=on_item)
+    assert events == [("tasks", "A"), ("tasks", "B"), ("tasks", "C")]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_partial_stream_resets_emitted_items(monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_initial_backoff_seconds", 0)
+    attempts = []
+
+    async def flaky_stream(prompt, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            yield '{"tasks": [{"title": "A1"}, {"title": "A2"}, {"tit'
+            return  # kesik yanıt -> parse hatası -> retry
+        yield json.dumps({"tasks": [{"title": "B1"}, {"title": "B2"}, {"title": "B3"}]})
+
+    seen = []
+
+    async def on_item(key, item):
+        seen.append(item["title"])
+
+    async def on_reset():
+        seen.clear()
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", flaky_stream)
+    resp = await llm_adapter.call_llm("cut off", ItemsResponse, on_item=on_item, on_reset=on_reset)
+    assert len(attempts) == 2
+    assert [t.title for t in resp.tasks] == ["B1", "B2", "B3"]
+    assert seen == ["B1", "B2", "B3"]
+
+    # tüm denemeler düşerse son denemenin elemanları da geri alınır
+    monkeypatch.setattr(get_settings(), "llm_max_retries", 0)
+
+    async def broken_stream(prompt, **kwargs):
+        yield '{"tasks": [{"title": "C1"}, {"tit'
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", broken_stream)
+    with pytest.raises(llm_adapter.LLMError):
+        await llm_adapter.call_llm("broken", ItemsResponse, on_item=on_item, on_reset=on_reset)
+    assert seen == []
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_and_plain_provider_fallback(monkeypatch):
+    class FakeStream:
+        def __init__(self, parts):
+            self.parts = parts
+
+        def __aiter__(self):
+            return self._gen()
+
+        async def _gen(self):
+            for part in self.parts:
+                delta = types.SimpleNamespace(content=part)
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+    class FakeClient:
+        def __init__(self, **kwargs):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        async def create(self, **kwargs):
+            assert kwargs["stream"] is True
+            return FakeStream(['{"tasks": [{"title"', ': "A"}]}', None])
+
+        async def close(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(AsyncOpenAI=FakeClient))
+    monkeypatch.setattr(llm_adapter, "_openai_client", None)
+    parts = [
+        p
+        async for p in llm_adapter._raw_llm_stream("p", provider="openai", model="m", temperature=None, max_tokens=None)
+    ]
+    assert "".join(parts) == '{"tasks": [{"title": "A"}]}'
+    await llm_adapter.close_llm_clients()
+
+    dummy = [
+        p
+        async for p in llm_adapter._raw_llm_stream("p", provider="dummy", model="m", temperature=None, max_tokens=None)
+    ]
+    assert len(dummy) == 1 and json.loads(dummy[0])
+
+
+async def _seed_medium_task(session_factory, *, previous_fine: list[str] = ()):
+    async with session_factory() as session:
+        project, _, (sprint,) = await seed_project(session)
+        epic = Epic(project_id=project.id, name="E1")
+        session.add(epic)
+        await session.flush()
+        parent = Task(
+            project_id=project.id,
+            sprint_id=sprint.id,
+            epic_id=epic.id,
+            title="Medium",
+            description="d",
+            status=TaskStatus.TODO,
+            granularity=TaskGranularity.MEDIUM,
+            refinement_round=2,
+        )
+        session.add(parent)
+        await session.flush()
+        for title in previous_fine:
+            session.add(
+                Task(
+                    project_id=project.id,
+                    sprint_id=sprint.id,
+                    epic_id=epic.id,
+                    parent_task_id=parent.id,
+                    title=title,
+                    status=TaskStatus.READY_FOR_DEV,
+                    granularity=TaskGranularity.FINE,
+                    refinement_round=3,
+                )
+            )
+        await session.commit()
+    return sprint, parent
+
+
+def _fine_items(parent_id: int, *titles: str) -> list[dict]:
+    return [
+        {"parent_task_id": parent_id, "title": title, "description": "d", "acceptance_criteria": ["a"]}
+        for title in titles
+    ]
+
+
+async def _live_fine_titles(session_factory) -> list[str]:
+    async with session_factory() as session:
+        rows = await session.scalars(
+            select(Task.title)
+            .where(Task.granularity == TaskGranularity.FINE, Task.is_deleted == False)  # noqa: E712
+            .order_by(Task.order_index)
+        )
+        return list(rows)
+
+
+@pytest.mark.asyncio
+async def test_pass3_persists_fine_tasks_while_streaming(session_factory, monkeypatch):
+    sprint, parent = await _seed_medium_task(session_factory)
+
+    async def visible_fine_tasks():
+        async with session_factory() as other:
+            return await other.scalar(
+                select(func.count(Task.id)).where(Task.granularity == TaskGranularity.FINE)
+            )
+
+    visible_mid_stream = []
+    children = _fine_items(parent.id, "Fine0", "Fine1", "Fine2")
+
+    async def fake_stream(prompt, **kwargs):
+        body = json.dumps({"tasks": children})
+        first_item_end = body.index("}") + 1
+        yield body[:first_item_end]
+        await asyncio.sleep(0)
+        visible_mid_stream.append(await visible_fine_tasks())
+        yield body[first_item_end:]
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", fake_stream)
+    async with session_factory() as session:
+        fine = await task_split.refine_tasks_pass3_for_sprint(session, sprint.id)
+    assert visible_mid_stream == [1]
+    assert sorted(t.title for t in fine) == ["Fine0", "Fine1", "Fine2"]
+    assert sorted(t.order_index for t in fine) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_pass3_retry_after_partial_stream_keeps_only_the_final_response(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_initial_backoff_seconds", 0)
+    sprint, parent = await _seed_medium_task(session_factory, previous_fine=["Old"])
+    attempts = []
+    visible_after_cut = []
+
+    async def flaky_stream(prompt, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            body = json.dumps({"tasks": _fine_items(parent.id, "A1", "A2")})
+            yield body[: body.rindex("{")]  # A1 kapanır, A2 yarıda kalır -> parse hatası -> retry
+            visible_after_cut.append(await _live_fine_titles(session_factory))
+            return
+        yield json.dumps({"tasks": _fine_items(parent.id, "B1", "B2", "B3")})
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", flaky_stream)
+    async with session_factory() as session:
+        fine = await task_split.refine_tasks_pass3_for_sprint(session, sprint.id)
+    assert len(attempts) == 2
+    # yarım deneme sırasında eski task'lar silinmemiş, stream edilen yanında görünür
+    assert visible_after_cut == [["Old", "A1"]]
+    assert [t.title for t in sorted(fine, key=lambda t: t.order_index)] == ["B1", "B2", "B3"]
+    assert await _live_fine_titles(session_factory) == ["B1", "B2", "B3"]
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count(Task.id)).where(Task.title.in_(["A1", "A2"]))) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_pass3_leaves_previous_fine_tasks_in_place(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_max_retries", 0)
+    monkeypatch.setattr(get_settings(), "task_refine_batch_tokens", 1)
+    sprint, parent = await _seed_medium_task(session_factory, previous_fine=["Old"])
+    async with session_factory() as session:
+        session.add(
+            Task(
+                project_id=parent.project_id,
+                sprint_id=sprint.id,
+                epic_id=parent.epic_id,
+                title="Medium2",
+                description="d",
+                status=TaskStatus.TODO,
+                granularity=TaskGranularity.MEDIUM,
+                refinement_round=2,
+            )
+        )
+        await session.commit()
+
+    async def one_batch_breaks(prompt, **kwargs):
+        if "Medium2" in prompt:
+            yield json.dumps({"tasks": _fine_items(parent.id, "Ok1")})
+            return
+        await asyncio.sleep(0.05)  # diğer batch önce stream edip commit etsin
+        body = json.dumps({"tasks": _fine_items(parent.id, "Bad1", "Bad2")})
+        yield body[: body.rindex("{")]
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", one_batch_breaks)
+    async with session_factory() as session:
+        with pytest.raises(llm_adapter.LLMError):
+            await task_split.refine_tasks_pass3_for_sprint(session, sprint.id)
+    assert await _live_fine_titles(session_factory) == ["Old"]
+    async with session_factory() as session:
+        statuses = await session.scalars(select(Task.status).where(Task.granularity == TaskGranularity.MEDIUM))
+        assert set(statuses) == {TaskStatus.TODO}
+
+
+@pytest.mark.asyncio
+async def test_failed_pass3_inside_a_job_finishes_the_job(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "llm_max_retries", 0)
+    sprint, parent = await _seed_medium_task(session_factory, previous_fine=["Old"])
+
+    async def broken_stream(prompt, **kwargs):
+        body = json.dumps({"tasks": _fine_items(parent.id, "Bad1", "Bad2")})
+        yield body[: body.rindex("{")]
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_stream", broken_stream)
+    async with session_factory() as session:
+        project = await session.get(Project, parent.project_id)
+        job = await job_engine.create_job_for_task_pipeline(session, project, await session.get(Sprint, sprint.id))
+        # pass1/pass2 checkpoint'ten atlanır, job doğrudan pass3'te düşer
+        job.checkpoint_json = json.dumps({"passes": {"pass1": {"draft_tasks": 1}, "pass2": {"refined_tasks": 1}}})
+        await session.commit()
+        job = await job_engine.start_job(session, job)
+        assert job.status in (JobStatus.FAILED.value, JobStatus.QUEUED.value)
+        assert "parse" in job.error_message
+    async with session_factory() as session:
+        stored = await session.get(Job, job.id)
+        assert stored.status == job.status
+        failed_calls = await session.scalar(
+            select(func.count(LLMCallLog.id)).where(LLMCallLog.step_type == "task_pass3", LLMCallLog.status == "fail")
+        )
+        assert failed_calls == 1
+    assert await _live_fine_titles(session_factory) == ["Old"]
@@ -0,0 +1,128 @@
+import json
+import random
+import statistics
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+from app.mock_llm_server import MockLLMConfig, create_mock_llm_app, sample_latency_seconds
+from app.schemas.llm.architecture import ArchitectureLLMResponse
+from app.schemas.llm.features import FeatureLLMResponse
+from app.schemas.llm.objective import ObjectiveLLMResponse
+from app.schemas.llm.project_suggestions import ProjectReviewLLMResponse, ProjectSuggestionLLMResponse
+from app.schemas.llm.quality import QualityLLMResponse
+from app.schemas.llm.tasks import TaskDraftResponse
+from app.schemas.llm.tasks_refine import TaskRefinementResponse
+from app.schemas.llm.tasks_split import TaskSplitResponse
+from app.schemas.llm.tech_stack import TechStackLLMResponse
+from app.services import llm_adapter
+
+RESPONSE_MODELS = [
+    ArchitectureLLMResponse,
+    FeatureLLMResponse,
+    ObjectiveLLMResponse,
+    ProjectReviewLLMResponse,
+    ProjectSuggestionLLMResponse,
+    QualityLLMResponse,
+    TaskDraftResponse,
+    TaskRefinementResponse,
+    TaskSplitResponse,
+    TechStackLLMResponse,
+]
+
+FAST = dict(latency_median_ms=0, seed=7)
+
+
+class DemoResponse(BaseModel):
+    foo: str
+
+
+def _request(model: type[BaseModel], **extra) -> dict:
+    return {
+        **llm_adapter._openai_request("prompt", model="m", temperature=None, max_tokens=None, response_model=model),
+        **extra,
+    }
+
+
+@pytest.mark.parametrize("response_model", RESPONSE_MODELS, ids=lambda m: m.__name__)
+def test_every_llm_schema_gets_a_valid_deterministic_payload(response_model):
+    with TestClient(create_mock_llm_app(MockLLMConfig(**FAST))) as api:
+        first = api.post("/v1/chat/completions", json=_request(response_model)).json()
+        again = api.post("/v1/chat/completions", json=_request(response_model)).json()
+    content = first["choices"][0]["message"]["content"]
+    response_model.model_validate_json(content)
+    assert again["choices"][0]["message"]["content"] == content
+    assert first["usage"]["completion_tokens"] > 0
+
+
+def test_fault_injection_and_stats():
+    config = MockLLMConfig(error_429_rate=0.5, error_500_rate=0.25, malformed_rate=1.0, **FAST)
+    with TestClient(create_mock_llm_app(config)) as api:
+        statuses = [api.post("/v1/chat/completions", json=_request(TaskDraftResponse)) for _ in range(40)]
+        stats = api.get("/stats").json()
+    codes = [r.status_code for r in statuses]
+    assert {429, 500, 200} == set(codes)
+    assert statuses[codes.index(429)].headers["Retry-After"] == "1"
+    assert stats["rate_limited"] == codes.count(429) and stats["server_error"] == codes.count(500)
+    ok = [r for r in statuses if r.status_code == 200]
+    assert stats["malformed"] == len(ok)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(ok[0].json()["choices"][0]["message"]["content"])
+
+
+def test_latency_follows_configured_median_and_p95():
+    config = MockLLMConfig(latency_median_ms=200, latency_p95_ms=1000)
+    rng = random.Random(1)
+    samples = sorted(sample_latency_seconds(config, rng) for _ in range(4000))
+    assert statistics.median(samples) == pytest.approx(0.2, rel=0.1)
+    assert samples[int(len(samples) * 0.95)] == pytest.approx(1.0, rel=0.15)
+    assert sample_latency_seconds(MockLLMConfig(latency_median_ms=0), rng) == 0.0
+
+
+@pytest.fixture
+def mock_provider(monkeypatch):
+    def install(config: MockLLMConfig):
+        transport = httpx.ASGITransport(app=create_mock_llm_app(config))
+        client = httpx.AsyncClient(transport=transport, base_url="http://mock/v1")
+        monkeypatch.setattr(llm_adapter, "_mock_client", client)
+        monkeypatch.setattr(get_settings(), "llm_provider", "mock")
+        monkeypatch.setattr(get_settings(), "llm_initial_backoff_seconds", 0)
+
+    return install
+
+
+@pytest.mark.asyncio
+async def test_call_llm_through_mock_provider_with_streaming(mock_provider):
+    mock_provider(MockLLMConfig(tokens_per_second=100_000, stream_chunk_chars=8, **FAST))
+    drafts = await llm_adapter.call_llm("draft", TaskDraftResponse)
+    assert len(drafts.tasks) == 3
+
+    items = []
+
+    async def on_item(key, item):
+        items.append(key)
+
+    split = await llm_adapter.call_llm("split", TaskSplitResponse, on_item=on_item)
+    assert items == ["tasks"] * len(split.tasks)
+    await llm_adapter.close_llm_clients()
+    assert llm_adapter._mock_client is None
+
+
+@pytest.mark.asyncio
+async def test_mock_provider_errors_are_retried_then_surface(mock_provider, monkeypatch):
+    mock_provider(MockLLMConfig(error_500_rate=1.0, **FAST))
+    with pytest.raises(llm_adapter.LLMError, match="Mock LLM HTTP 500"):
+        await llm_adapter.call_llm("p", DemoResponse)
+    with pytest.raises(llm_adapter.LLMError, match="Mock LLM HTTP 500"):
+        await llm_adapter.call_llm("p", DemoResponse, on_item=lambda key, item: None)
+
+
+@pytest.mark.asyncio
+async def test_mock_client_defaults_to_local_server(monkeypatch):
+    monkeypatch.setattr(llm_adapter, "_mock_client", None)
+    monkeypatch.setattr(get_settings(), "llm_base_url", None)
+    assert str(llm_adapter._get_mock_client().base_url) == llm_adapter.MOCK_LLM_BASE_URL + "/"
+    await llm_adapter.close_llm_clients()
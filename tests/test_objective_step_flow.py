@@ -12,7 +12,7 @@ from app.services import objective_step
 @pytest.mark.asyncio
 async def test_objective_flow(monkeypatch):
     # Fake LLM response
-    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"objectives": [{"title": "Obj1", "description": "Desc1", "priority": 1}]}
         )
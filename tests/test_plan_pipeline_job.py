@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import JobStatus, JobType
+from app.models.job import Job
+from app.services import job_engine
+from tests.conftest import seed_project
+
+
+@pytest.fixture(autouse=True)
+def fast_rollup(monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_plan_rollup_seconds", 0.01)
+    monkeypatch.setattr(get_settings(), "job_progress_flush_ms", 10)
+
+
+@pytest.mark.asyncio
+async def test_plan_job_runs_sprints_with_bounded_parallelism(session_factory, monkeypatch):
+    running = {"now": 0, "max": 0}
+
+    async def fake_run(db, sprint, job):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await job_engine._update_progress(db, job, 50, "pass2")  # type: ignore[attr-defined]
+        await asyncio.sleep(0.03)
+        running["now"] -= 1
+        return {"draft_tasks": 2, "refined_tasks": 2, "fine_tasks": 3, "ready_for_dev_tasks": 3}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", fake_run)
+
+    async with session_factory() as session:
+        project, plan, _ = await seed_project(session, sprints=5)
+        job = await job_engine.create_job_for_plan_pipeline(
+            session, project, plan, payload_dict={"max_parallel": 2}
+        )
+        job = await job_engine.start_job(session, job)
+
+        assert job.status == JobStatus.COMPLETED.value
+        assert job.progress_pct == 100
+        summary = json.loads(job.result_json)
+        assert summary["completed"] == 5
+        assert summary["fine_tasks"] == 15
+        assert [s["sprint_id"] for s in summary["sprints"]] == [1, 2, 3, 4, 5]
+
+        children = (
+            await session.execute(select(Job).where(Job.parent_job_id == job.id))
+        ).scalars().all()
+        assert len(children) == 5
+        assert {c.status for c in children} == {JobStatus.COMPLETED.value}
+        assert {c.type for c in children} == {JobType.TASK_PIPELINE_FOR_SPRINT.value}
+    assert running["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_plan_job_retries_when_a_sprint_fails_and_resumes_on_rerun(session_factory, monkeypatch):
+    calls: list[int] = []
+    failures = {"left": 1}
+
+    async def flaky_run(db, sprint, job):
+        calls.append(sprint.id)
+        if sprint.index == 2 and failures["left"]:
+            failures["left"] -= 1
+            raise RuntimeError("llm down")
+        return {"fine_tasks": 1}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", flaky_run)
+
+    async with session_factory() as session:
+        project, plan, _ = await seed_project(session, sprints=3)
+        job = await job_engine.create_job_for_plan_pipeline(session, project, plan)
+        job = await job_engine.start_job(session, job)
+
+        # the plan's retry policy puts it back on the queue with a backoff
+        assert job.status == JobStatus.QUEUED.value
+        assert job.run_after is not None and job.finished_at is None
+        assert "1/3" in job.error_message
+        assert json.loads(job.result_json)["failed"] == 1
+
+        # rerun the same parent: only the failed sprint is executed again
+        calls.clear()
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.COMPLETED.value
+        assert calls == [2]
+
+
+@pytest.mark.asyncio
+async def test_plan_job_cancellation_propagates_to_children(session_factory, monkeypatch):
+    async def slow_run(db, sprint, job):
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            await db.refresh(job)
+            if job.cancellation_requested:
+                raise job_engine.JobCancelled()
+        return {}
+
+    monkeypatch.setattr(job_engine, "_run_task_pipeline_for_sprint", slow_run)
+
+    async with session_factory() as session:
+        project, plan, _ = await seed_project(session, sprints=3)
+        job = await job_engine.create_job_for_plan_pipeline(session, project, plan)
+        job_id = job.id
+
+        async def cancel_soon():
+            await asyncio.sleep(0.05)
+            async with session_factory() as other:
+                parent = await other.get(Job, job_id)
+                parent.cancellation_requested = True
+                await other.commit()
+
+        canceller = asyncio.create_task(cancel_soon())
+        job = await asyncio.wait_for(job_engine.start_job(session, job), timeout=5)
+        await canceller
+        assert job.status == JobStatus.CANCELLED.value
+        children = (
+            await session.execute(select(Job.status).where(Job.parent_job_id == job_id))
+        ).scalars().all()
+        assert set(children) == {JobStatus.CANCELLED.value}
+
+
+@pytest.mark.asyncio
+async def test_plan_without_sprints_fails(session_factory):
+    async with session_factory() as session:
+        project, plan, _ = await seed_project(session, sprints=0)
+        job = await job_engine.create_job_for_plan_pipeline(session, project, plan)
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.FAILED.value
+
+
+def test_plan_pipeline_endpoint(test_app):
+    project = test_app.post("/projects", json={"name": "P", "description": "D"}).json()
+    assert test_app.post(
+        "/jobs/task-pipeline-for-plan", json={"project_id": project["id"], "sprint_plan_id": 99}
+    ).status_code == 404
+    assert test_app.post(
+        "/jobs/task-pipeline-for-plan", json={"project_id": 999, "sprint_plan_id": 1}
+    ).status_code == 404
@@ -11,7 +11,7 @@ from app.services.project_steps import get_or_create_step
 
 @pytest.mark.asyncio
 async def test_run_quality_steps(monkeypatch):
-    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {
                 "dod_items": [{"description": "DoD", "category": "functional", "priority": 1}],
@@ -12,7 +12,7 @@ from app.core.enums import StepType, StepStatus
 
 @pytest.mark.asyncio
 async def test_run_tech_stack_step(monkeypatch):
-    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"items": [{"category": "backend", "name": "FastAPI"}]}
         )
@@ -41,12 +41,12 @@ async def test_run_tech_stack_step(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_run_feature_and_architecture_steps(monkeypatch):
-    async def fake_llm_feature(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_llm_feature(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"features": [{"title": "F1", "description": "d", "importance": 3, "feature_type": "must"}]}
         )
 
-    async def fake_llm_arch(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_llm_arch(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"components": [{"name": "API", "layer": "backend", "responsibilities": ["r1"]}]}
         )
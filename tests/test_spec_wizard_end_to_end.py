@@ -40,25 +40,25 @@ def api_client():
 async def test_wizard_end_to_end(monkeypatch, api_client):
     client, SessionLocal = api_client
     # Patch all call_llm to deterministic outputs
-    async def fake_obj(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_obj(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"objectives": [{"title": "O1", "description": "d", "priority": 1}]}
         )
 
-    async def fake_ts(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_ts(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate({"items": [{"category": "backend", "name": "FastAPI"}]})
 
-    async def fake_feat(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_feat(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"features": [{"title": "F1", "description": "d", "importance": 3, "feature_type": "must"}]}
         )
 
-    async def fake_arch(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_arch(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {"components": [{"name": "API", "layer": "backend", "responsibilities": ["r"]}]}
         )
 
-    async def fake_quality(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None):
+    async def fake_quality(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, bypass_cache=False):
         return response_model.model_validate(
             {
                 "dod_items": [{"description": "DoD", "category": "functional", "priority": 1}],
@@ -75,13 +75,18 @@ async def test_wizard_end_to_end(monkeypatch, api_client):
     resp = client.post("/projects", json={"name": "Proj", "description": "D", "planning_detail_level": "low"})
     project_id = resp.json()["id"]
 
-    client.post(f"/projects/{project_id}/steps/objective/run")
-    client.post(f"/projects/{project_id}/steps/tech-stack/run")
+    def run_step(path: str) -> None:
+        # steps are queued as jobs; run-next executes the queued job in-process
+        assert client.post(f"/projects/{project_id}/steps/{path}/run").status_code == 202
+        assert client.post("/jobs/run-next").json()["status"] == "completed"
+
+    run_step("objective")
+    run_step("tech-stack")
     monkeypatch.setattr(spec_steps, "call_llm", fake_feat)
-    client.post(f"/projects/{project_id}/steps/features/run")
+    run_step("features")
     monkeypatch.setattr(spec_steps, "call_llm", fake_arch)
-    client.post(f"/projects/{project_id}/steps/architecture/run")
-    client.post(f"/projects/{project_id}/steps/quality/run")
+    run_step("architecture")
+    run_step("quality")
 
     async with SessionLocal() as session:
         steps = (
@@ -1,4 +1,5 @@
 import asyncio
+import json
 
 import pytest
 from fastapi.testclient import TestClient
@@ -8,8 +9,9 @@ import app.models  # noqa: F401
 from app.db.base import Base
 from app.db.session import get_db
 from app.main import create_app
-from app.models.project import Project
-from app.api.routes import spec_wizard as wizard_module
+from app.core.enums import ApprovalStatus, StepStatus, StepType
+from app.models.project import Project, ProjectStep
+from app.services import job_engine, llm_adapter
 
 
 @pytest.fixture
@@ -28,26 +30,26 @@ def run_client(monkeypatch):
             yield session
 
     # monkeypatch step runners to avoid LLM
-    async def fake_obj(db, pid):
+    async def fake_obj(db, pid, *, bypass_cache=False):
         return []
 
-    async def fake_ts(db, pid):
+    async def fake_ts(db, pid, *, bypass_cache=False):
         return []
 
-    async def fake_feat(db, pid):
+    async def fake_feat(db, pid, *, bypass_cache=False):
         return []
 
-    async def fake_arch(db, pid):
+    async def fake_arch(db, pid, *, bypass_cache=False):
         return []
 
-    async def fake_quality(db, pid):
+    async def fake_quality(db, pid, *, bypass_cache=False):
         return [], [], []
 
-    monkeypatch.setattr(wizard_module, "run_objective_step", fake_obj)
-    monkeypatch.setattr(wizard_module, "run_tech_stack_step", fake_ts)
-    monkeypatch.setattr(wizard_module, "run_feature_step", fake_feat)
-    monkeypatch.setattr(wizard_module, "run_architecture_step", fake_arch)
-    monkeypatch.setattr(wizard_module, "run_quality_steps", fake_quality)
+    monkeypatch.setattr(job_engine, "run_objective_step", fake_obj)
+    monkeypatch.setattr(job_engine, "run_tech_stack_step", fake_ts)
+    monkeypatch.setattr(job_engine, "run_feature_step", fake_feat)
+    monkeypatch.setattr(job_engine, "run_architecture_step", fake_arch)
+    monkeypatch.setattr(job_engine, "run_quality_steps", fake_quality)
 
     app = create_app()
     app.dependency_overrides[get_db] = override_get_db
@@ -69,8 +71,99 @@ async def test_run_endpoints(run_client):
 
     pid = await seed()
 
-    assert client.post(f"/projects/{pid}/steps/objective/run").status_code == 200
-    assert client.post(f"/projects/{pid}/steps/tech-stack/run").status_code == 200
-    assert client.post(f"/projects/{pid}/steps/features/run").status_code == 200
-    assert client.post(f"/projects/{pid}/steps/architecture/run").status_code == 200
-    assert client.post(f"/projects/{pid}/steps/quality/run").status_code == 200
+    jobs = []
+    for path in ("objective", "tech-stack", "features", "architecture", "quality"):
+        resp = client.post(f"/projects/{pid}/steps/{path}/run")
+        assert resp.status_code == 202
+        assert resp.json()["status"] == "queued"
+        jobs.append(resp.json())
+    assert [j["type"] for j in jobs] == [
+        "spec_objective",
+        "spec_tech_stack",
+        "spec_features",
+        "spec_architecture",
+        "spec_quality",
+    ]
+    # a second click while the step is still queued returns the same job
+    assert client.post(f"/projects/{pid}/steps/objective/run").json()["id"] == jobs[0]["id"]
+    assert client.post("/projects/999/steps/objective/run").status_code == 404
+
+    results = []
+    for _ in jobs:
+        job = client.post("/jobs/run-next").json()
+        assert job["status"] == "completed", job["error_message"]
+        results.append(json.loads(job["result_json"]))
+    assert results[0] == {"step_type": "objective", "count": 0}
+    assert results[-1] == {"step_type": "dod", "dod": 0, "nfr": 0, "risks": 0}
+
+
+@pytest.mark.asyncio
+async def test_regenerate_queues_step_job(run_client):
+    client, SessionLocal = run_client
+
+    async def seed():
+        async with SessionLocal() as session:
+            project = Project(name="P", description="D")
+            session.add(project)
+            await session.flush()
+            for step_type in (StepType.OBJECTIVE, StepType.EPICS):
+                session.add(
+                    ProjectStep(
+                        project_id=project.id,
+                        step_type=step_type,
+                        status=StepStatus.COMPLETED,
+                        approval_status=ApprovalStatus.REJECTED,
+                    )
+                )
+            await session.commit()
+            return project.id
+
+    pid = await seed()
+    resp = client.post(f"/projects/{pid}/steps/objective/regenerate", json={"feedback": "daha kısa"})
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+    assert client.get(f"/jobs/{job_id}").json()["type"] == "spec_objective"
+    assert client.post("/jobs/run-next").json()["status"] == "completed"
+
+    assert client.post(f"/projects/{pid}/steps/epics/regenerate").status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_step_job_fails_when_project_is_locked_after_enqueue(run_client):
+    client, SessionLocal = run_client
+
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.commit()
+        pid = project.id
+
+    assert client.post(f"/projects/{pid}/steps/objective/run").status_code == 202
+    async with SessionLocal() as session:
+        project = await session.get(Project, pid)
+        project.spec_locked = True
+        await session.commit()
+
+    job = client.post("/jobs/run-next").json()
+    assert job["status"] == "failed"
+    assert "locked" in job["error_message"]
+
+
+def test_regenerate_skips_the_llm_response_cache(test_app, llm_dummy, monkeypatch):
+    raw_call = llm_adapter._raw_llm_call
+    prompts = []
+
+    async def counting_raw(prompt, *args, **kwargs):
+        prompts.append(prompt)
+        return await raw_call(prompt, *args, **kwargs)
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", counting_raw)
+    pid = test_app.post("/projects", json={"name": "P", "description": "D"}).json()["id"]
+
+    assert test_app.post(f"/projects/{pid}/steps/objective/run").status_code == 202
+    assert test_app.post("/jobs/run-next").json()["status"] == "completed"
+    assert test_app.post(f"/projects/{pid}/steps/objective/regenerate").status_code == 202
+    job = test_app.post("/jobs/run-next").json()
+    assert job["status"] == "completed", job["error_message"]
+    # same prompt twice: the regenerate run went to the provider instead of the cache
+    assert len(prompts) == 2 and prompts[0] == prompts[1]
@@ -24,7 +24,7 @@ async def _create_test_db():
 async def test_step_starts_with_pending_approval_after_llm_run(monkeypatch):
     """After LLM run, step should have approval_status=PENDING"""
     # Mock LLM
-    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, intent=None):
+    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, intent=None, bypass_cache=False):
         return response_model.model_validate(
             {"objectives": [{"title": "Test Obj", "description": "Desc", "priority": 1}]}
         )
@@ -147,7 +147,7 @@ async def test_reject_step_creates_comment():
 async def test_regenerate_resets_to_pending(monkeypatch):
     """Regenerating a step should reset approval_status to PENDING"""
     # Mock LLM
-    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, intent=None):
+    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, intent=None, bypass_cache=False):
         return response_model.model_validate(
             {"objectives": [{"title": "Obj2", "description": "Regenerated", "priority": 1}]}
         )
@@ -211,7 +211,7 @@ async def test_cannot_approve_non_completed_step():
 async def test_approval_workflow_full_cycle(monkeypatch):
     """Test complete workflow: run → pending → approve"""
     # Mock LLM
-    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, intent=None):
+    async def fake_llm(prompt, response_model, temperature=None, max_tokens=None, db=None, project_id=None, step_type=None, intent=None, bypass_cache=False):
         return response_model.model_validate(
             {"objectives": [{"title": "Full Cycle", "description": "End to end", "priority": 1}]}
         )
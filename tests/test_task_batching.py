@@ -0,0 +1,260 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.core.config import get_settings
+from app.core.enums import TaskGranularity, TaskStatus
+from app.db.base import Base
+from app.models.planning import Epic, Sprint, SprintPlan, Task, TaskDependency
+from app.models.project import Project
+from app.services import task_refinement, task_split
+from app.services.task_batching import batch_tasks_by_tokens, gather_bounded
+
+
+def _task(task_id, epic_id=1, title="x" * 36):
+    return SimpleNamespace(id=task_id, epic_id=epic_id, order_index=task_id, title=title)
+
+
+def _prompt(batch):
+    return "header\n" + "\n".join(t.title for t in batch)
+
+
+def test_batches_respect_budget_and_keep_neighbourhoods_together():
+    # her task ~10 token, header ~2 token
+    tasks = [_task(i, epic_id=1 if i <= 3 else 2) for i in range(1, 7)]
+    assert batch_tasks_by_tokens(tasks, _prompt, budget_tokens=0) == [tasks]
+    assert batch_tasks_by_tokens([], _prompt, budget_tokens=100) == []
+
+    batches = batch_tasks_by_tokens(tasks, _prompt, budget_tokens=32)
+    assert [[t.id for t in b] for b in batches] == [[1, 2, 3], [4, 5, 6]]
+
+    # 1 -> 6 dependency'si komşuluğu birleştirir: 6, 1'in batch'ine gelir
+    batches = batch_tasks_by_tokens(tasks, _prompt, budget_tokens=32, links=[(1, 6), (99, 1)])
+    assert [[t.id for t in b] for b in batches] == [[1, 6, 2], [3, 4, 5]]
+
+    # budget'tan büyük komşuluk sırasıyla bölünür
+    chained = [(i, i + 1) for i in range(1, 6)]
+    batches = batch_tasks_by_tokens(tasks, _prompt, budget_tokens=22, links=chained)
+    assert [[t.id for t in b] for b in batches] == [[1, 2], [3, 4], [5, 6]]
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_limits_concurrency_and_cancels_on_failure():
+    running = []
+    peak = []
+
+    async def work(i):
+        running.append(i)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(i)
+        return i
+
+    assert await gather_bounded([lambda i=i: work(i) for i in range(5)], max_parallel=2) == list(range(5))
+    assert max(peak) == 2
+
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await gather_bounded([slow, boom], max_parallel=2)
+    assert cancelled == [True]
+
+
+async def _sprint_with_tasks(session, *, count, round_no, granularity):
+    project = Project(name="P", description="D")
+    session.add(project)
+    await session.flush()
+    plan = SprintPlan(project_id=project.id, name="Plan")
+    session.add(plan)
+    await session.flush()
+    sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+    epics = [Epic(project_id=project.id, name=f"E{i}") for i in range(2)]
+    session.add(sprint)
+    session.add_all(epics)
+    await session.flush()
+    tasks = [
+        Task(
+            project_id=project.id,
+            sprint_id=sprint.id,
+            epic_id=epics[i % 2].id,
+            title=f"Task {i}",
+            description="açıklama " * 10,
+            status=TaskStatus.TODO,
+            granularity=granularity,
+            refinement_round=round_no,
+            order_index=i + 1,
+        )
+        for i in range(count)
+    ]
+    session.add_all(tasks)
+    await session.commit()
+    return sprint, tasks
+
+
+def _ids_in_prompt(prompt, tasks):
+    found = [t for t in tasks if f"({t.id}) " in prompt]
+    return [t.id for t in sorted(found, key=lambda t: prompt.index(f"({t.id}) "))]
+
+
+@pytest.mark.asyncio
+async def test_pass2_splits_large_sprint_into_parallel_batches(monkeypatch):
+    monkeypatch.setattr(get_settings(), "task_refine_batch_tokens", 150)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        sprint, tasks = await _sprint_with_tasks(
+            session, count=8, round_no=1, granularity=TaskGranularity.COARSE
+        )
+        prompts = []
+        in_flight = []
+        peak = []
+
+        async def fake_llm(prompt, response_model, **kwargs):
+            prompts.append(prompt)
+            in_flight.append(prompt)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(prompt)
+            ids = _ids_in_prompt(prompt, tasks)
+            return response_model.model_validate(
+                {
+                    "tasks": [
+                        {
+                            "task_id": task_id,
+                            "title": f"Refined {task_id}",
+                            "description": "d",
+                            "acceptance_criteria": ["a"],
+                            # ilk task bir öncekine bağlı; 999 sprint dışı, yok sayılır
+                            "depends_on_task_ids": [ids[0], 999] if task_id != ids[0] else [],
+                        }
+                        for task_id in ids
+                    ]
+                }
+            )
+
+        monkeypatch.setattr(task_refinement, "call_llm", fake_llm)
+        refined = await task_refinement.refine_tasks_pass2_for_sprint(session, sprint)
+
+        assert len(prompts) > 1 and max(peak) > 1
+        assert all(len(p) // 4 + 1 <= 150 for p in prompts)
+        # her task tam bir batch'te; batch'ler epic sırasıyla dolar, aynı epic'in task'ları yan yana
+        seen = [i for p in prompts for i in _ids_in_prompt(p, tasks)]
+        assert seen == [t.id for t in sorted(tasks, key=lambda t: (t.epic_id, t.order_index))]
+
+        assert {t.title for t in refined} == {f"Refined {t.id}" for t in tasks}
+        deps = (await session.execute(select(TaskDependency.depends_on_task_id))).scalars().all()
+        assert deps and 999 not in deps
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pass2_batches_keep_dependencies_together(monkeypatch):
+    monkeypatch.setattr(get_settings(), "task_refine_batch_tokens", 150)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        sprint, tasks = await _sprint_with_tasks(
+            session, count=8, round_no=1, granularity=TaskGranularity.COARSE
+        )
+        # epic sırasıyla farklı batch'lere düşecek iki task birbirine bağlı
+        dependent, dependency = tasks[0], tasks[7]
+        session.add(TaskDependency(task_id=dependent.id, depends_on_task_id=dependency.id))
+        await session.commit()
+        prompts = []
+
+        async def fake_llm(prompt, response_model, **kwargs):
+            prompts.append(prompt)
+            ids = _ids_in_prompt(prompt, tasks)
+            return response_model.model_validate(
+                {
+                    "tasks": [
+                        {
+                            "task_id": task_id,
+                            "title": f"Refined {task_id}",
+                            "description": "d",
+                            "acceptance_criteria": ["a"],
+                            "depends_on_task_ids": [dependency.id] if task_id == dependent.id else [],
+                        }
+                        for task_id in ids
+                    ]
+                }
+            )
+
+        monkeypatch.setattr(task_refinement, "call_llm", fake_llm)
+        await task_refinement.refine_tasks_pass2_for_sprint(session, sprint)
+
+        assert len(prompts) > 1
+        together = [p for p in prompts if {dependent.id, dependency.id} <= set(_ids_in_prompt(p, tasks))]
+        assert len(together) == 1
+        deps = (await session.execute(select(TaskDependency.task_id, TaskDependency.depends_on_task_id))).all()
+        assert deps == [(dependent.id, dependency.id)]
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pass3_batches_keep_dependencies_together_and_order_children(monkeypatch):
+    monkeypatch.setattr(get_settings(), "task_refine_batch_tokens", 150)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        sprint, tasks = await _sprint_with_tasks(
+            session, count=6, round_no=2, granularity=TaskGranularity.MEDIUM
+        )
+        # farklı epic'lerdeki iki task birbirine bağlı
+        session.add(TaskDependency(task_id=tasks[1].id, depends_on_task_id=tasks[4].id))
+        await session.commit()
+        prompts = []
+
+        async def fake_llm(prompt, response_model, **kwargs):
+            prompts.append(prompt)
+            await asyncio.sleep(0.01 * (3 - len(prompts)) if len(prompts) < 3 else 0)
+            return response_model.model_validate(
+                {
+                    "tasks": [
+                        {"parent_task_id": pid, "title": f"Fine {pid}-{n}", "description": "d", "acceptance_criteria": ["a"]}
+                        for pid in _ids_in_prompt(prompt, tasks)
+                        for n in (1, 2)
+                    ]
+                }
+            )
+
+        monkeypatch.setattr(task_split, "call_llm", fake_llm)
+        fine = await task_split.refine_tasks_pass3_for_sprint(session, sprint.id)
+
+        assert len(prompts) > 1
+        assert any({tasks[1].id, tasks[4].id} <= set(_ids_in_prompt(p, tasks)) for p in prompts)
+        assert len(fine) == 12
+        ordered = sorted(fine, key=lambda t: t.order_index)
+        assert [t.order_index for t in ordered] == list(range(7, 19))
+        # order_index batch sırasını ve batch içindeki yanıt sırasını izler
+        first_batch = _ids_in_prompt(prompts[0], tasks)
+        assert [t.parent_task_id for t in ordered[: 2 * len(first_batch)]] == [
+            pid for pid in first_batch for _ in (1, 2)
+        ]
+
+    await engine.dispose()
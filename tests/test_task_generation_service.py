@@ -1,12 +1,18 @@
+import asyncio
+import json
+
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 import app.models  # noqa: F401
+from app.core.config import get_settings
 from app.core.enums import TaskGranularity, TaskStatus
 from app.db.base import Base
-from app.models.planning import Epic, Sprint, SprintEpic, SprintPlan
+from app.models.llm_usage import LLMUsage
+from app.models.planning import Epic, Sprint, SprintEpic, SprintPlan, Task
 from app.models.project import Project
-from app.services import task_generation
+from app.services import llm_adapter, task_generation
 
 
 @pytest.mark.asyncio
@@ -46,3 +52,78 @@ async def test_generate_draft_tasks_for_epic(monkeypatch):
         assert tasks[0].status == TaskStatus.TODO
 
     await engine.dispose()
+
+
+async def _seed_sprint_with_epics(session, count):
+    project = Project(name="P", description="D")
+    session.add(project)
+    await session.flush()
+    plan = SprintPlan(project_id=project.id, name="Plan")
+    session.add(plan)
+    await session.flush()
+    sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+    session.add(sprint)
+    await session.flush()
+    for i in range(count):
+        epic = Epic(project_id=project.id, name=f"E{i}")
+        session.add(epic)
+        await session.flush()
+        session.add(SprintEpic(sprint_id=sprint.id, epic_id=epic.id))
+    await session.commit()
+    return project, sprint
+
+
+@pytest.mark.asyncio
+async def test_sprint_pass1_fans_out_epics_with_bounded_concurrency(monkeypatch):
+    monkeypatch.setattr(get_settings(), "task_pass1_max_parallel", 2)
+    running = {"now": 0, "max": 0}
+
+    async def fake_llm(prompt, response_model, **kwargs):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        name = next(n for n in ("E0", "E1", "E2", "E3") if n in prompt)
+        # sonraki epic'ler önce bitiyor; order_index yine epic sırasını izlemeli
+        await asyncio.sleep(0.04 - 0.01 * int(name[1]))
+        running["now"] -= 1
+        return response_model.model_validate(
+            {"tasks": [{"title": f"{name}-a", "description": "d"}, {"title": f"{name}-b", "description": "d"}]}
+        )
+
+    monkeypatch.setattr(task_generation, "call_llm", fake_llm)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        project, sprint = await _seed_sprint_with_epics(session, 4)
+        tasks = await task_generation.generate_draft_tasks_for_sprint(session, sprint)
+        assert running["max"] == 2
+        assert [t.title for t in tasks] == [f"E{i}-{s}" for i in range(4) for s in "ab"]
+        stored = (await session.execute(select(Task).order_by(Task.order_index))).scalars().all()
+        assert [(t.title, t.order_index) for t in stored] == [(t.title, i) for i, t in enumerate(tasks, start=1)]
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sprint_pass1_shares_one_session_across_concurrent_llm_calls(monkeypatch):
+    async def fake_raw(prompt, **kwargs):
+        await asyncio.sleep(0.01)
+        return json.dumps({"tasks": [{"title": "T", "description": "d"}]})
+
+    monkeypatch.setattr(llm_adapter, "_raw_llm_call", fake_raw)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        project, sprint = await _seed_sprint_with_epics(session, 3)
+        tasks = await task_generation.generate_draft_tasks_for_sprint(session, sprint)
+        assert len(tasks) == 3
+        # quota her provider çağrısı için bir kez sayıldı
+        usage = (await session.execute(select(LLMUsage))).scalars().one()
+        assert usage.call_count == 3
+
+    await engine.dispose()
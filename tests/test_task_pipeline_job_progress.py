@@ -1,12 +1,16 @@
 import pytest
+from sqlalchemy import event, update
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 import app.models  # noqa: F401
+from app.core.config import get_settings
 from app.core.enums import JobStatus, TaskStatus
 from app.db.base import Base
+from app.models.job import Job
 from app.models.planning import Epic, Sprint, SprintEpic, SprintPlan
 from app.models.project import Project
 from app.services import job_engine, task_generation, task_refinement, task_split
+from app.services.job_events import job_events
 
 
 @pytest.mark.asyncio
@@ -61,3 +65,67 @@ async def test_task_pipeline_job_progress(monkeypatch):
         assert job.current_step == "completed"
 
     await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_progress_ticks_are_published_but_writes_are_coalesced(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(get_settings(), "job_progress_flush_ms", 60_000)
+
+    job_updates: list[str] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_job_updates(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE jobs"):
+            job_updates.append(statement)
+
+    class FineTask:
+        status = TaskStatus.READY_FOR_DEV
+
+    async def fake_pass(db, s, job_id=None):
+        return [FineTask()]
+
+    async def cancelling_pass2(db, s, job_id=None):
+        # the API flags the job behind the engine's back
+        await db.execute(
+            update(Job).where(Job.id == job_id).values(cancellation_requested=True)
+            .execution_options(synchronize_session=False)
+        )
+        return [object()]
+
+    monkeypatch.setattr(job_engine, "generate_draft_tasks_for_sprint", fake_pass)
+    monkeypatch.setattr(job_engine, "refine_tasks_pass2_for_sprint", fake_pass)
+    monkeypatch.setattr(job_engine, "refine_tasks_pass3_for_sprint", fake_pass)
+
+    async with SessionLocal() as session:
+        project = Project(name="P", description="D")
+        session.add(project)
+        await session.flush()
+        plan = SprintPlan(project_id=project.id, name="Plan")
+        session.add(plan)
+        await session.flush()
+        sprint = Sprint(sprint_plan_id=plan.id, index=1, name="S1")
+        session.add(sprint)
+        await session.commit()
+
+        job = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        with job_events.subscribe(job.id) as queue:
+            job_updates.clear()
+            job = await job_engine.start_job(session, job)
+            steps = [queue.get_nowait()["current_step"] for _ in range(queue.qsize())]
+
+        assert job.status == JobStatus.COMPLETED.value, job.error_message
+        assert steps == [None, "pass1", "pass2", "pass3", "completed", "completed"]
+        # running, checkpoint after pass1, checkpoint after pass2, final status
+        assert len(job_updates) == 4
+
+        # a cancel flag written by someone else is picked up with the next progress write
+        monkeypatch.setattr(job_engine, "refine_tasks_pass2_for_sprint", cancelling_pass2)
+        job = await job_engine.create_job_for_task_pipeline(session, project, sprint)
+        job = await job_engine.start_job(session, job)
+        assert job.status == JobStatus.CANCELLED.value
+
+    await engine.dispose()
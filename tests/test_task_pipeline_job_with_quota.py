@@ -2,16 +2,21 @@ import pytest
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 import app.models  # noqa: F401
+from app.core.config import get_settings
 from app.core.enums import JobStatus, TaskStatus
 from app.db.base import Base
 from app.models.planning import Epic, Sprint, SprintEpic, SprintPlan
 from app.models.project import Project
 from app.services import job_engine, task_generation, task_refinement, task_split
-from app.services.llm_policy import LLMQuotaExceeded, check_and_increment_project_quota
+from app.services.llm_policy import (
+    LLMQuotaExceeded,
+    check_and_increment_project_quota,
+    next_quota_reset,
+)
 
 
 @pytest.mark.asyncio
-async def test_task_pipeline_job_fails_on_quota(monkeypatch):
+async def test_task_pipeline_job_retries_after_quota_reset_then_fails(monkeypatch):
     engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -60,6 +65,8 @@ async def test_task_pipeline_job_fails_on_quota(monkeypatch):
             llm_max_backoff_seconds = 0.2
             llm_job_max_calls = 50
             llm_project_daily_max_calls = 1
+            llm_cache_enabled = False
+            llm_fallback_providers: list[str] = []
 
         # force quota low
         monkeypatch.setattr("app.services.llm_adapter.get_settings", lambda: DummySettings())
@@ -69,6 +76,16 @@ async def test_task_pipeline_job_fails_on_quota(monkeypatch):
 
         job = await job_engine.create_job_for_task_pipeline(session, project, sprint, payload_dict=None)
         job = await job_engine.start_job(session, job)
+        # quota exhaustion is retried automatically once the daily quota resets
+        assert job.status == JobStatus.QUEUED.value
+        # SQLite hands DateTime(timezone=True) back naive
+        assert job.run_after.replace(tzinfo=None) == next_quota_reset().replace(tzinfo=None)
+        assert "quota" in (job.error_message or "").lower()
+
+        # ... until the job used up its attempts
+        job.attempts = get_settings().job_max_attempts
+        await session.commit()
+        job = await job_engine.start_job(session, job)
         assert job.status == JobStatus.FAILED.value
         assert "quota" in (job.error_message or "").lower()
 